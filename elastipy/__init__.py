@@ -4,9 +4,11 @@ from ._json import make_json_compatible, BodyJsonEncoder
 from ._version import version, version_str
 from .exporter import Exporter
 from .geo_conv import geotile_to_lat_lon, geohash_to_lat_lon
+from .msearch import msearch, MultiSearchError
 from .search import Search, Response
 
 # sub-packets that should be available through `elastipy.*`
 from . import connections
 from . import query
 from . import plot
+from . import sources
@@ -1,5 +1,15 @@
 import json
 import datetime
+from functools import partial
+from typing import Optional, Callable
+
+from elasticsearch import VERSION as ES_VERSION
+
+try:
+    import orjson as _orjson
+    _ORJSON_OPTIONS = _orjson.OPT_NON_STR_KEYS | _orjson.OPT_PASSTHROUGH_DATETIME
+except ImportError:  # pragma: no cover
+    _orjson = None
 
 
 class BodyJsonEncoder(json.JSONEncoder):
@@ -17,4 +27,148 @@ class BodyJsonEncoder(json.JSONEncoder):
 
 
 def make_json_compatible(o):
-    return json.loads(json.dumps(o, cls=BodyJsonEncoder))
+    """
+    Converts the object to plain json types, just like
+    ``json.loads(json.dumps(o, cls=BodyJsonEncoder))`` would.
+
+    Uses `orjson <https://pypi.org/project/orjson/>`__ if installed.
+    Note that orjson converts ``NaN`` and ``Infinity`` floats to ``None``.
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(_orjson.dumps(o, default=_default, option=_ORJSON_OPTIONS))
+        except TypeError:
+            # let the python implementation handle
+            # the things that orjson does not support
+            pass
+
+    return _make_json_compatible(o)
+
+
+def loads(data):
+    """
+    Decodes json ``bytes`` or ``str``.
+
+    Uses `orjson <https://pypi.org/project/orjson/>`__ if installed.
+    """
+    if _orjson is not None:
+        return _orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def client_serializer(json_loads: Optional[Callable] = None):
+    """
+    Returns a json serializer for the ``elasticsearch`` client
+    which decodes the responses with ``json_loads``.
+
+    :param json_loads: optional callable that decodes ``bytes`` or ``str``.
+        Defaults to :link:`loads`, which uses orjson if installed.
+    :return: serializer instance
+    """
+    return _ClientSerializer(json_loads)
+
+
+def dumps_bytes(o, default: Optional[Callable] = None) -> bytes:
+    """
+    Encodes the object to compact json ``bytes``.
+
+    Uses `orjson <https://pypi.org/project/orjson/>`__ if installed.
+    Note that orjson converts ``NaN`` and ``Infinity`` floats to ``None``.
+
+    :param o: the object to encode
+    :param default: optional callable that converts objects that are not
+        supported otherwise, e.g. the ``default`` method of the
+        elasticsearch client's serializer, which supports ``Decimal``,
+        ``UUID`` and numpy and pandas types.
+    :return: bytes
+    """
+    if default is not None:
+        default = partial(_default_or, default)
+    else:
+        default = _default
+
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(o, default=default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+
+    return json.dumps(
+        o, default=default, ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _default(o):
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    elif getattr(o, "to_dict", None):
+        return o.to_dict()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _default_or(default: Callable, o):
+    try:
+        return _default(o)
+    except TypeError:
+        return default(o)
+
+
+def _make_json_compatible(o):
+    # same order of checks as json.JSONEncoder
+    if o is None or o is True or o is False:
+        return o
+
+    klass = type(o)
+    if klass is str or klass is int or klass is float:
+        return o
+    elif isinstance(o, str):
+        return str.__str__(o)
+    elif isinstance(o, int):
+        return int.__int__(o)
+    elif isinstance(o, float):
+        return float.__float__(o)
+    elif isinstance(o, (list, tuple)):
+        return [_make_json_compatible(v) for v in o]
+    elif isinstance(o, dict):
+        return {
+            _json_key(key): _make_json_compatible(value)
+            for key, value in o.items()
+        }
+
+    return _make_json_compatible(_default(o))
+
+
+def _json_key(key):
+    if type(key) is str:
+        return key
+    elif isinstance(key, str):
+        return str.__str__(key)
+    elif key is None or isinstance(key, (int, float)):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+if ES_VERSION[0] < 8:
+    from elasticsearch.serializer import JSONSerializer as _JSONSerializer
+    from elasticsearch.exceptions import SerializationError as _SerializationError
+else:
+    # the transport serializer lacks the numpy, pandas and Decimal support of the client one
+    from elasticsearch.serializer import JsonSerializer as _JSONSerializer
+    from elastic_transport import SerializationError as _SerializationError
+
+
+class _ClientSerializer(_JSONSerializer):
+
+    def __init__(self, json_loads: Optional[Callable] = None):
+        super().__init__()
+        self._loads = json_loads or loads
+
+    def loads(self, data):
+        try:
+            return self._loads(data)
+        except (ValueError, TypeError) as e:
+            if ES_VERSION[0] < 8:
+                raise _SerializationError(data, e)
+            raise _SerializationError(f"Unable to deserialize as JSON: {data!r}", errors=(e,))
@@ -1,4 +1,5 @@
-from typing import Optional, List, Union, Sequence, Mapping
+from copy import copy
+from typing import Optional, List, Union, Sequence, Mapping, Iterable, Tuple
 from warnings import warn
 
 from .. import make_json_compatible
@@ -37,6 +38,17 @@ class Aggregation(ConverterMixin, AggregationInterface):
         self.parent: Optional[Aggregation] = None
         self.root: Aggregation = self
         self.children: List[Aggregation] = []
+        # the tree metadata is constant once the aggregation is created
+        # so it's only computed once
+        self._group: Optional[str] = self.definition.get("group") or None
+        self._key_name: Optional[str] = None
+        self._body_path: Optional[str] = None
+        self._root_branch: Optional[Tuple[Aggregation, ...]] = None
+        # the node of this aggregation in the search body
+        self._body_node: Optional[dict] = None
+
+        return_keys = self.definition.get("returns", "value")
+        self._return_keys: List[str] = [return_keys] if isinstance(return_keys, str) else list(return_keys)
 
     def __repr__(self):
         return f"{self.__class__.__name__}('{self.name}', '{self.type}')"
@@ -68,24 +80,24 @@ class Aggregation(ConverterMixin, AggregationInterface):
 
         :return: str, either "bucket", "metric" or "pipeline"
         """
-        if "group" not in self.definition:  # pragma: no cover
+        if self._group is None:  # pragma: no cover
             warn(f"Aggregation '{self.name}'/{self.type} has no definition, 'group' is unknown.")
-        return self.definition.get("group") or None
+        return self._group
 
     def is_bucket(self):
-        if "group" not in self.definition:  # pragma: no cover
+        if self._group is None:  # pragma: no cover
             warn(f"Aggregation '{self.name}'/{self.type} has no definition, is_bucket() is unknown")
-        return self.definition.get("group") == "bucket"
+        return self._group == "bucket"
 
     def is_metric(self):
-        if "group" not in self.definition:  # pragma: no cover
+        if self._group is None:  # pragma: no cover
             warn(f"Aggregation '{self.name}'/{self.type} has no definition, is_metric() is unknown")
-        return self.definition.get("group") == "metric"
+        return self._group == "metric"
 
     def is_pipeline(self):
-        if "group" not in self.definition:  # pragma: no cover
+        if self._group is None:  # pragma: no cover
             warn(f"Aggregation '{self.name}'/{self.type} has no definition, is_pipeline() is unknown")
-        return self.definition.get("group") == "pipeline"
+        return self._group == "pipeline"
 
     def metrics(self):
         """
@@ -147,7 +159,7 @@ class Aggregation(ConverterMixin, AggregationInterface):
         agg.root = self.root
         self.children.append(agg)
         self.search._aggregations.append(agg)
-        self.search._add_body(f"{self.body_path()}.aggregations.{name}.{aggregation_type}", agg.to_body())
+        agg._attach_body(self._body_node)
         return agg
 
     def execute(self):
@@ -159,6 +171,88 @@ class Aggregation(ConverterMixin, AggregationInterface):
         self.search.execute()
         return self
 
+    async def execute_async(self):
+        """
+        Executes the whole :link:`Search` with all contained aggregations
+        via :link:`Search.execute_async`.
+
+        :return: self
+        """
+        await self.search.execute_async()
+        return self
+
+    def iter_composite_pages(self) -> Iterable['Aggregation']:
+        """
+        Iterates through all pages of a ``composite`` aggregation.
+
+        The whole :link:`Search` is executed repeatedly, each time with the
+        ``after`` parameter set to the ``after_key`` of the previous response,
+        until no more buckets are returned.
+
+        Only the response of the current page is kept in memory. The yielded
+        aggregation can be used with any of the value access methods like
+        ``items()``, ``dict_rows()`` or ``to_pandas()``.
+
+        This method can be called on the composite aggregation or any of
+        it's sub-aggregations. The ``after`` parameter is restored
+        once the iteration is finished.
+
+        :return: generator of self, one per page
+        """
+        root = self.root
+        if root.type != "composite":
+            raise ValueError(
+                f"Can not paginate aggregation '{self.name}' ({self.type}), "
+                f"root aggregation '{root.name}' is of type '{root.type}', expected 'composite'"
+            )
+
+        params = root.params
+        try:
+            while True:
+                self.search.execute()
+
+                response = root.response
+                if not response.get("buckets"):
+                    break
+
+                yield self
+
+                after_key = response.get("after_key")
+                if not after_key:
+                    break
+
+                root._set_params({**params, "after": after_key})
+        finally:
+            root._set_params(params)
+
+    def iter_composite(
+            self,
+            key_separator: str = None,
+            tuple_key: bool = False,
+            default=None,
+    ) -> Iterable[Tuple]:
+        """
+        Iterates through all key, value tuples of all pages of a
+        ``composite`` aggregation.
+
+        See :link:`Aggregation.iter_composite_pages` and :link:`Aggregation.items`.
+
+        :param key_separator: ``str``
+            Optional separator to concat multiple keys into one string.
+
+        :param tuple_key: ``bool``
+            If True, the key is always a tuple.
+
+            If False, the key is a string if there is only one key.
+
+        :param default:
+            If not None any None-value will be replaced by this.
+
+        :return: generator
+        """
+        for page in self.iter_composite_pages():
+            yield from page.items(key_separator=key_separator, tuple_key=tuple_key, default=default)
+
     @property
     def response(self) -> dict:
         """
@@ -197,13 +291,15 @@ class Aggregation(ConverterMixin, AggregationInterface):
 
         :return: str
         """
-        if self.is_metric() and self.parent:
-            return self.parent.key_name()
-        key_name = "key"
-        # TODO: this should be configurable
-        if self.type == "date_histogram":
-            key_name = "key_as_string"
-        return key_name
+        if self._key_name is None:
+            if self.is_metric() and self.parent:
+                self._key_name = self.parent.key_name()
+            # TODO: this should be configurable
+            elif self.type == "date_histogram":
+                self._key_name = "key_as_string"
+            else:
+                self._key_name = "key"
+        return self._key_name
 
     def body_path(self) -> str:
         """
@@ -211,10 +307,123 @@ class Aggregation(ConverterMixin, AggregationInterface):
 
         :return: str
         """
-        if not self.parent:
-            return f"aggregations.{self.name}"
+        if self._body_path is None:
+            if not self.parent:
+                self._body_path = f"aggregations.{self.name}"
+            else:
+                self._body_path = f"{self.parent.body_path()}.aggregations.{self.name}"
+        return self._body_path
+
+    def root_branch(self) -> Tuple['Aggregation', ...]:
+        """
+        Return all aggregations from the root aggregation down to this one.
+
+        :return: tuple of Aggregation
+        """
+        if self._root_branch is None:
+            if not self.parent:
+                self._root_branch = (self, )
+            else:
+                self._root_branch = self.parent.root_branch() + (self, )
+        return self._root_branch
+
+    def _iter_bucket_items(self, response: Mapping) -> Iterable[Tuple]:
+        """
+        Iterates through the bucket keys and buckets of the response
+        of this aggregation.
+
+        This is the generic implementation. Classes for specific
+        aggregation types can override it to decode their
+        bucket layout directly.
+
+        :param response: the part of the search response for this aggregation
+        :return: iterable of (key, bucket) tuples
+        """
+        if "buckets" in response:
+            buckets = response["buckets"]
+            if isinstance(buckets, list):
+                key_name = self.key_name()
+                for b in buckets:
+                    yield b[key_name], b
+            elif isinstance(buckets, dict):
+                yield from buckets.items()
+            else:
+                raise NotImplementedError(f"Can not work with buckets of type {type(buckets).__name__}")
         else:
-            return f"{self.parent.body_path()}.aggregations.{self.name}"
+            # single bucket aggregations
+            yield self.name, response
+
+    def _metric_values(self, response: Mapping) -> dict:
+        """
+        Returns all values of a metric response that are
+        defined in the ``returns`` list of the definition.
+
+        :param response: the part of the search response for this aggregation
+        :return: dict
+        """
+        return {
+            key: self._decode_metric_value(response, key)
+            for key in self._return_keys
+            if key in response
+        }
+
+    def _decode_metric_value(self, response: Mapping, key: str):
+        """
+        Returns a single value of a metric response.
+
+        Classes for specific aggregation types can override it
+        to convert the value.
+        """
+        return response.get(key)
+
+    def _copy(self, search, parent: Optional['Aggregation'] = None) -> 'Aggregation':
+        """
+        Create a copy of this aggregation for another :link:`Search`.
+
+        The ``params`` and ``definition`` are shared with the copy.
+        They are never changed in-place, :link:`Aggregation._set_params`
+        replaces the whole dict.
+
+        The children are not copied, the copy must be attached to
+        it's parent copy and the search by the caller.
+
+        :param search: the new Search instance
+        :param parent: the copy of the parent aggregation, if any
+        :return: new Aggregation instance
+        """
+        agg = copy(self)
+        agg.search = search
+        agg._response = None
+        agg.parent = parent
+        agg.root = parent.root if parent else agg
+        agg.children = []
+        # key_name and body_path only depend on names and types
+        # but the branch references the aggregation instances
+        agg._root_branch = None
+        # the search body has been copied before
+        agg._body_node = (parent._body_node if parent else search._body)["aggregations"][self.name]
+        if parent:
+            parent.children.append(agg)
+        return agg
+
+    def _attach_body(self, container: dict):
+        """
+        Add the body of this aggregation to the ``aggregations`` of
+        the parent's body node or the search body and keep
+        a reference to the node.
+        """
+        aggs = container.setdefault("aggregations", dict())
+        self._body_node = aggs.setdefault(self.name, dict())
+        self._body_node[self.type] = self.to_body()
+        self.search._body_changed()
+
+    def _set_params(self, params: Mapping):
+        """
+        Replace the parameters and update the search request body.
+        """
+        self.params = params
+        self._body_node[self.type] = self.to_body()
+        self.search._body_changed()
 
     def _map_parameters(self, params: Mapping) -> Mapping:
         """
@@ -46,7 +46,7 @@ class AggregationDump:
             file: Optional[TextIO] = None
     ):
         """
-        Print the result of the ``Aggregation.dict_rows()`` function as table to console.
+        Print the result of the ``Aggregation.rows()`` function as table to console.
 
         :param include: ``str`` or ``sequence of str``
             Can be one or more (OR-combined) wildcard patterns.
@@ -108,13 +108,13 @@ class AggregationDump:
         """
         from elastipy.dump import Table
 
-        rows = self._agg.dict_rows(
+        rows = self._agg.rows(
             include=include,
             exclude=exclude,
             flat=flat,
         )
 
-        Table(list(rows)).print(
+        Table(rows).print(
             sort=sort,
             digits=digits,
             header=header,
@@ -159,6 +159,7 @@ class AggregationDump:
             exclude: Optional[Union[str, Sequence[str]]] = None,
             colors: bool = True,
             ascii: bool = False,
+            sparse: bool = False,
             **kwargs
     ):
         """
@@ -195,6 +196,10 @@ class AggregationDump:
         :param ascii: ``bool``
             If ``True`` fall back to ascii characters.
 
+        :param sparse: ``bool``
+            If ``True`` the matrix is fetched in coordinate format, see
+            :link:`Aggregation.to_matrix`.
+
         :param max_width: ``int``
             Will limit the expansion of the table when bars are enabled.
             If left None, the terminal width is used.
@@ -209,18 +214,26 @@ class AggregationDump:
             sort=sort,
             default=default,
             include=include,
-            exclude=exclude
+            exclude=exclude,
+            sparse=sparse,
         )
         if len(keys) != 2:
             raise ValueError(
                 f"Can not display matrix of dimension {len(keys)} with heatmap, 2 dimensions required"
             )
 
+        if sparse:
+            coords, matrix = matrix
+        else:
+            coords = None
+
         hm = Heatmap(
             keys=keys,
             values=matrix,
             colors=colors,
-            ascii=ascii
+            ascii=ascii,
+            coords=coords,
+            fill_value=default,
         )
         hm.print(**kwargs)
 
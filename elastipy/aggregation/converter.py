@@ -3,7 +3,7 @@ from itertools import chain
 import fnmatch
 from typing import Sequence, Union, Optional, Iterable, Tuple, TextIO, Any, Mapping, List
 
-from .helper import dict_rows_to_list_rows, create_matrix, remove_matrix_axis
+from .helper import create_matrix
 
 
 class ConverterMixin:
@@ -121,11 +121,13 @@ class ConverterMixin:
 
         :return: generator of list
         """
-        yield from dict_rows_to_list_rows(
-            self.dict_rows(include=include, exclude=exclude, flat=flat),
-            header=header,
-            default=default,
-        )
+        from .visitor import Visitor
+        columns, rows = Visitor(self).row_tuples(include=include, exclude=exclude, flat=flat, default=default)
+
+        for i, row in enumerate(rows):
+            if i == 0 and header:
+                yield list(columns)
+            yield list(row)
 
     def dict_rows(
             self,
@@ -163,6 +165,71 @@ class ConverterMixin:
         from .visitor import Visitor
         return Visitor(self).dict_rows(include=include, exclude=exclude, flat=flat)
 
+    def to_columns(
+            self,
+            include: Union[str, Sequence[str]] = None,
+            exclude: Union[str, Sequence[str]] = None,
+            flat: Union[bool, str, Sequence[str]] = False,
+            default=None,
+    ) -> Mapping[str, Any]:
+        """
+        Collects all result values from this aggregation branch into
+        one numpy array per column.
+
+        The result contains the same values as ``dict_rows()`` but
+        the bucket tree is only walked once and no dict is created per row.
+
+        The type of each array is inferred from the values:
+
+            - only ``int`` values create an ``int64`` array
+            - ``int`` and ``float`` values create a ``float64`` array,
+              ``None`` values are converted to ``NaN``
+            - only ``bool`` values create a ``bool`` array
+            - everything else creates an ``object`` array
+
+        .. CODE::
+
+            a = Search().agg_terms("sku", field="sku")
+            a.agg_date_histogram("day", calendar_interval="1d")
+            ...
+            columns = a.to_columns()
+            columns["sku"]            # array(['sku-1', 'sku-1', ..., dtype=object)
+            columns["day.doc_count"]  # array([5, 3, ...])
+
+        :param include: ``str`` or ``sequence of str``
+            Can be one or more (OR-combined) wildcard patterns.
+            If used, any column that does not fit a pattern is removed.
+
+        :param exclude: ``str`` or ``sequence of str``
+            Can be one or more (OR-combined) wildcard patterns.
+            If used, any column that fits a pattern is removed.
+
+        :param flat: ``bool``, ``str`` or ``sequence of str``
+            Can be one or more aggregation names that should be *flattened out*,
+            meaning that each key of the aggregation creates a new column
+            instead of a new row. If ``True``, all bucket aggregations are
+            *flattened*.
+
+            Only supported for bucket aggregations!
+
+            .. NOTE::
+                Currently not supported for the root aggregation!
+
+        :param default:
+            This value will be used wherever a value is undefined.
+
+        :return: ``dict`` of ``str`` -> ``numpy.ndarray``
+        """
+        return self._to_columns(include=include, exclude=exclude, flat=flat, default=default)[0]
+
+    def _to_columns(self, include, exclude, flat, default) -> Tuple[Mapping[str, Any], int]:
+        from .visitor import Visitor
+        columns, num_rows = Visitor(self)._columns(include=include, exclude=exclude, flat=flat, default=default)
+        return {
+            key: values_to_array(values)
+            for key, values in columns.items()
+        }, num_rows
+
     def to_dict(self, key_separator=None, default=None) -> dict:
         """
         Create a dictionary from all key/value pairs.
@@ -187,7 +254,7 @@ class ConverterMixin:
             default=None,
     ):
         """
-        Converts the results of ``dict_rows()`` to a pandas DataFrame.
+        Converts the results of ``to_columns()`` to a pandas DataFrame.
 
         This will include all parent aggregations (up to the root) and all children
         aggregations (including metrics).
@@ -249,14 +316,13 @@ class ConverterMixin:
                 "Can not use 'index' and 'to_index' together, settle for one please."
             )
 
-        rows = list(dict_rows_to_list_rows(
-            self.dict_rows(include=include, exclude=exclude, flat=flat),
-            default=default,
-            header=True,
-        ))
+        columns, num_rows = self._to_columns(include=include, exclude=exclude, flat=flat, default=default)
 
-        if rows:
-            df = pd.DataFrame(rows[1:], columns=rows[0], dtype=dtype)
+        if columns:
+            df = pd.DataFrame(columns, dtype=dtype)
+        elif num_rows:
+            # all columns have been excluded
+            df = pd.DataFrame([[]] * num_rows, columns=[], dtype=dtype)
         else:
             df = pd.DataFrame(dtype=dtype)
 
@@ -287,6 +353,8 @@ class ConverterMixin:
             default: Optional[Any] = None,
             include: Optional[Union[str, Sequence[str]]] = None,
             exclude: Optional[Union[str, Sequence[str]]] = None,
+            as_numpy: bool = False,
+            sparse: bool = False,
     ) -> Tuple[List[str], List, List]:
         """
         Generate an N-dimensional matrix from the values of this aggregation.
@@ -334,6 +402,28 @@ class ConverterMixin:
         :param exclude: ``str | seq[str]``
             One or more wildcard patterns that exclude matching keys.
 
+        :param as_numpy: ``bool``
+            If True, the matrix data is returned as N-dimensional ``numpy.ndarray``.
+            The type of the array is inferred from the values just like
+            in :link:`Aggregation.to_columns`.
+
+        :param sparse: ``bool``
+            If True, the matrix data is returned in coordinate format (COO)
+            as tuple of **coordinates** and **values**. Only the cells that
+            exist in the response are included and the ``default`` value is
+            not used for the other cells.
+
+            The **coordinates** are a list of index tuples, one for each value.
+            With ``as_numpy`` they are an integer array of shape
+            ``(dimensions, number of values)`` which can be passed to
+            ``scipy.sparse.coo_matrix((values, coordinates), shape=...)``.
+
+            .. CODE::
+
+                names, keys, (coords, values) = a.to_matrix(sparse=True)
+                coords == [(0, 0), (0, 1), (2, 0)]
+                values == [23, 42, 4]
+
         :return:
             A tuple of **names**, **keys** and **matrix data**, each as list.
 
@@ -345,7 +435,8 @@ class ConverterMixin:
             **Data** is a list, with other nested lists for each further dimension,
             containing the values of this aggregation.
 
-            Returns three empty lists if no data is available.
+            Returns three empty lists if no data is available
+            (or empty **data** in the requested format).
         """
         from .visitor import Visitor
         names = Visitor(self).key_names()
@@ -357,18 +448,35 @@ class ConverterMixin:
 
         data_items = list(self.items(tuple_key=True, default=default))
         if not data_items:
+            if sparse and as_numpy:
+                import numpy as np
+                return [], [], (np.empty((len(names), 0), dtype=np.int64), np.empty((0, )))
+            elif sparse:
+                return [], [], ([], [])
+            elif as_numpy:
+                import numpy as np
+                return [], [], np.empty((0, ))
             return [], [], []
 
         data_keys, data_values = zip(*data_items)
 
-        num_dim = len(data_keys[0])
+        # keys of each dimension and their hashable representation
+        dim_data_keys = list(zip(*data_keys))
+        dim_data_ids = [
+            [_key_id(k) for k in dim_keys] if isinstance(dim_keys[0], (dict, list)) else dim_keys
+            for dim_keys in dim_data_keys
+        ]
 
         # collect keys for each dimension in the order of appearance
-        keys = [[] for _ in range(num_dim)]
-        for key in data_keys:
-            for i, k in enumerate(key):
-                if k not in keys[i]:
-                    keys[i].append(k)
+        keys = []
+        for dim_keys, dim_ids in zip(dim_data_keys, dim_data_ids):
+            if dim_keys is dim_ids:
+                keys.append(list(dict.fromkeys(dim_keys)))
+            else:
+                unique_keys = dict()
+                for k_id, k in zip(dim_ids, dim_keys):
+                    unique_keys.setdefault(k_id, k)
+                keys.append(list(unique_keys.values()))
 
         if sort:
             if sort is True:
@@ -396,30 +504,57 @@ class ConverterMixin:
                     idx, reverse = abs(n), n < 0
                 keys[idx].sort(reverse=reverse)
 
-        matrix = create_matrix(*(len(k) for k in keys), scalar=default)
+        if include or exclude:
+            keys = [
+                [k for k in dim_keys if is_key_match(k, include, exclude)]
+                for dim_keys in keys
+            ]
+
+        # index of each item's key in each axis or -1 if filtered
+        dim_indices = []
+        for dim_keys, dim_ids in zip(keys, dim_data_ids):
+            key_index = {_key_id(k): i for i, k in enumerate(dim_keys)}
+            dim_indices.append([key_index.get(k_id, -1) for k_id in dim_ids])
+
+        shape = tuple(len(k) for k in keys)
+
+        if sparse and as_numpy:
+            import numpy as np
+            dim_indices = np.array(dim_indices, dtype=np.int64).reshape(len(shape), -1)
+            valid = (dim_indices >= 0).all(axis=0)
+            matrix = dim_indices[:, valid], values_to_array(data_values)[valid]
+
+        elif sparse:
+            coords, values = [], []
+            for value, *key_indices in zip(data_values, *dim_indices):
+                if min(key_indices) >= 0:
+                    coords.append(tuple(key_indices))
+                    values.append(value)
+            matrix = coords, values
+
+        elif as_numpy:
+            import numpy as np
+            dim_indices = np.array(dim_indices, dtype=np.int64).reshape(len(shape), -1)
+            valid = (dim_indices >= 0).all(axis=0)
+            values = np.fromiter(data_values, dtype=object, count=len(data_values))
+
+            flat_matrix = np.full(int(np.prod(shape)), default, dtype=object)
+            flat_matrix[np.ravel_multi_index(dim_indices[:, valid], shape)] = values[valid]
+            matrix = values_to_array(flat_matrix.tolist()).reshape(shape)
 
-        for key, value in zip(data_keys, data_values):
-            m = matrix
-            for i in range(num_dim):
-                idx = keys[i].index(key[i])
-                if i == num_dim - 1:
-                    m[idx] = value
-                else:
-                    m = m[idx]
+        else:
+            matrix = create_matrix(*shape, scalar=default)
+            last_dim = len(shape) - 1
 
-        if include or exclude:
-            repeat = True
-            while repeat:
-                repeat = False
-                for dim, dim_keys in enumerate(keys):
-                    for i, key in enumerate(dim_keys):
-                        if not is_key_match(key, include, exclude):
-                            dim_keys.pop(i)
-                            remove_matrix_axis(matrix, dim, i)
-                            repeat = True
-                            break
-                    if repeat:
+            for value, *key_indices in zip(data_values, *dim_indices):
+                m = matrix
+                for dim, idx in enumerate(key_indices):
+                    if idx < 0:
                         break
+                    if dim == last_dim:
+                        m[idx] = value
+                    else:
+                        m = m[idx]
 
         return names, keys, matrix
 
@@ -429,6 +564,7 @@ class ConverterMixin:
             default: Optional[Any] = None,
             include: Optional[Union[str, Sequence[str]]] = None,
             exclude: Optional[Union[str, Sequence[str]]] = None,
+            sparse: bool = False,
     ):
         """
         Returns a pandas DataFrame containing the matrix.
@@ -437,6 +573,13 @@ class ConverterMixin:
 
         Only one- and two-dimensional matrices are supported.
 
+        :param sparse: ``bool``
+            If True, the columns of the DataFrame are
+            `sparse arrays <https://pandas.pydata.org/docs/user_guide/sparse.html>`__
+            which only store the cells that exist in the response.
+            The ``default`` value is used as ``fill_value``, or ``NaN`` if
+            it's ``None``.
+
         :return:
             pandas.DataFrame instance
         :raises ValueError: If dimensions is 0 or above 2
@@ -448,16 +591,28 @@ class ConverterMixin:
             default=default,
             include=include,
             exclude=exclude,
+            sparse=sparse,
         )
-        if len(keys) == 1:
-            df = pd.DataFrame(matrix, index=keys[0])
-        elif len(keys) == 2:
-            df = pd.DataFrame(matrix, index=keys[0], columns=keys[1])
-        else:
+        if len(keys) not in (1, 2):
             raise ValueError(
                 f"Can not convert matrix of dimension {len(keys)} to pandas DataFrame"
             )
 
+        if sparse:
+            columns = sparse_matrix_columns(
+                shape=tuple(len(k) for k in keys),
+                coords=matrix[0],
+                values=matrix[1],
+                default=default,
+            )
+            df = pd.DataFrame(dict(enumerate(columns)), index=keys[0])
+            if len(keys) == 2:
+                df.columns = keys[1]
+        elif len(keys) == 1:
+            df = pd.DataFrame(matrix, index=keys[0])
+        else:
+            df = pd.DataFrame(matrix, index=keys[0], columns=keys[1])
+
         series = pd_series_to_datetime(df.index)
         if series is not None:
             df.index = series
@@ -490,6 +645,100 @@ def is_key_match(key: str, include: Optional[Sequence], exclude: Optional[Sequen
     return True
 
 
+def _key_id(key):
+    # composite aggregation keys are dicts
+    if isinstance(key, (dict, list)):
+        return repr(key)
+    return key
+
+
+def values_to_array(values: Sequence):
+    """
+    Converts a list of values to a numpy array.
+
+    See :link:`Aggregation.to_columns` for the inferred types.
+    """
+    import numpy as np
+
+    types = set(map(type, values))
+    has_none = type(None) in types
+    types.discard(type(None))
+
+    if types and not has_none and types == {bool}:
+        return np.array(values, dtype=bool)
+
+    if types and not has_none and types == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+
+    elif types and types <= {int, float}:
+        # None is converted to NaN
+        return np.array(values, dtype=np.float64)
+
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def sparse_matrix_columns(shape: Sequence[int], coords: Sequence[Sequence[int]], values: Sequence, default=None):
+    """
+    Converts a one- or two-dimensional matrix in coordinate format
+    to a list of ``pandas.arrays.SparseArray``, one for each column.
+
+    :param shape: size of each dimension
+    :param coords: list of index tuples
+    :param values: list of values, one for each index tuple
+    :param default: value of the missing cells
+    :return: list of ``pandas.arrays.SparseArray``
+    """
+    import numpy as np
+    import pandas as pd
+
+    num_rows = shape[0]
+    num_columns = shape[1] if len(shape) > 1 else 1
+
+    coords = np.array(coords, dtype=np.int64).reshape(-1, len(shape))
+    rows = coords[:, 0]
+    cols = coords[:, 1] if len(shape) > 1 else np.zeros_like(rows)
+
+    # the fill value takes part in the type inference
+    values = values_to_array(list(values) + [default])
+    fill_value, values = values[-1:].tolist()[0], values[:-1]
+    dtype = pd.SparseDtype(values.dtype, fill_value)
+
+    # sort by column, then by row
+    order = np.lexsort((rows, cols))
+    rows, cols, values = rows[order], cols[order], values[order]
+    bounds = np.searchsorted(cols, np.arange(num_columns + 1))
+
+    try:
+        from pandas._libs.sparse import IntIndex
+    except ImportError:  # pragma: no cover
+        IntIndex = None
+
+    # cells holding the default are not stored
+    if pd.isna(fill_value):
+        stored = ~pd.isna(values)
+    else:
+        stored = np.asarray(values != fill_value, dtype=bool)
+
+    columns = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        column_stored = stored[start:end]
+        column_rows = rows[start:end][column_stored]
+        column_values = values[start:end][column_stored]
+        if IntIndex is not None:
+            # only the stored cells are allocated
+            index = IntIndex(num_rows, column_rows.astype(np.int32))
+            columns.append(pd.arrays.SparseArray(column_values, sparse_index=index, dtype=dtype))
+        else:
+            dense = np.full(num_rows, fill_value, dtype=values.dtype)
+            dense[column_rows] = column_values
+            columns.append(pd.arrays.SparseArray(dense, dtype=dtype))
+
+    return columns
+
+
 def pd_series_to_datetime(series):
     import pandas as pd
     from pandas._libs.tslibs import OutOfBoundsDatetime
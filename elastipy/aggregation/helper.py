@@ -85,3 +85,32 @@ def remove_matrix_axis(matrix: List, dim: int, index: int):
         matrix.pop(index)
 
     return matrix
+
+
+def strip_typed_keys(response: dict, aggregations: Sequence) -> dict:
+    """
+    Renames the ``type#name`` keys of a ``typed_keys`` search response
+    to ``name``, in-place, for the aggregations and all their children.
+
+    :param response: dict
+        The part of the response that contains the aggregations,
+        e.g. ``response["aggregations"]`` or a bucket.
+    :param aggregations: list of Aggregation
+        The aggregations that are expected in the response.
+    :return: the same response
+    """
+    typed = {
+        key.partition("#")[2]: key
+        for key in response
+        if "#" in key
+    }
+    for agg in aggregations:
+        key = typed.get(agg.name)
+        if key is not None and agg.name not in response:
+            response[agg.name] = response.pop(key)
+
+        if agg.children and agg.is_bucket() and agg.name in response:
+            for _, bucket in agg._iter_bucket_items(response[agg.name]):
+                strip_typed_keys(bucket, agg.children)
+
+    return response
@@ -2,6 +2,9 @@
 Currently collection of all aggregations that have some peculiarity
 """
 
+from operator import itemgetter
+from typing import Mapping, Iterable, Tuple
+
 from .aggregation import Aggregation
 
 
@@ -11,3 +14,73 @@ class Filter(Aggregation):
     def to_body(self):
         return self.params["filter"]
 
+
+
+class BucketListAggregation(Aggregation, factory=False):
+    """
+    Base for bucket aggregations that return a list of buckets,
+    or a dict of buckets if ``keyed`` is enabled.
+    """
+
+    def _iter_bucket_items(self, response: Mapping) -> Iterable[Tuple]:
+        buckets = response.get("buckets")
+        if type(buckets) is list:
+            return zip(map(itemgetter(self.key_name()), buckets), buckets)
+        elif type(buckets) is dict:
+            return buckets.items()
+        return super()._iter_bucket_items(response)
+
+
+class Terms(BucketListAggregation):
+    _agg_type = "terms"
+
+
+class DateHistogram(BucketListAggregation):
+    _agg_type = "date_histogram"
+
+
+class Histogram(BucketListAggregation):
+    _agg_type = "histogram"
+
+
+class Range(BucketListAggregation):
+    _agg_type = "range"
+
+
+class Composite(BucketListAggregation):
+    _agg_type = "composite"
+
+
+class GeotileGrid(BucketListAggregation):
+    _agg_type = "geotile_grid"
+
+
+class Filters(Aggregation):
+    _agg_type = "filters"
+
+    def _iter_bucket_items(self, response: Mapping) -> Iterable[Tuple]:
+        buckets = response.get("buckets")
+        if type(buckets) is dict:
+            return buckets.items()
+        elif type(buckets) is list:
+            # anonymous filters have no key, use the index instead
+            return enumerate(buckets)
+        return super()._iter_bucket_items(response)
+
+
+class Percentiles(Aggregation):
+    _agg_type = "percentiles"
+
+    def _decode_metric_value(self, response: Mapping, key: str):
+        value = response.get(key)
+        if key == "values" and type(value) is list:
+            # convert the 'keyed: false' layout to the default layout
+            value = {
+                str(float(v["key"])): v.get("value")
+                for v in value
+            }
+        return value
+
+
+class PercentileRanks(Percentiles):
+    _agg_type = "percentile_ranks"
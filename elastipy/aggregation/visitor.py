@@ -19,6 +19,8 @@ class Visitor:
         self.default_value = default_value
         self.key_separator = key_separator
         self.tuple_key = tuple_key
+        # RowPlan per aggregation
+        self._row_plans = dict()
 
     def iter_tree(
             self,
@@ -98,14 +100,7 @@ class Visitor:
         """
         root = self.agg.root
 
-        if flat is True:
-            flat = [a.name for a in self.iter_tree(root=root, group="bucket")]
-        elif isinstance(flat, str):
-            flat = [flat]
-        elif not flat:
-            flat = []
-
-        for row in self._dict_rows(root, root.search.response.aggregations[root.name], flat):
+        for row in self._dict_rows(root, root.search.response.aggregations[root.name], self._flat_names(flat)):
             if include or exclude:
                 row = {
                     key: value
@@ -114,13 +109,115 @@ class Visitor:
                 }
             yield row
 
+    def columns(
+            self,
+            include: Union[str, Sequence[str]] = None,
+            exclude: Union[str, Sequence[str]] = None,
+            flat: Union[bool, str, Sequence[str]] = False,
+            default=None,
+    ) -> Mapping[str, list]:
+        """
+        Collects all result values from this aggregation branch into columns.
+
+        Same as ``dict_rows()`` but returns a dict of column name and list of
+        values. The lists all have the same length and missing
+        values are filled with ``default``.
+
+        :return: dict of str -> list
+        """
+        return self._columns(include=include, exclude=exclude, flat=flat, default=default)[0]
+
+    def _columns(self, include, exclude, flat, default) -> Tuple[Mapping[str, list], int]:
+        root = self.agg.root
+
+        columns = dict()
+        # cache of the include/exclude decision per column name
+        is_included = dict()
+        num_rows = 0
+        for row_parts in self._row_chains(root, root.search.response.aggregations[root.name], self._flat_names(flat)):
+            for part in row_parts:
+                for key, value in part.items():
+                    column = columns.get(key)
+                    if column is None:
+                        if include or exclude:
+                            if key not in is_included:
+                                is_included[key] = wildcard_filter(key, include, exclude)
+                            if not is_included[key]:
+                                continue
+                        column = columns[key] = []
+
+                    column_len = len(column)
+                    if column_len == num_rows:
+                        column.append(value)
+                    elif column_len > num_rows:
+                        # key exists in more than one part of the row
+                        column[num_rows] = value
+                    else:
+                        column.extend([default] * (num_rows - column_len))
+                        column.append(value)
+            num_rows += 1
+
+        for column in columns.values():
+            if len(column) < num_rows:
+                column.extend([default] * (num_rows - len(column)))
+
+        return columns, num_rows
+
+    def row_tuples(
+            self,
+            include: Union[str, Sequence[str]] = None,
+            exclude: Union[str, Sequence[str]] = None,
+            flat: Union[bool, str, Sequence[str]] = False,
+            default=None,
+    ) -> Tuple[List[str], Iterable[tuple]]:
+        """
+        Returns the column names and a generator of row tuples
+        with one value for each column.
+
+        Same values as ``dict_rows()``, but the rows are not held in memory.
+        The names of the columns are collected in a first walk through
+        the response.
+
+        :return: tuple of list of str and generator of tuple
+        """
+        root = self.agg.root
+        response = root.search.response.aggregations[root.name]
+        flat = self._flat_names(flat)
+
+        columns = dict()
+        for row_parts in self._row_chains(root, response, flat):
+            for part in row_parts:
+                # keeps the order of first appearance
+                columns.update(part)
+
+        columns = [
+            key for key in columns
+            if not (include or exclude) or wildcard_filter(key, include, exclude)
+        ]
+
+        def _iter_rows():
+            for row_parts in self._row_chains(root, response, flat):
+                if len(row_parts) == 1:
+                    row = row_parts[0]
+                else:
+                    row = dict()
+                    for part in row_parts:
+                        row.update(part)
+                yield tuple([row.get(key, default) for key in columns])
+
+        return columns, _iter_rows()
+
+    def _flat_names(self, flat: Union[bool, str, Sequence[str]]) -> Sequence[str]:
+        if flat is True:
+            return [a.name for a in self.iter_tree(root=self.agg.root, group="bucket")]
+        elif isinstance(flat, str):
+            return [flat]
+        elif not flat:
+            return []
+        return flat
+
     def root_branch(self):
-        aggs = []
-        a = self.agg
-        while a:
-            aggs.insert(0, a)
-            a = a.parent
-        return aggs
+        return list(self.agg.root_branch())
 
     def key_names(self, buckets: bool = True) -> List[str]:
         """
@@ -158,59 +255,87 @@ class Visitor:
         return value
 
     def _dict_rows(self, agg: Aggregation, response: dict, flat):
-        if not agg.is_bucket():
-            raise ValueError(f"Can not call dict_rows() on non-bucket aggregation {agg}")
+        for row_parts in self._row_chains(agg, response, flat):
+            if len(row_parts) == 1:
+                yield row_parts[0]
+            else:
+                row = dict()
+                for part in row_parts:
+                    row.update(part)
+                yield row
+
+    def _row_chains(self, agg: Aggregation, response: dict, flat):
+        """
+        Yields a tuple of dicts for each row.
+
+        Merged together, the dicts of each tuple are the row. The dicts of the
+        parent buckets are shared between all sub-bucket rows,
+        so they must not be modified.
+        """
+        plan = self._row_plan(agg)
+        expand_value = self._expand_value
 
         for b_key, bucket in self._iter_bucket_items(agg, response):
             row = {
                 agg.name: bucket[b_key] if b_key in bucket else b_key,
-                f"{agg.name}.doc_count": bucket["doc_count"],
+                plan.doc_count_key: bucket["doc_count"],
             }
-            for metric in chain(agg.metrics(), agg.pipelines()):
-                return_keys = metric.definition.get("returns", "value")
-                if isinstance(return_keys, str):
-                    return_keys = [return_keys]
-
-                if len(return_keys) == 1:
-                    values = {metric.name: bucket[metric.name].get(return_keys[0])}
+            for metric_name, return_columns, decode in plan.metrics:
+                metric_response = bucket[metric_name]
+                if len(return_columns) == 1:
+                    key, column = return_columns[0]
+                    if decode is None:
+                        value = metric_response.get(key)
+                    else:
+                        value = decode(metric_response, key)
+                    if isinstance(value, dict):
+                        row.update(expand_value(value, column))
+                    else:
+                        row[column] = value
                 else:
-                    values = dict()
-                    for key in return_keys:
-                        if key in bucket[metric.name]:
-                            values[f"{metric.name}.{key}"] = bucket[metric.name][key]
-
-                row.update(self._expand_value(values))
-
-            has_sub_bucket = False
-            for bucket_agg in agg.children:
-                if bucket_agg.is_bucket():
-                    has_sub_bucket = True
-
-                    if bucket_agg.name not in flat:
-                        for sub_row in self._dict_rows(bucket_agg, bucket[bucket_agg.name], flat):
-                            # copy the row until here
-                            full_row = copy(row)
-                            # and add each sub-aggregation's values
-                            full_row.update(sub_row)
-                            yield full_row
+                    for key, column in return_columns:
+                        if key in metric_response:
+                            if decode is None:
+                                value = metric_response[key]
+                            else:
+                                value = decode(metric_response, key)
+                            if isinstance(value, dict):
+                                row.update(expand_value(value, column))
+                            else:
+                                row[column] = value
+
+            if not plan.bucket_aggs:
+                yield (row, )
+                continue
+
+            for bucket_agg in plan.bucket_aggs:
+                if bucket_agg.name not in flat:
+                    # the row until here is shared by all sub-aggregation rows
+                    for sub_row_parts in self._row_chains(bucket_agg, bucket[bucket_agg.name], flat):
+                        yield (row, ) + sub_row_parts
 
-                    else:
-                        # drop the "agg_name" and "agg_name.doc_count" columns
-                        # and instead use the value in "agg_name" column as column key
-                        # and the "agg_name.doc_count" value as value in that column
-                        agg_value_key = f"{bucket_agg.name}.doc_count"
-                        for sub_row in self._dict_rows(bucket_agg, bucket[bucket_agg.name], flat):
-                            # the value in "agg_name" a.k.a the key
-                            sub_agg_key = sub_row[bucket_agg.name]
-                            row[sub_agg_key] = sub_row[agg_value_key]
-                            for key, value in sub_row.items():
-                                if key != bucket_agg.name and key != agg_value_key:
-                                    # sub-aggregations get their key attached
-                                    row[f"{sub_agg_key}.{key}"] = value
-                        yield row
-
-            if not has_sub_bucket:
-                yield row
+                else:
+                    # rows that have been yielded before must not change
+                    row = copy(row)
+                    # drop the "agg_name" and "agg_name.doc_count" columns
+                    # and instead use the value in "agg_name" column as column key
+                    # and the "agg_name.doc_count" value as value in that column
+                    agg_value_key = f"{bucket_agg.name}.doc_count"
+                    for sub_row in self._dict_rows(bucket_agg, bucket[bucket_agg.name], flat):
+                        # the value in "agg_name" a.k.a the key
+                        sub_agg_key = sub_row[bucket_agg.name]
+                        row[sub_agg_key] = sub_row[agg_value_key]
+                        for key, value in sub_row.items():
+                            if key != bucket_agg.name and key != agg_value_key:
+                                # sub-aggregations get their key attached
+                                row[f"{sub_agg_key}.{key}"] = value
+                    yield (row, )
+
+    def _row_plan(self, agg: Aggregation) -> "RowPlan":
+        plan = self._row_plans.get(id(agg))
+        if plan is None:
+            plan = self._row_plans[id(agg)] = RowPlan(agg)
+        return plan
 
     def _expand_value(self, value, prefix=None):
         if isinstance(value, dict):
@@ -230,31 +355,16 @@ class Visitor:
             yield from self._iter_items_from_bucket(self.agg, self.agg.response, tuple())
             return
 
-        aggs = self.root_branch()
+        aggs = self.agg.root_branch()
         for b_key, b in self._iter_bucket_items(aggs[0]):
             yield from self._iter_sub_items_rec(b, aggs[1:], (b_key, ))
 
     def _iter_bucket_items(self, agg: Aggregation, response=None):
-        # this could be a place to specialize by class
-        #if hasattr(agg, "_iter_bucket_items"):
-        #    yield from agg._iter_bucket_items(response)
-        #else:
         if response is None:
             assert agg.is_bucket()
             response = agg.response
 
-        if "buckets" in response:
-            buckets = response["buckets"]
-            if isinstance(buckets, list):
-                for b in buckets:
-                    yield b[agg.key_name()], b
-            elif isinstance(buckets, dict):
-                yield from buckets.items()
-            else:
-                raise NotImplementedError(f"Can not work with buckets of type {type(buckets).__name__}")
-        else:
-            # single bucket aggregations
-            yield agg.name, response
+        return agg._iter_bucket_items(response)
 
     def _iter_sub_items_rec(self, bucket: dict, aggs: Sequence[Aggregation], parent_key: tuple):
         sub_bucket = bucket[aggs[0].name]
@@ -267,12 +377,10 @@ class Visitor:
 
     def _iter_items_from_bucket(self, agg: Aggregation, bucket: dict, parent_key: tuple):
         if agg.is_metric():
-            return_keys = agg.definition.get("returns", "value")
-            values = dict()
-            for key in return_keys:
-                if key in bucket:
-                    value = bucket[key]
-                    values[key] = self.make_default(value)
+            values = {
+                key: self.make_default(value)
+                for key, value in agg._metric_values(bucket).items()
+            }
 
             if len(values) > 1:
                 yield parent_key, values
@@ -288,3 +396,34 @@ class Visitor:
             else:
                 value = bucket["doc_count"]
                 yield parent_key + (agg.name, ), self.make_default(value)
+
+
+class RowPlan:
+    """
+    The parts of a bucket aggregation that are needed to create
+    the rows, compiled once per Visitor.
+    """
+
+    def __init__(self, agg: Aggregation):
+        if not agg.is_bucket():
+            raise ValueError(f"Can not call dict_rows() on non-bucket aggregation {agg}")
+
+        self.doc_count_key = f"{agg.name}.doc_count"
+        self.bucket_aggs = [a for a in agg.children if a.is_bucket()]
+
+        # list of (metric name, list of (return key, column name), decoder)
+        self.metrics = []
+        for metric in chain(agg.metrics(), agg.pipelines()):
+            return_keys = metric._return_keys
+
+            if len(return_keys) == 1:
+                return_columns = [(return_keys[0], metric.name)]
+            else:
+                return_columns = [(key, f"{metric.name}.{key}") for key in return_keys]
+
+            # only call the decoder if the aggregation class has a specific one
+            decode = None
+            if type(metric)._decode_metric_value is not Aggregation._decode_metric_value:
+                decode = metric._decode_metric_value
+
+            self.metrics.append((metric.name, return_columns, decode))
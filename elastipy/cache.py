@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Mapping
+
+
+__all__ = ("ResponseCache", "MemoryCache", "DirectoryCache")
+
+
+class ResponseCache:
+    """
+    Base class for caches of search responses.
+
+    A cache can be passed to a :link:`Search` to skip the request
+    to elasticsearch if an identical request has been made before.
+
+    Derived classes need to implement ``_get``, ``_set``, ``_clear`` and ``__len__``.
+    """
+
+    def __init__(
+            self,
+            max_size: Optional[int] = None,
+            ttl: Optional[float] = None,
+    ):
+        """
+        :param max_size: ``int``
+            Maximum number of responses to store. When exceeded, the
+            least recently used responses are removed.
+
+        :param ttl: ``float``
+            Time to live of each response in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @classmethod
+    def request_key(cls, request: Mapping, connection: Optional[str] = None) -> str:
+        """
+        Returns a stable hash of the complete search request.
+
+        :param request: ``dict`` as returned by :link:`Search.to_request`
+        :param connection: ``str``
+            Optional identifier of the connection, e.g. the alias,
+            so that equal requests to different clusters are cached separately.
+        :return: ``str``
+        """
+        if connection is not None:
+            request = {"connection": connection, "request": request}
+        data = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the response for the key or None.
+
+        :param key: ``str`` as returned by ``request_key()``
+        :return: ``dict`` or None
+        """
+        with self._lock:
+            response = self._get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def set(self, key: str, response: Mapping) -> None:
+        """
+        Stores a response.
+
+        :param key: ``str`` as returned by ``request_key()``
+        :param response: the complete search response
+        """
+        with self._lock:
+            self._set(key, dict(response))
+
+    def clear(self) -> None:
+        """
+        Removes all responses and resets the statistics.
+        """
+        with self._lock:
+            self._clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the number of ``hits``, ``misses`` and stored responses (``size``).
+
+        :return: ``dict``
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+        }
+
+    def _is_expired(self, timestamp: float) -> bool:
+        return self.ttl is not None and time.time() - timestamp > self.ttl
+
+    def _get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _set(self, key: str, response: dict) -> None:
+        raise NotImplementedError
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-process least-recently-used cache.
+    """
+
+    def __init__(
+            self,
+            max_size: Optional[int] = 100,
+            ttl: Optional[float] = None,
+    ):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        timestamp, response = entry
+        if self._is_expired(timestamp):
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return response
+
+    def _set(self, key: str, response: dict) -> None:
+        self._entries[key] = (time.time(), response)
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+
+
+class DirectoryCache(ResponseCache):
+    """
+    Stores each response as json file in a directory.
+
+    The file modification time is used for expiration and for
+    the least-recently-used eviction. Without ``ttl``, it is
+    updated on each access.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            max_size: Optional[int] = None,
+            ttl: Optional[float] = None,
+    ):
+        """
+        :param path: ``str``
+            The directory, which is created if it does not exist.
+        """
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def __len__(self):
+        return len(self._filenames())
+
+    def _filename(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def _filenames(self):
+        return [
+            os.path.join(self.path, name)
+            for name in os.listdir(self.path)
+            if name.endswith(".json")
+        ]
+
+    def _get(self, key: str) -> Optional[dict]:
+        filename = self._filename(key)
+        try:
+            if self._is_expired(os.path.getmtime(filename)):
+                os.remove(filename)
+                return None
+            with open(filename) as fp:
+                response = json.load(fp)
+        except (IOError, ValueError):
+            return None
+
+        if self.ttl is None:
+            os.utime(filename)
+        return response
+
+    def _set(self, key: str, response: dict) -> None:
+        filename = self._filename(key)
+        # write atomically so concurrent readers never see partial files
+        temp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_filename, "w") as fp:
+            json.dump(response, fp)
+        os.replace(temp_filename, filename)
+
+        if self.max_size is not None:
+            filenames = sorted(self._filenames(), key=os.path.getmtime)
+            for filename in filenames[:max(0, len(filenames) - self.max_size)]:
+                try:
+                    os.remove(filename)
+                except IOError:
+                    pass
+
+    def _clear(self) -> None:
+        for filename in self._filenames():
+            os.remove(filename)
@@ -1,9 +1,17 @@
-from typing import Optional, Union, Mapping
+import inspect
+import threading
+import time
+from typing import Optional, Union, Mapping, Sequence, Callable
 
 from elasticsearch import VERSION
 
+from ._json import client_serializer
 
-__all__ = ("get", "set")
+
+__all__ = (
+    "get", "set", "configure", "close_all", "stats",
+    "get_async", "set_async", "configure_async", "close_all_async", "stats_async",
+)
 
 
 if VERSION[0] < 8:
@@ -20,41 +28,255 @@ else:
 
 
 class Connections:
+    """
+    Thread-safe registry of ``elasticsearch.Elasticsearch`` clients.
+
+    Clients defined by parameters are created on first access,
+    exactly once per alias.
+    """
 
     def __init__(self):
         self._parameters = dict()
         self._connections = dict()
+        self._created_at = dict()
+        self._lock = threading.Lock()
+        self._alias_locks = dict()
 
     def get_connection(self, alias: str = "default"):
-        if alias in self._connections:
-            return self._connections[alias]
-
-        if alias in self._parameters:
-            self._connections[alias] = self._create_client(self._parameters[alias])
-            return self._connections[alias]
+        client = self._connections.get(alias)
+        if client is not None:
+            return client
 
-        if alias == "default":
-            self._parameters[alias] = DEFAULT_PARAMS
-            return self.get_connection(alias)
+        with self._alias_lock(alias):
+            # another thread might have created the client in the meantime
+            client = self._connections.get(alias)
+            if client is None:
+                client = self._create_client(self._get_parameters(alias))
+                with self._lock:
+                    self._connections[alias] = client
+                    self._created_at[alias] = time.time()
 
-        raise KeyError(f"No definition for connection alias '{alias}'")
+        return client
 
     def set_connection(self, alias: str, con):
-        if isinstance(con, Mapping):
+        with self._alias_lock(alias), self._lock:
+            if isinstance(con, Mapping):
+                if alias in self._parameters:
+                    if self._parameters[alias] == con:
+                        return
+                self._parameters[alias] = con
+                self._connections.pop(alias, None)
+            else:
+                self._connections[alias] = con
+                self._parameters.pop(alias, None)
+            self._created_at.pop(alias, None)
+
+    def configure(
+            self,
+            alias: str = "default",
+            hosts: Optional[Union[str, Sequence[Union[str, Mapping]]]] = None,
+            maxsize: Optional[int] = None,
+            sniff: Optional[bool] = None,
+            http_compress: Optional[bool] = None,
+            json_loads: Union[bool, Callable, None] = None,
+            **params,
+    ):
+        """
+        Define the parameters of a connection, starting with the
+        default parameters.
+
+        The client is created on the next access of the alias.
+
+        :param alias: ``str`` name of the connection
+
+        :param hosts: ``str`` or ``list``
+            One or several hosts, in any format that the
+            ``Elasticsearch`` client accepts.
+
+        :param maxsize: ``int``
+            The maximum number of connections per host.
+            This is ``maxsize`` for elasticsearch < 8
+            and ``connections_per_node`` for elasticsearch 8.
+
+        :param sniff: ``bool``
+            Sniff the nodes of the cluster on start and on connection failures.
+            More sniffing parameters can be passed in ``params``.
+
+        :param http_compress: ``bool``
+            Enable gzip compression of the request bodies.
+
+        :param json_loads: ``bool`` or ``callable``
+            A function to decode the json responses, e.g. ``orjson.loads``.
+            If ``True``, orjson is used if installed.
+            The function is set as the client's serializer, so it is used
+            by :link:`Search.execute` and all other requests of the client.
+
+        :param params: Any other parameters of the ``Elasticsearch`` client.
+        """
+        params = {**DEFAULT_PARAMS, **params}
+        if hosts is not None:
+            params["hosts"] = hosts
+
+        if maxsize is not None:
+            params["maxsize" if VERSION[0] < 8 else "connections_per_node"] = maxsize
+
+        if sniff is not None:
+            params["sniff_on_start"] = sniff
+            params["sniff_on_connection_fail" if VERSION[0] < 8 else "sniff_on_node_failure"] = sniff
+
+        if http_compress is not None:
+            params["http_compress"] = http_compress
+
+        if json_loads:
+            serializer = client_serializer(json_loads if callable(json_loads) else None)
+            params["serializers"] = {
+                "application/json": serializer,
+                "application/vnd.elasticsearch+json": serializer,
+            }
+            if VERSION[0] < 8:
+                params["serializer"] = serializer
+
+        self.set_connection(alias, params)
+
+    def close_all(self):
+        """
+        Close and remove all clients.
+
+        Clients that have been created from parameters
+        are created again on the next access.
+        """
+        for client in self._pop_connections():
+            close = getattr(client, "close", None)
+            if callable(close):
+                close()
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the state of each connection alias.
+
+        For each alias, a dict with:
+
+            - ``parameters``: bool, True if defined by parameters
+            - ``client``: bool, True if a client exists
+            - ``created_at``: timestamp of the creation from parameters or None
+            - ``hosts``: list of str, all hosts of the connection pool
+            - ``alive``: int, number of alive connections
+            - ``dead``: int, number of dead connections
+
+        The last three are only available if the client has been
+        created and exposes it's connection pool.
+
+        :return: dict of alias -> dict
+        """
+        with self._lock:
+            aliases = list(dict.fromkeys([*self._parameters, *self._connections]))
+            snapshot = {
+                alias: {
+                    "parameters": alias in self._parameters,
+                    "client": alias in self._connections,
+                    "created_at": self._created_at.get(alias),
+                }
+                for alias in aliases
+            }
+            clients = dict(self._connections)
+
+        for alias, client in clients.items():
+            snapshot[alias].update(_pool_stats(client))
+
+        return snapshot
+
+    def _alias_lock(self, alias: str) -> threading.Lock:
+        with self._lock:
+            if alias not in self._alias_locks:
+                self._alias_locks[alias] = threading.Lock()
+            return self._alias_locks[alias]
+
+    def _get_parameters(self, alias: str) -> Mapping:
+        with self._lock:
             if alias in self._parameters:
-                if self._parameters[alias] == con:
-                    return
-            self._parameters[alias] = con
-            self._connections.pop(alias, None)
-        else:
-            self._connections[alias] = con
-            self._parameters.pop(alias, None)
+                return self._parameters[alias]
+
+            if alias == "default":
+                self._parameters[alias] = DEFAULT_PARAMS
+                return DEFAULT_PARAMS
+
+        raise KeyError(f"No definition for connection alias '{alias}'")
+
+    def _pop_connections(self) -> list:
+        with self._lock:
+            clients = list(self._connections.values())
+            self._connections.clear()
+            self._created_at.clear()
+        return clients
 
     def _create_client(self, params):
         from elasticsearch import Elasticsearch
         return Elasticsearch(**params)
 
 
+class AsyncConnections(Connections):
+    """
+    Registry of ``elasticsearch.AsyncElasticsearch`` clients.
+    """
+
+    async def close_all(self):
+        """
+        Close and remove all clients.
+
+        Clients that have been created from parameters
+        are created again on the next access.
+        """
+        for client in self._pop_connections():
+            close = getattr(client, "close", None)
+            if callable(close):
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+
+    def _create_client(self, params):
+        from elasticsearch import AsyncElasticsearch
+        return AsyncElasticsearch(**params)
+
+
+def _pool_stats(client) -> dict:
+    transport = getattr(client, "transport", None)
+
+    # elasticsearch < 8
+    pool = getattr(transport, "connection_pool", None)
+    if pool is not None and hasattr(pool, "connections"):
+        all_connections = getattr(pool, "orig_connections", None) or pool.connections
+        dead = getattr(pool, "dead", None)
+        return {
+            "hosts": [c.host for c in all_connections],
+            "alive": len(pool.connections),
+            "dead": dead.qsize() if dead is not None else 0,
+        }
+
+    # elastic-transport
+    pool = getattr(transport, "node_pool", None)
+    if pool is not None and hasattr(pool, "all"):
+        nodes = pool.all()
+        dead = getattr(pool, "_dead_nodes", None)
+        num_dead = dead.qsize() if dead is not None else 0
+        return {
+            "hosts": [node.base_url for node in nodes],
+            "alive": len(nodes) - num_dead,
+            "dead": num_dead,
+        }
+
+    return {}
+
+
 singleton = Connections()
 get = singleton.get_connection
 set = singleton.set_connection
+configure = singleton.configure
+close_all = singleton.close_all
+stats = singleton.stats
+
+async_singleton = AsyncConnections()
+get_async = async_singleton.get_connection
+set_async = async_singleton.set_connection
+configure_async = async_singleton.configure
+close_all_async = async_singleton.close_all
+stats_async = async_singleton.stats
@@ -1,4 +1,4 @@
-from typing import Sequence, Optional, TextIO
+from typing import Sequence, Optional, TextIO, Tuple, Any
 
 from .console import ColorScale, Characters, get_terminal_size, clip_line
 from .helper import get_number, get_min_max
@@ -13,7 +13,18 @@ class Heatmap:
             colors: bool = True,
             ascii: bool = False,
             value_characters: Sequence[str] = None,
+            coords: Optional[Sequence[Tuple[int, int]]] = None,
+            fill_value: Optional[Any] = None,
     ):
+        """
+        :param keys: the keys of the x and y axis
+        :param values: two-dimensional matrix of values, e.g. ``values[x][y]``
+        :param coords:
+            Optional list of ``(x, y)`` tuples for sparse matrices.
+            In this case, ``values`` is a list with one value for each coordinate.
+        :param fill_value:
+            The value of the cells that are not in ``coords``.
+        """
         self.keys = keys
         self.values = values
         self.width = len(self.keys[0])
@@ -28,7 +39,10 @@ class Heatmap:
             for row in keys
         ]
 
-        min_v, max_v = get_min_max(self.values)
+        if coords is not None and len(coords) < self.width * self.height:
+            min_v, max_v = get_min_max(list(self.values) + [fill_value])
+        else:
+            min_v, max_v = get_min_max(self.values)
         if min_v is None:
             min_v, max_v = 0., 0.
 
@@ -36,13 +50,22 @@ class Heatmap:
         if min_v != max_v:
             fac = 1. / (max_v - min_v)
 
-        self.values_str = [
-            [
-                self.scale((get_number(x) - min_v) * fac) if get_number(x) is not None else " "
-                for x in row
+        def _value_str(x):
+            return self.scale((get_number(x) - min_v) * fac) if get_number(x) is not None else " "
+
+        if coords is not None:
+            fill_str = _value_str(fill_value)
+            self.values_str = [
+                [fill_str] * self.height
+                for _ in range(self.width)
+            ]
+            for (x, y), value in zip(coords, self.values):
+                self.values_str[x][y] = _value_str(value)
+        else:
+            self.values_str = [
+                [_value_str(x) for x in row]
+                for row in self.values
             ]
-            for row in self.values
-        ]
         self.min_v = min_v
         self.max_v = max_v
 
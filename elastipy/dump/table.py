@@ -1,6 +1,6 @@
 import math
 from itertools import chain
-from typing import Mapping, Sequence, Union
+from typing import Mapping, Sequence, Union, Iterable
 from io import StringIO
 from collections import deque
 
@@ -293,6 +293,28 @@ class Table:
             self.headers = all_dict_row_keys(self.rows)
             return
 
+        if isinstance(self.source, Iterable):
+            # any iterable of rows, e.g. the generator of Aggregation.rows().
+            # The column widths depend on all rows, so they are collected here.
+            source = iter(self.source)
+            first_row = next(source, None)
+            if first_row is None:
+                self.rows = []
+                self.headers = []
+            elif isinstance(first_row, Mapping):
+                self.rows = [first_row] + list(source)
+                self.headers = all_dict_row_keys(self.rows)
+            else:
+                self.headers = list(first_row)
+                self.rows = [
+                    {
+                        key: value
+                        for key, value in zip(self.headers, row)
+                    }
+                    for row in source
+                ]
+            return
+
         raise TypeError(f"Invalid source '{type(self.source).__name__}' for Table")
 
     def _spend_extra_width(self, width: dict, extra_width: int, max_width: int = None, recursive=True):
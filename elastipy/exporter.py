@@ -1,11 +1,22 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
 import time
 import sys
-from typing import Iterable, Any, Mapping, Union
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Iterable, Any, Mapping, Union, Optional, Tuple, List, Callable
 
+from elasticsearch import VERSION
 from elasticsearch.exceptions import NotFoundError
-from elasticsearch.helpers import streaming_bulk, bulk
+from elasticsearch.helpers import streaming_bulk, parallel_bulk, bulk, expand_action, BulkIndexError
 
 from . import connections
+from ._json import dumps_bytes
 from .search import Search
 
 
@@ -46,6 +57,7 @@ class Exporter:
             index_prefix: str = None,
             index_postfix: str = None,
             update_index: bool = True,
+            index_state_file: Optional[str] = None,
     ):
         """
         Create a new instance of the exporter.
@@ -63,6 +75,12 @@ class Exporter:
         :param update_index: ``bool``
             If ``True``, the elasticsearch index will be created or updated with
             the current ``MAPPINGS`` before the first export of a document.
+
+        :param index_state_file: ``str``
+            Optional filename of a json file that stores a hash of the ``MAPPINGS``
+            for each created or updated index. Existing indices with the same
+            hash are not updated again in following runs.
+            See :link:`Exporter.prepare_indices`.
         """
         for required_attribute in ("INDEX_NAME", "MAPPINGS"):
             if not getattr(self, required_attribute, None):
@@ -71,7 +89,15 @@ class Exporter:
         self.index_prefix = index_prefix
         self.index_postfix = index_postfix
         self._do_update_index = update_index
+        self._index_state_file = index_state_file
+        # index name -> hash of the mappings, for indices updated by this instance
         self._index_updated = dict()
+        # index name -> hash of the mappings, as stored in the index_state_file
+        self._index_state: Optional[dict] = None
+        self._index_state_changed = False
+        self._index_locks = dict()
+        self._index_locks_lock = threading.Lock()
+        self.stats = ExportStats()
 
     @property
     def client(self):
@@ -178,15 +204,86 @@ class Exporter:
         name = self.index_name()
         try:
             self.client.indices.delete(index=name)
-            self._index_updated.pop(self.index_name(), None)
-            if "*" in name:
-                for key in list(self._index_updated):
-                    if wildcard_match(key, name):
-                        self._index_updated.pop(key)
+            for updated in (self._index_updated, self._get_index_state()):
+                updated.pop(name, None)
+                if "*" in name:
+                    for key in list(updated):
+                        if wildcard_match(key, name):
+                            updated.pop(key)
+            self._index_state_changed = True
+            self._save_index_state()
             return True
         except NotFoundError:
             return False
 
+    def mappings_hash(self) -> str:
+        """
+        Returns a hash of the ``MAPPINGS``.
+
+        :return: str
+        """
+        return hashlib.sha1(
+            json.dumps(self.MAPPINGS, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def prepare_indices(self, indices: Optional[Iterable[str]] = None) -> None:
+        """
+        Update the mappings of existing indices in batches if needed.
+
+        The existing indices are requested with a single ``get_mapping``
+        call. Indices that have been updated with the current ``MAPPINGS``
+        before, by this instance or according to the ``index_state_file``,
+        are skipped. All other indices are updated in batches
+        of ``put_mapping`` calls.
+
+        Indices that do not exist yet are created on the first
+        export of a document. The export itself only updates the
+        indices that it writes to, so calling this method is optional.
+
+        Does nothing if the exporter was created with ``update_index=False``.
+
+        :param indices: ``list of str``
+            The names of the indices. Defaults to ``index_name()``,
+            which, if it contains a wildcard, matches all existing indices
+            of this exporter.
+
+        :return: None
+        """
+        if not self._do_update_index:
+            return
+
+        pattern = ",".join(indices) if indices is not None else self.index_name()
+        if not pattern:
+            return
+        try:
+            existing = list(self.client.indices.get_mapping(index=pattern, ignore_unavailable=True))
+        except NotFoundError:
+            existing = []
+
+        mappings_hash = self.mappings_hash()
+        state = self._get_index_state()
+        outdated = [
+            name for name in existing
+            if self._index_updated.get(name, state.get(name)) != mappings_hash
+        ]
+
+        if outdated:
+            if len(outdated) == len(existing) and indices is None:
+                index_batches = [pattern]
+            else:
+                index_batches = [
+                    ",".join(outdated[i: i + 100])
+                    for i in range(0, len(outdated), 100)
+                ]
+            for index in index_batches:
+                self.client.indices.put_mapping(index=index, body=self.MAPPINGS)
+
+            self._index_state_changed = True
+
+        for name in existing:
+            self._index_updated[name] = mappings_hash
+        self._save_index_state()
+
     def export_list(
             self,
             object_list: Iterable[Any],
@@ -195,6 +292,13 @@ class Exporter:
             verbose: bool = False,
             verbose_total: int = None,
             file=None,
+            parallel: Optional[int] = None,
+            queue_size: Optional[int] = None,
+            processes: Optional[int] = None,
+            ordered: bool = True,
+            adaptive: Union[bool, "AdaptiveChunking"] = False,
+            encoded: bool = False,
+            checkpoint: Union[str, "Checkpoint"] = None,
             **kwargs
     ):
         """
@@ -222,47 +326,405 @@ class Exporter:
         :param file:
             Optional string stream to output verbose info, default is ``stderr``.
 
+        :param parallel: ``int``
+            If larger than zero, the bulk requests are sent by this number
+            of threads. See :link:`Exporter.export_iter`.
+
+        :param queue_size: ``int``
+            The maximum number of chunks that wait for a free thread
+            in ``parallel`` mode. Defaults to the number of threads.
+
+        :param processes: ``int``
+            If larger than zero, the documents are transformed by this
+            number of worker processes. See :link:`Exporter.export_iter`.
+
+        :param ordered: ``bool``
+            Keep the order of the documents when using ``processes``.
+
+        :param adaptive: ``bool`` or :link:`AdaptiveChunking`
+            Adapt the size of the bulk requests.
+            See :link:`Exporter.export_iter`.
+
+        :param encoded: ``bool``
+            Encode the bulk requests directly to NDJSON bytes.
+            See :link:`Exporter.export_iter`.
+
+        :param checkpoint: ``str`` or :link:`Checkpoint`
+            Store the progress and resume from it.
+            See :link:`Exporter.export_iter`.
+
         All other parameters are passed to
         `elasticsearch.helpers.bulk <https://elasticsearch-py.readthedocs.io/en/v7.10.1/helpers.html#elasticsearch.helpers.bulk>`__
 
         :return: ``dict``
             Response of elasticsearch bulk call.
         """
-        def bulk_actions():
-            for object_data in self._verbose_iter(object_list, verbose, verbose_total, file):
+        if parallel or adaptive or encoded or checkpoint is not None:
+            kwargs.setdefault("raise_on_error", True)
+            success, errors = 0, []
+            for ok, item in self.export_iter(
+                    object_list=object_list,
+                    chunk_size=chunk_size,
+                    parallel=parallel,
+                    queue_size=queue_size,
+                    refresh=refresh,
+                    verbose=verbose,
+                    verbose_total=verbose_total,
+                    file=file,
+                    processes=processes,
+                    ordered=ordered,
+                    adaptive=adaptive,
+                    encoded=encoded,
+                    checkpoint=checkpoint,
+                    **kwargs,
+            ):
+                if ok:
+                    success += 1
+                else:
+                    errors.append(item)
+            response = success, errors
+
+        else:
+            response = bulk(
+                client=self.client,
+                actions=self._iter_actions(object_list, verbose, verbose_total, file, processes, ordered, chunk_size),
+                chunk_size=chunk_size,
+                refresh=refresh,
+                **kwargs,
+            )
 
-                es_data_iter = self.transform_document(object_data)
-                if isinstance(es_data_iter, Mapping):
-                    es_data_iter = [es_data_iter]
+        if verbose:
+            # TODO: print error status
+            print(f"{self.__class__.__name__}: exported {response[0]} objects", file=file)
 
-                for es_data in es_data_iter:
-                    object_id = self.get_document_id(es_data)
-                    index_name = self.get_document_index(es_data)
+        return response
 
-                    if index_name not in self._index_updated:
-                        self._update_index(index_name)
+    def export_iter(
+            self,
+            object_list: Iterable[Any],
+            chunk_size: int = 500,
+            parallel: Optional[int] = None,
+            queue_size: Optional[int] = None,
+            refresh: bool = False,
+            verbose: bool = False,
+            verbose_total: int = None,
+            file=None,
+            processes: Optional[int] = None,
+            ordered: bool = True,
+            adaptive: Union[bool, "AdaptiveChunking"] = False,
+            encoded: bool = False,
+            checkpoint: Union[str, "Checkpoint"] = None,
+            **kwargs
+    ) -> Iterable[Tuple[bool, dict]]:
+        """
+        Export a list of objects and yield the result of each elasticsearch document.
 
-                    action = {
-                        "_index": self.get_document_index(es_data),
-                        "_source": es_data,
-                    }
-                    if object_id is not None:
-                        action["_id"] = object_id
+        The running counters of the export are available in
+        :link:`Exporter.stats`.
 
-                    yield action
+        :param object_list: ``sequence of dict``
+            This can be a list or generator of dictionaries, containing the
+            objects that should be exported.
 
-        response = bulk(
-            client=self.client,
-            actions=bulk_actions(),
-            chunk_size=chunk_size,
-            refresh=refresh,
-            **kwargs,
+        :param chunk_size: ``int``
+            Number of objects per bulk request.
+
+        :param parallel: ``int``
+            If larger than zero, the bulk requests are sent by this number
+            of threads using
+            `elasticsearch.helpers.parallel_bulk <https://elasticsearch-py.readthedocs.io/en/v7.10.1/helpers.html#elasticsearch.helpers.parallel_bulk>`__.
+            Otherwise
+            `elasticsearch.helpers.streaming_bulk <https://elasticsearch-py.readthedocs.io/en/v7.10.1/helpers.html#elasticsearch.helpers.streaming_bulk>`__
+            is used.
+
+        :param queue_size: ``int``
+            The maximum number of chunks that wait for a free thread
+            in ``parallel`` mode. Defaults to the number of threads.
+
+        :param refresh: ``bool``
+            if ``True`` require the immediate refresh of the index
+            with each bulk request.
+
+        :param verbose: ``bool``
+            If True print some progress to stderr
+            (using `tqdm <https://pypi.org/project/tqdm/>`__ if present)
+
+        :param verbose_total: ``int``
+            Provide the number of objects for the **verbosity** if
+            ``object_list`` is a generator.
+
+        :param file:
+            Optional string stream to output verbose info, default is ``stderr``.
+
+        :param processes: ``int``
+            If larger than zero, ``transform_document``, ``get_document_id``
+            and ``get_document_index`` are run in this number of worker
+            processes, on chunks of ``chunk_size`` objects.
+
+            The exporter is pickled to the workers once, so changes of
+            it's state in these methods are not visible in the main process.
+            The objects and documents must be picklable.
+            At most two chunks per process are in-flight at the same time.
+
+        :param ordered: ``bool``
+            Keep the order of the documents when using ``processes``.
+            If ``False``, chunks are exported as soon as they are transformed.
+
+        :param adaptive: ``bool`` or :link:`AdaptiveChunking`
+            If enabled, the documents are sent in batches that are limited
+            by a byte budget and a number of documents that grows or shrinks
+            with the latency of the bulk requests. ``chunk_size`` is the
+            initial number of documents and ``max_chunk_bytes`` the byte budget.
+            If an ``AdaptiveChunking`` instance is passed, it's own settings
+            are used and ``max_chunk_bytes`` must not be given.
+
+            Documents rejected with status 429 shrink the batches and are
+            retried with exponential backoff, ``max_retries``, ``initial_backoff``
+            and ``max_backoff`` are supported like in ``streaming_bulk``.
+
+            The current sizing is displayed in the **verbose** output.
+            Can not be combined with ``parallel`` or ``encoded``.
+
+        :param encoded: ``bool``
+            If True, each action line and document is encoded once to json bytes
+            (with `orjson <https://pypi.org/project/orjson/>`__ if installed)
+            and the pre-encoded chunks are sent with the ``bulk`` method of the
+            client, instead of using the bulk helpers.
+            Chunks are limited by ``chunk_size`` and ``max_chunk_bytes``.
+            All other parameters are passed to ``bulk``.
+
+        :param checkpoint: ``str`` or :link:`Checkpoint`
+            A filename or Checkpoint instance to store the progress of the export.
+            If the file contains a checkpoint for this exporter's ``index_name()``,
+            the objects before the stored offset are skipped.
+            The progress is saved about once per second and when the export ends.
+            Failed documents stop the progress at their object, so it is
+            exported again by the next run.
+            Can not be combined with ``processes`` and ``ordered=False``.
+            ``max_retries`` is only supported together with ``adaptive``.
+
+        All other parameters are passed to the bulk helper.
+        ``raise_on_error`` defaults to ``False`` so failed documents are yielded.
+
+        :return: generator of ``(ok: bool, item: dict)`` tuples,
+            one for each elasticsearch document
+        """
+        stats = self.stats = ExportStats()
+        serializer = _get_serializer(self.client)
+
+        if checkpoint is not None:
+            if processes and not ordered:
+                raise ValueError("A checkpoint can not be combined with 'processes' and 'ordered=False'")
+            if kwargs.get("max_retries") and not adaptive:
+                # streaming_bulk yields retried documents out of order
+                raise ValueError(
+                    "A checkpoint can not be combined with 'max_retries', use 'adaptive=True' to retry documents"
+                )
+            if not isinstance(checkpoint, Checkpoint):
+                checkpoint = Checkpoint(checkpoint)
+            checkpoint.load(checkpoint.key or self.index_name())
+            checkpoint._begin()
+
+        def expand(action):
+            action, data = expand_action(action)
+            if data is not None:
+                # serialize the source here to count the bytes,
+                # the bulk helpers pass strings unchanged
+                data = serializer.dumps(data)
+                stats.num_bytes += len(data) if isinstance(data, bytes) else len(data.encode("utf-8"))
+            return action, data
+
+        kwargs.setdefault("raise_on_error", False)
+
+        sizer = None
+        if adaptive:
+            if parallel or encoded:
+                raise ValueError("Adaptive chunk sizing can not be combined with 'parallel' or 'encoded'")
+            max_chunk_bytes = kwargs.pop("max_chunk_bytes", None)
+            if isinstance(adaptive, AdaptiveChunking):
+                if max_chunk_bytes is not None:
+                    raise ValueError(
+                        "'max_chunk_bytes' can not be combined with an AdaptiveChunking instance"
+                        ", pass it to the AdaptiveChunking constructor instead"
+                    )
+                sizer = adaptive
+            else:
+                sizer = AdaptiveChunking(
+                    chunk_size=chunk_size,
+                    max_chunk_bytes=max_chunk_bytes or AdaptiveChunking.DEFAULT_MAX_CHUNK_BYTES,
+                )
+
+        actions = self._iter_actions(
+            object_list, verbose, verbose_total, file, processes, ordered, chunk_size,
+            status=None if sizer is None else sizer.__str__,
+            checkpoint=checkpoint,
         )
-        if verbose:
-            # TODO: print error status
-            print(f"{self.__class__.__name__}: exported {response[0]} objects", file=file)
 
-        return response
+        if encoded:
+            results = self._iter_encoded_bulk(
+                actions,
+                default=getattr(serializer, "default", None),
+                chunk_size=chunk_size,
+                parallel=parallel,
+                queue_size=queue_size,
+                stats=stats,
+                refresh=refresh,
+                **kwargs,
+            )
+        elif sizer is not None:
+            results = self._iter_adaptive_bulk(
+                map(expand, actions),
+                sizer=sizer,
+                stats=stats,
+                refresh=refresh,
+                **kwargs,
+            )
+        elif parallel:
+            results = parallel_bulk(
+                client=self.client,
+                actions=actions,
+                thread_count=parallel,
+                chunk_size=chunk_size,
+                queue_size=queue_size or parallel,
+                expand_action_callback=expand,
+                refresh=refresh,
+                **kwargs,
+            )
+        else:
+            results = streaming_bulk(
+                client=self.client,
+                actions=actions,
+                chunk_size=chunk_size,
+                expand_action_callback=expand,
+                refresh=refresh,
+                **kwargs,
+            )
+
+        try:
+            for ok, item in results:
+                stats.num_docs += 1
+                if not ok:
+                    stats.num_failures += 1
+                if checkpoint is not None:
+                    checkpoint._acknowledge(ok)
+                yield ok, item
+        finally:
+            if checkpoint is not None:
+                checkpoint.save()
+
+    def _iter_actions(
+            self,
+            object_list: Iterable[Any],
+            verbose: bool,
+            verbose_total: int,
+            file,
+            processes: Optional[int] = None,
+            ordered: bool = True,
+            chunk_size: int = 500,
+            status: Optional[Callable[[], str]] = None,
+            checkpoint: Optional["Checkpoint"] = None,
+    ) -> Iterable[dict]:
+        # file sources report the progress in bytes
+        source = object_list if hasattr(object_list, "total_bytes") else None
+
+        start_offset = 0
+        num_objects = 0
+        if checkpoint is not None:
+            # skip the objects that have been exported before
+            start_offset = checkpoint.offset
+            if verbose_total is None:
+                try:
+                    verbose_total = len(object_list)
+                except TypeError:
+                    pass
+            if verbose_total is not None:
+                verbose_total = max(0, verbose_total - start_offset)
+
+            def count_objects(iterable):
+                nonlocal num_objects
+                for object_data in iterable:
+                    num_objects += 1
+                    yield object_data
+
+            object_list = count_objects(islice(object_list, start_offset, None))
+
+        object_list = self._verbose_iter(object_list, verbose, verbose_total, file, status, source)
+        if processes:
+            documents = self._iter_documents_multiprocess(object_list, processes, ordered, chunk_size, start_offset)
+        else:
+            documents = self._iter_documents(object_list, start_offset)
+
+        try:
+            for offset, index_name, object_id, es_data in documents:
+                if self._do_update_index and index_name not in self._index_updated:
+                    self._update_index_once(index_name)
+
+                action = {
+                    "_index": index_name,
+                    "_source": es_data,
+                }
+                if object_id is not None:
+                    action["_id"] = object_id
+
+                if checkpoint is not None:
+                    checkpoint._add_action(offset, object_id)
+
+                yield action
+
+            if checkpoint is not None:
+                checkpoint._set_end_offset(start_offset + num_objects)
+        finally:
+            self._save_index_state()
+
+    def _iter_documents(self, object_list: Iterable[Any], offset: int = 0) -> Iterable[Tuple[int, str, Any, Mapping]]:
+        """
+        Transform the objects and yield ``(object offset, index name, id, document)`` tuples.
+        """
+        for offset, object_data in enumerate(object_list, offset):
+
+            es_data_iter = self.transform_document(object_data)
+            if isinstance(es_data_iter, Mapping):
+                es_data_iter = [es_data_iter]
+
+            for es_data in es_data_iter:
+                object_id = self.get_document_id(es_data)
+                yield offset, self.get_document_index(es_data), object_id, es_data
+
+    def _iter_documents_multiprocess(
+            self,
+            object_list: Iterable[Any],
+            processes: int,
+            ordered: bool,
+            chunk_size: int,
+            offset: int = 0,
+    ) -> Iterable[Tuple[int, str, Any, Mapping]]:
+        iterator = iter(object_list)
+        max_in_flight = processes * 2
+        # the exporter is sent along with each chunk because
+        # the executor's initializer requires python 3.7
+        transform = partial(_transform_chunk, pickle.dumps(self))
+
+        with ProcessPoolExecutor(processes) as executor:
+            pending = deque()
+            while True:
+                # submit chunks until the limit is reached
+                while len(pending) < max_in_flight:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(transform, chunk, offset))
+                    offset += len(chunk)
+
+                if not pending:
+                    break
+
+                if ordered:
+                    yield from pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield from future.result()
 
     def get_index_params(self) -> dict:
         """
@@ -276,19 +738,258 @@ class Exporter:
             "mappings": self.MAPPINGS
         }
 
+    def _iter_encoded_bulk(
+            self,
+            actions: Iterable[dict],
+            chunk_size: int,
+            parallel: Optional[int],
+            queue_size: Optional[int],
+            stats: "ExportStats",
+            default: Optional[Callable] = None,
+            max_chunk_bytes: int = 100 * 1024 * 1024,
+            raise_on_error: bool = False,
+            **kwargs,
+    ) -> Iterable[Tuple[bool, dict]]:
+        def iter_chunks():
+            lines, num_docs, num_bytes = [], 0, 0
+            for action in actions:
+                meta = {"_index": action["_index"]}
+                if "_id" in action:
+                    meta["_id"] = action["_id"]
+                meta = dumps_bytes({"index": meta})
+                source = dumps_bytes(action["_source"], default=default)
+                stats.num_bytes += len(source)
+
+                size = len(meta) + len(source) + 2
+                if num_docs and (num_docs == chunk_size or num_bytes + size > max_chunk_bytes):
+                    yield lines
+                    lines, num_docs, num_bytes = [], 0, 0
+
+                lines.append(meta)
+                lines.append(source)
+                num_docs += 1
+                num_bytes += size
+
+            if lines:
+                yield lines
+
+        if not parallel:
+            chunk_results = (
+                self._send_encoded_chunk(lines, **kwargs)
+                for lines in iter_chunks()
+            )
+        else:
+            chunk_results = self._iter_encoded_chunks_parallel(
+                iter_chunks(), parallel, queue_size or parallel, **kwargs,
+            )
+
+        for results in chunk_results:
+            errors = []
+            for ok, item in results:
+                if not ok:
+                    errors.append(item)
+                yield ok, item
+
+            if errors and raise_on_error:
+                raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+    def _iter_encoded_chunks_parallel(
+            self,
+            chunks: Iterable[List[bytes]],
+            parallel: int,
+            queue_size: int,
+            **kwargs,
+    ) -> Iterable[List[Tuple[bool, dict]]]:
+        with ThreadPoolExecutor(parallel) as executor:
+            pending = deque()
+            for lines in chunks:
+                pending.append(executor.submit(self._send_encoded_chunk, lines, **kwargs))
+                # bounded number of waiting chunks
+                while len(pending) >= parallel + queue_size:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _send_encoded_chunk(self, lines: List[bytes], **kwargs) -> List[Tuple[bool, dict]]:
+        if VERSION[0] < 8:
+            response = self.client.bulk(body=b"\n".join(lines) + b"\n", **kwargs)
+        else:
+            response = self.client.options().bulk(operations=lines, **kwargs)
+        response = getattr(response, "body", response)
+
+        results = []
+        for item in response["items"]:
+            for op_type, op_item in item.items():
+                status = op_item.get("status", 500)
+                results.append((200 <= status < 300, {op_type: op_item}))
+        return results
+
+    def _iter_adaptive_bulk(
+            self,
+            expanded_actions: Iterable[Tuple[dict, Any]],
+            sizer: "AdaptiveChunking",
+            stats: "ExportStats",
+            max_retries: int = 3,
+            initial_backoff: float = 2,
+            max_backoff: float = 600,
+            raise_on_error: bool = False,
+            **kwargs,
+    ) -> Iterable[Tuple[bool, dict]]:
+        batch = []
+        batch_start_bytes = stats.num_bytes
+        for expanded_action in expanded_actions:
+            batch.append(expanded_action)
+            batch_bytes = stats.num_bytes - batch_start_bytes
+            if len(batch) >= sizer.chunk_size or batch_bytes >= sizer.max_chunk_bytes:
+                yield from self._send_adaptive_batch(
+                    batch, batch_bytes, sizer, max_retries, initial_backoff, max_backoff, raise_on_error, **kwargs,
+                )
+                batch = []
+                batch_start_bytes = stats.num_bytes
+
+        if batch:
+            yield from self._send_adaptive_batch(
+                batch, stats.num_bytes - batch_start_bytes,
+                sizer, max_retries, initial_backoff, max_backoff, raise_on_error, **kwargs,
+            )
+
+    def _send_adaptive_batch(
+            self,
+            batch: List[Tuple[dict, Any]],
+            batch_bytes: int,
+            sizer: "AdaptiveChunking",
+            max_retries: int,
+            initial_backoff: float,
+            max_backoff: float,
+            raise_on_error: bool,
+            **kwargs,
+    ) -> Iterable[Tuple[bool, dict]]:
+        # the results are yielded in the order of the batch
+        batch_results = [None] * len(batch)
+        positions = list(range(len(batch)))
+        for attempt in range(max_retries + 1):
+            start_time = time.time()
+            try:
+                results = list(streaming_bulk(
+                    client=self.client,
+                    actions=[batch[pos] for pos in positions],
+                    chunk_size=len(batch),
+                    max_chunk_bytes=sys.maxsize,
+                    expand_action_callback=_expanded_action,
+                    raise_on_error=False,
+                    max_retries=0,
+                    **kwargs,
+                ))
+            except Exception as e:
+                if _status_code(e) != 429 or attempt == max_retries:
+                    raise
+                rejected = positions
+            else:
+                rejected = []
+                for pos, (ok, item) in zip(positions, results):
+                    if not ok and attempt < max_retries and _item_status(item) == 429:
+                        rejected.append(pos)
+                    else:
+                        batch_results[pos] = ok, item
+
+            if not rejected:
+                sizer.update(time.time() - start_time, len(positions), batch_bytes)
+                break
+
+            sizer.reject(len(positions))
+            time.sleep(min(max_backoff, initial_backoff * 2 ** attempt))
+            positions = rejected
+
+        errors = []
+        for ok, item in batch_results:
+            if not ok:
+                errors.append(item)
+            yield ok, item
+
+        if errors and raise_on_error:
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+    def __getstate__(self):
+        # the client, locks and counters stay in this process
+        state = self.__dict__.copy()
+        for key in ("_index_locks", "_index_locks_lock", "stats"):
+            state.pop(key)
+        if not isinstance(state["_client"], str):
+            state["_client"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index_locks = dict()
+        self._index_locks_lock = threading.Lock()
+        self.stats = ExportStats()
+
+    def _update_index_once(self, name: str):
+        """
+        Call _update_index but never concurrently for the same index.
+        """
+        with self._index_locks_lock:
+            lock = self._index_locks.get(name)
+            if lock is None:
+                lock = self._index_locks[name] = threading.Lock()
+
+        with lock:
+            if name not in self._index_updated:
+                self._update_index(name)
+
     def _update_index(self, name):
+        mappings_hash = self.mappings_hash()
         try:
             self.client.indices.get_mapping(index=name)
-            self.client.indices.put_mapping(index=name, body=self.MAPPINGS)
-            self._index_updated[name] = True
-            return
+            # skip indices that are up-to-date according to the index_state_file
+            if self._get_index_state().get(name) != mappings_hash:
+                self.client.indices.put_mapping(index=name, body=self.MAPPINGS)
+                self._index_state_changed = True
         except NotFoundError:
-            pass
-
-        self.client.indices.create(index=name, body=self.get_index_params())
+            self.client.indices.create(index=name, body=self.get_index_params())
+            self._index_state_changed = True
+
+        self._index_updated[name] = mappings_hash
+
+    def _get_index_state(self) -> dict:
+        if self._index_state is None:
+            self._index_state = self._load_index_state()
+        return self._index_state
+
+    def _load_index_state(self) -> dict:
+        if self._index_state_file and os.path.exists(self._index_state_file):
+            with open(self._index_state_file) as fp:
+                return json.load(fp)
+        return dict()
+
+    def _save_index_state(self):
+        if self._index_state_file and self._index_state_changed:
+            state = self._get_index_state()
+            state.update(self._index_updated)
+            # replace the file atomically so a crash can not corrupt it
+            temp_filename = f"{self._index_state_file}.tmp"
+            with open(temp_filename, "w") as fp:
+                json.dump(state, fp, indent=2)
+            os.replace(temp_filename, self._index_state_file)
+            self._index_state_changed = False
 
     @classmethod
-    def _verbose_iter(cls, iter, verbose: bool, count=None, file=None):
+    def _verbose_iter(
+            cls, iter, verbose: bool, count=None, file=None,
+            status: Optional[Callable[[], str]] = None,
+            source=None,
+    ):
+        """
+        Yield the items of ``iter`` and print the progress.
+
+        :param status: optional callable that returns a string
+            which is added to the progress output, at most once per second.
+
+        :param source: optional object with ``total_bytes`` and ``bytes_read``
+            attributes, like the :link:`sources.FileSource`.
+            If ``count`` is not known, the progress is displayed in bytes.
+        """
         if not verbose:
             yield from iter
             return
@@ -296,11 +997,26 @@ class Exporter:
         if file is None:
             file = sys.stderr
 
+        if count is None and source is not None and source.total_bytes:
+            yield from cls._verbose_iter_bytes(iter, verbose, source, file, status)
+            return
+
         # this is just a unittest switch
         if verbose != "simple":
             try:
                 import tqdm
-                yield from tqdm.tqdm(iter, total=count, file=file)
+                progress = tqdm.tqdm(iter, total=count, file=file)
+                if status is None:
+                    yield from progress
+                    return
+
+                last_time = None
+                for item in progress:
+                    ti = time.time()
+                    if last_time is None or ti - last_time >= 1.:
+                        last_time = ti
+                        progress.set_postfix_str(status(), refresh=False)
+                    yield item
                 return
             except ImportError:
                 pass
@@ -316,8 +1032,348 @@ class Exporter:
             ti = time.time()
             if last_time is None or ti - last_time >= 1.:
                 last_time = ti
-                if count:
-                    print(f"{cls.__name__} {i}/{count}", file=file)
-                else:
-                    print(f"{cls.__name__} {i}", file=file)
+                line = f"{cls.__name__} {i}/{count}" if count else f"{cls.__name__} {i}"
+                if status is not None:
+                    line = f"{line} {status()}"
+                print(line, file=file)
             yield item
+
+    @classmethod
+    def _verbose_iter_bytes(cls, iter, verbose: bool, source, file, status: Optional[Callable[[], str]]):
+        progress = None
+        # this is just a unittest switch
+        if verbose != "simple":
+            try:
+                import tqdm
+                progress = tqdm.tqdm(total=source.total_bytes, file=file, unit="B", unit_scale=True)
+            except ImportError:
+                pass
+
+        try:
+            last_time = None
+            for item in iter:
+                if progress is not None:
+                    progress.update(source.bytes_read - progress.n)
+
+                ti = time.time()
+                if last_time is None or ti - last_time >= 1.:
+                    last_time = ti
+                    if progress is not None:
+                        if status is not None:
+                            progress.set_postfix_str(status(), refresh=False)
+                    else:
+                        line = f"{cls.__name__} {source.bytes_read}/{source.total_bytes} bytes"
+                        if status is not None:
+                            line = f"{line} {status()}"
+                        print(line, file=file)
+                yield item
+
+            if progress is not None:
+                progress.update(source.bytes_read - progress.n)
+        finally:
+            if progress is not None:
+                progress.close()
+
+
+class ExportStats:
+    """
+    Running counters of an export, see :link:`Exporter.export_iter`.
+    """
+
+    def __init__(self):
+        self.start_time = time.time()
+        # number of documents acknowledged by elasticsearch, including failures
+        self.num_docs = 0
+        self.num_failures = 0
+        # bytes of the serialized document sources
+        self.num_bytes = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(docs={self.num_docs}, failures={self.num_failures}, "
+            f"bytes={self.num_bytes}, docs/s={self.docs_per_second:.1f}, bytes/s={self.bytes_per_second:.1f})"
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the start of the export"""
+        return time.time() - self.start_time
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.num_docs / max(self.elapsed, 1e-9)
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.num_bytes / max(self.elapsed, 1e-9)
+
+
+class Checkpoint:
+    """
+    The progress of an export, stored in a json file.
+    See :link:`Exporter.export_iter`.
+
+    The file can contain the checkpoints of several exporters,
+    each stored with a ``key`` which defaults to the exporter's
+    ``index_name()``.
+
+    Each checkpoint contains:
+
+        - ``offset``: The number of objects at the start of the ``object_list``
+          for which all documents have been successfully indexed.
+          The offset stops at the first object with a failed document,
+          including rejected (status 429) documents, so the following
+          export starts again at this object.
+        - ``num_docs``: The number of successfully indexed documents
+          of the objects before ``offset``.
+        - ``num_failures``: The number of failed documents in the last export.
+        - ``last_id``: The id of the last document before ``offset``, if defined
+          by ``get_document_id``.
+    """
+
+    def __init__(self, filename: str, key: Optional[str] = None, interval: float = 1.):
+        """
+        :param filename: ``str`` name of the json file
+        :param key: ``str`` optional name of the checkpoint in the file
+        :param interval: ``float``
+            The minimum number of seconds between saving the file during an export.
+        """
+        self.filename = filename
+        self.key = key
+        self.interval = interval
+        self.offset = 0
+        self.num_docs = 0
+        self.num_failures = 0
+        self.last_id = None
+        # (object offset, document id) for each action of the current export
+        self._actions = deque()
+        self._end_offset: Optional[int] = None
+        # offset of the first object with a failed document in the current export
+        self._failed_offset: Optional[int] = None
+        # successful documents of the current object
+        self._object_docs = 0
+        # (object offset, document id) of the last acknowledged action of an incomplete object
+        self._open_action: Optional[Tuple[int, Any]] = None
+        self._last_save_time = 0.
+        if key is not None:
+            self.load()
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.key!r}, offset={self.offset}, docs={self.num_docs}, "
+            f"failures={self.num_failures}, last_id={self.last_id!r})"
+        )
+
+    def load(self, key: Optional[str] = None) -> "Checkpoint":
+        """
+        Load the checkpoint from the file.
+
+        :param key: ``str`` optional new key of the checkpoint
+        :return: self
+        """
+        if key is not None:
+            self.key = key
+        data = self._read().get(self.key) or {}
+        self.offset = data.get("offset", 0)
+        self.num_docs = data.get("num_docs", 0)
+        self.num_failures = data.get("num_failures", 0)
+        self.last_id = data.get("last_id")
+        self._actions.clear()
+        self._end_offset = None
+        self._failed_offset = None
+        self._object_docs = 0
+        self._open_action = None
+        return self
+
+    def save(self) -> None:
+        """
+        Store the checkpoint in the file.
+        """
+        data = self._read()
+        data[self.key] = {
+            "offset": self.offset,
+            "num_docs": self.num_docs,
+            "num_failures": self.num_failures,
+            "last_id": self.last_id,
+        }
+        self._write(data)
+        self._last_save_time = time.time()
+
+    def reset(self) -> None:
+        """
+        Remove the checkpoint from the file, so the next export starts from the beginning.
+        """
+        data = self._read()
+        if data.pop(self.key, None) is not None:
+            self._write(data)
+        self.offset = self.num_docs = self.num_failures = 0
+        self.last_id = None
+
+    def _read(self) -> dict:
+        if os.path.exists(self.filename):
+            with open(self.filename) as fp:
+                return json.load(fp)
+        return dict()
+
+    def _write(self, data: dict):
+        # replace the file atomically so a crash can not corrupt it
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w") as fp:
+            json.dump(data, fp, indent=2, default=str)
+        os.replace(temp_filename, self.filename)
+
+    def _add_action(self, offset: int, document_id: Any):
+        self._actions.append((offset, document_id))
+
+    def _begin(self):
+        # start of an export
+        self.num_failures = 0
+        self._failed_offset = None
+        self._object_docs = 0
+        self._open_action = None
+
+    def _set_end_offset(self, offset: int):
+        self._end_offset = offset
+        if not self._actions:
+            # all actions have been acknowledged before the end was known
+            if self._open_action is not None:
+                self._complete_object(*self._open_action)
+            elif self._failed_offset is None:
+                self.offset = max(self.offset, offset)
+
+    def _complete_object(self, offset: int, document_id: Any):
+        # only a contiguous run of successful objects advances the offset
+        if self._failed_offset is None:
+            self.offset = max(self.offset, offset + 1)
+            self.num_docs += self._object_docs
+            self.last_id = document_id
+            if not self._actions and self._end_offset is not None:
+                self.offset = max(self.offset, self._end_offset)
+        self._object_docs = 0
+        self._open_action = None
+
+    def _acknowledge(self, ok: bool):
+        # the results arrive in the same order as the actions
+        offset, document_id = self._actions.popleft()
+        if ok:
+            self._object_docs += 1
+        else:
+            self.num_failures += 1
+            if self._failed_offset is None:
+                self._failed_offset = offset
+
+        # the object is complete if the next action belongs to another
+        # object or if there are no more actions
+        if self._actions:
+            complete = self._actions[0][0] != offset
+        else:
+            complete = self._end_offset is not None
+
+        if complete:
+            self._complete_object(offset, document_id)
+        else:
+            self._open_action = (offset, document_id)
+
+        if time.time() - self._last_save_time >= self.interval:
+            self.save()
+
+
+class AdaptiveChunking:
+    """
+    Adapts the size of bulk requests, see :link:`Exporter.export_iter`.
+
+    A batch is sent when it contains ``chunk_size`` documents or
+    ``max_chunk_bytes`` bytes of serialized documents.
+
+    After each request, ``chunk_size`` is multiplied by ``grow``
+    if the request took less than half of ``target_latency`` or
+    multiplied by ``shrink`` if it took longer than ``target_latency``.
+    Rejected requests (status 429) also shrink the size.
+    """
+
+    DEFAULT_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+
+    def __init__(
+            self,
+            chunk_size: int = 500,
+            max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+            target_latency: float = 1.,
+            min_chunk_size: int = 1,
+            max_chunk_size: int = 50_000,
+            grow: float = 1.5,
+            shrink: float = .5,
+    ):
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.target_latency = target_latency
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.grow = grow
+        self.shrink = shrink
+        # the last decision, for display
+        self.last_latency: Optional[float] = None
+        self.last_decision: str = "start"
+        self.num_rejections = 0
+
+    def __str__(self):
+        latency = "-" if self.last_latency is None else f"{self.last_latency:.2f}s"
+        return (
+            f"chunk_size={self.chunk_size} latency={latency} "
+            f"{self.last_decision} rejected={self.num_rejections}"
+        )
+
+    def update(self, latency: float, num_docs: int, num_bytes: int):
+        """
+        Adjust the chunk size after a successful bulk request.
+        """
+        self.last_latency = latency
+        if latency > self.target_latency:
+            self._set_chunk_size(min(num_docs, self.chunk_size) * self.shrink, "shrink")
+        elif latency < self.target_latency / 2 and num_docs >= self.chunk_size and num_bytes < self.max_chunk_bytes:
+            self._set_chunk_size(self.chunk_size * self.grow, "grow")
+        else:
+            self.last_decision = "keep"
+
+    def reject(self, num_docs: int):
+        """
+        Shrink the chunk size after a rejected bulk request.
+        """
+        self.num_rejections += 1
+        self._set_chunk_size(min(num_docs, self.chunk_size) * self.shrink, "backoff")
+
+    def _set_chunk_size(self, size: float, decision: str):
+        self.chunk_size = max(self.min_chunk_size, min(self.max_chunk_size, int(size)))
+        self.last_decision = decision
+
+
+# pickled and unpickled exporter of the current worker process
+_worker_exporter: Optional[Tuple[bytes, Exporter]] = None
+
+
+def _transform_chunk(pickled_exporter: bytes, chunk: List[Any], offset: int) -> List[Tuple[int, str, Any, Mapping]]:
+    global _worker_exporter
+    # unpickle the exporter only once per worker
+    if _worker_exporter is None or _worker_exporter[0] != pickled_exporter:
+        _worker_exporter = (pickled_exporter, pickle.loads(pickled_exporter))
+    return list(_worker_exporter[1]._iter_documents(chunk, offset))
+
+
+def _expanded_action(action):
+    return action
+
+
+def _item_status(item: Mapping) -> Optional[int]:
+    for value in item.values():
+        return value.get("status")
+
+
+def _status_code(e: Exception) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if isinstance(status, int):
+        return status
+
+
+def _get_serializer(client):
+    if VERSION[0] < 8:
+        return client.transport.serializer
+    return client.options().transport.serializers.get_serializer("application/json")
@@ -0,0 +1,168 @@
+from typing import Sequence, List, Mapping, Any
+
+from .search import Search, Response
+
+
+__all__ = ("msearch", "MultiSearchError")
+
+
+# search parameters that are supported in the msearch header line
+HEADER_PARAMETERS = (
+    "allow_no_indices", "expand_wildcards", "ignore_unavailable",
+    "preference", "request_cache", "routing", "search_type",
+)
+
+# search query parameters that can be moved to the body
+BODY_PARAMETERS = (
+    "stored_fields", "timeout", "track_scores", "track_total_hits", "version",
+)
+
+# search query parameters that are supported by the msearch endpoint
+# and must therefore be equal for all searches
+URL_PARAMETERS = (
+    "ccs_minimize_roundtrips", "max_concurrent_shard_requests", "pre_filter_shard_size",
+    "rest_total_hits_as_int", "typed_keys",
+)
+
+
+class MultiSearchError(Exception):
+    """
+    Raised by :link:`msearch` if one or more searches failed.
+
+    The ``errors`` attribute maps the index of each failed search
+    to it's error response.
+    """
+
+    def __init__(self, errors: Mapping[int, dict]):
+        self.errors = errors
+        message = "; ".join(
+            f"search #{i}: {error.get('error', error)}"
+            for i, error in errors.items()
+        )
+        super().__init__(f"{len(errors)} search(es) failed: {message}")
+
+
+def msearch(
+        searches: Sequence[Search],
+        client: Any = None,
+        raise_errors: bool = True,
+) -> List[Response]:
+    """
+    Sends multiple searches in one `multi search
+    <https://www.elastic.co/guide/en/elasticsearch/reference/current/search-multi-search.html>`__
+    request and passes each part of the answer to
+    :link:`Search.set_response`.
+
+    .. CODE::
+
+        s1 = Search(index="orders")
+        skus = s1.agg_terms(field="sku")
+        s2 = Search(index="orders")
+        days = s2.agg_date_histogram(calendar_interval="1d")
+
+        msearch([s1, s2])
+        skus.to_dict()
+
+    :param searches: sequence of :link:`Search` instances
+
+    :param client:
+        An ``elasticsearch.Elasticsearch`` compatible object or a connection alias.
+        If omitted, the client of the searches is used, which must be the same
+        for all searches.
+
+    :param raise_errors: ``bool``
+        If ``True``, a :link:`MultiSearchError` is raised if any of the searches
+        failed. The responses of the successful searches are set
+        nevertheless.
+
+    :return: list of :link:`Response`
+        One for each search. The response of a failed search contains
+        the ``error`` and ``status`` fields and is not passed to the search.
+    """
+    if not searches:
+        return []
+
+    version = searches[0].version
+    client = _get_client(searches, client)
+
+    lines = []
+    url_params = None
+    for search in searches:
+        header, body, params = _split_search_request(search)
+        if url_params is None:
+            url_params = params
+        elif params != url_params:
+            raise ValueError(
+                f"The parameters {', '.join(URL_PARAMETERS)} must be equal for all searches"
+                f", got {url_params} and {params}"
+            )
+        lines.append(header)
+        lines.append(body)
+
+    if version > 7:
+        response = client.msearch(searches=lines, **url_params)
+    else:
+        response = client.msearch(body=lines, params=url_params)
+
+    responses = response["responses"]
+    if len(responses) != len(searches):
+        raise ValueError(
+            f"Expected {len(searches)} responses from msearch, got {len(responses)}"
+        )
+
+    errors = dict()
+    ret_responses = []
+    for i, (search, search_response) in enumerate(zip(searches, responses)):
+        if "error" in search_response:
+            errors[i] = search_response
+            ret_responses.append(Response(search_response))
+        else:
+            search.set_response(search_response)
+            ret_responses.append(search.response)
+
+    if errors and raise_errors:
+        raise MultiSearchError(errors)
+
+    return ret_responses
+
+
+def _get_client(searches: Sequence[Search], client: Any):
+    if client is None:
+        clients = {id(s.get_client()) for s in searches}
+        if len(clients) != 1:
+            raise ValueError(
+                "The searches use different clients, please specify the 'client' parameter"
+            )
+        client = searches[0].get_client()
+
+    elif isinstance(client, str):
+        client = Search(client=client).get_client()
+
+    if not hasattr(client, "msearch") or not callable(client.msearch):
+        raise TypeError(
+            f"The client must have a msearch() method, got {type(client).__name__}"
+        )
+    return client
+
+
+def _split_search_request(search: Search):
+    header = dict()
+    if search.get_index():
+        header["index"] = search.get_index()
+
+    body = search.to_body()
+    url_params = dict()
+    query_params = search.param.to_query_params()
+    for key, value in search.param._to_dict("query").items():
+        if key in HEADER_PARAMETERS:
+            header[key] = value
+        elif key in BODY_PARAMETERS:
+            body[key] = value
+        elif key in URL_PARAMETERS:
+            url_params[key] = query_params[key]
+        else:
+            raise ValueError(
+                f"Search parameter '{key}' is not supported by msearch"
+            )
+
+    return header, body, url_params
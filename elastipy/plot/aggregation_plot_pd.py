@@ -236,6 +236,7 @@ class PandasPlotWrapper:
             exclude: Optional[Union[str, Sequence[str]]] = None,
             transpose: bool = False,
             figsize: Tuple[Union[int, float], Union[int, float]] = None,
+            sparse: bool = False,
             **kwargs,
     ):
         """
@@ -306,6 +307,10 @@ class PandasPlotWrapper:
         :param transpose ``bool``
             Transposes the matrix, e.g. exchanges X and Y axis.
 
+        :param sparse: ``bool``
+            Fetches the matrix as sparse DataFrame. It is converted
+            to a dense DataFrame right before plotting.
+
         :param figsize: ``tuple of ints or floats``
             Optional tuple to change the size of the plot when the plotting
             backend is ``matplotlib``.
@@ -324,6 +329,7 @@ class PandasPlotWrapper:
             default=default,
             include=include,
             exclude=exclude,
+            sparse=sparse,
         )
         if replace is not None:
             df.replace(to_replace=replace, inplace=True)
@@ -27,6 +27,7 @@ def heatmap(
     For plotly it's ignored.
 
     :param data: :link:`pandas.DataFrame`
+        A DataFrame with sparse columns is converted to dense columns.
 
     :param figsize: ``tuple of ints or floats``
         Optional tuple to change the size of the plot when the plotting
@@ -39,6 +40,9 @@ def heatmap(
     :return:
         :link:`matplotlib.axes.Axes` Axis object with the heatmap.
     """
+    if is_sparse_frame(data):
+        data = data.sparse.to_dense()
+
     if get_backend() == "matplotlib":
         import matplotlib.pyplot
         import seaborn
@@ -62,3 +66,12 @@ def heatmap(
         raise NotImplementedError(
             f"Plotting backend '{get_backend()}' not supported"
         )
+
+
+def is_sparse_frame(data) -> bool:
+    import pandas as pd
+
+    return isinstance(data, pd.DataFrame) and len(data.columns) > 0 and all(
+        isinstance(dtype, pd.SparseDtype)
+        for dtype in data.dtypes
+    )
@@ -1,4 +1,4 @@
-from copy import copy, deepcopy
+import warnings
 from typing import Sequence, Mapping, Optional, Union
 
 from .query import Query, QueryInterface, factory, factory_from_dict
@@ -7,22 +7,33 @@ from .generated_classes import _Bool
 
 class Bool(_Bool):
 
+    # clauses that do not contribute to the score
+    # and where duplicates have no effect
+    _DEDUPLICATED_CLAUSES = ("filter", "must_not")
+
     def _map_parameters(self, params: Mapping) -> dict:
         params = super()._map_parameters(params)
 
         for key, value in params.items():
             # wrap a single query into a list
             if not isinstance(value, Sequence):
-                params[key] = [value]
+                value = [value]
 
-            for i, v in enumerate(params[key]):
+            queries = []
+            for v in value:
                 if isinstance(v, Query):
-                    pass
+                    queries.append(v)
                 elif isinstance(v, Mapping):
-                    params[key][i] = factory_from_dict(v)
+                    queries.append(factory_from_dict(v))
                 else:
                     raise TypeError(f"{self.__class__.__name__} parameter '{key}' has invalid type {type(v).__name__}"
                                     f", must be Query or dict")
+
+            if key in self._DEDUPLICATED_CLAUSES:
+                # remove duplicate clauses, keeping the order
+                queries = list(dict.fromkeys(queries))
+            params[key] = queries
+
         return params
 
     @property
@@ -58,52 +69,57 @@ class Bool(_Bool):
         self._set_bool_param("filter", value)
 
     def _get_bool_param(self, name):
-        return self.parameters.get(name) or []
+        return list(self._params.get(name) or [])
 
     def _set_bool_param(self, name, value):
-        if value == self._parameters.get(name, {}).get("default"):
-            self.parameters.pop(name, None)
-        else:
-            assert isinstance(value, Sequence), f"Failed in {self} with {name}:{value}"
-            self.parameters[name] = value
+        warnings.warn(
+            f"Setting {self.__class__.__name__}.{name} is deprecated, queries are shared between searches"
+            f", use {self.__class__.__name__}.replace({name}=...) instead",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        self._params = self.replace(**{name: value})._params
+        self._init_dict()
 
     def add_query(self, name, **params) -> 'Bool':
         return self & factory(name, **params)
 
     def __and__(self, other) -> 'Bool':
         if not isinstance(other, Bool):
-            q = copy(self)
-            if other not in q.must:
-                q.must += [other]
-            return q
+            return self.replace(must=_merge_clauses(self.must, [other]))
         else:
             if other.should:
                 return super().__and__(other)
 
-            q = copy(self)
+            params = dict()
             for key in ("must", "must_not", "filter"):
-                for o in getattr(other, key):
-                    if o not in getattr(q, key):
-                        setattr(q, key, getattr(q, key) + [o])
-            return q
+                if getattr(other, key):
+                    params[key] = _merge_clauses(getattr(self, key), getattr(other, key))
+            return self.replace(**params)
 
     def __or__(self, other):
         self_has_and = bool(self.must or self.must_not or self.filter)
 
         if not isinstance(other, Bool):
             if not self_has_and:
-                q = copy(self)
-                if other not in q.should:
-                    q.should += [other]
-                return q
+                return self.replace(should=_merge_clauses(self.should, [other]))
 
         else:
             other_has_and = bool(other.must or other.must_not or other.filter)
             if not self_has_and and not other_has_and:
-                q = copy(self)
-                for sub_q in other.should:
-                    if sub_q not in q.should:
-                        q.should += [sub_q]
-                return q
+                return self.replace(should=_merge_clauses(self.should, other.should))
 
         return super().__or__(other)
+
+
+def _merge_clauses(queries: list, others: list) -> list:
+    """
+    Append the queries of ``others`` that are not already in ``queries``.
+    """
+    existing = set(queries)
+    merged = list(queries)
+    for query in others:
+        if query not in existing:
+            existing.add(query)
+            merged.append(query)
+    return merged
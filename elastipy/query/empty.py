@@ -8,7 +8,7 @@ class EmptyQuery(Query):
     def __init__(self):
         super().__init__()
 
-    def to_dict(self):
+    def _to_dict(self):
         return {
             "match_all": {}
         }
@@ -1,13 +1,21 @@
+import json
 import re
-from copy import copy, deepcopy
+from types import MappingProxyType
 from typing import Mapping, Any
 
 from .generated_interface import QueryInterface
+from .._json import make_json_compatible
 
 
 class Query(QueryInterface):
     """
     Abstract base class for actual queries.
+
+    Queries are immutable. The elasticsearch dict is created once
+    in the constructor and the queries are hashable, so they can
+    be shared between searches, used as dict keys and are
+    deduplicated within the ``filter`` and ``must_not``
+    clauses of a ``bool`` query.
     """
     _factory_class_map = dict()
 
@@ -25,32 +33,83 @@ class Query(QueryInterface):
         than the default values into the 'parameters' attribute.
         :param params: any
         """
-        self.parameters = self._map_parameters(params)
+        self._params = self._map_parameters(params)
         if not self.name:
             raise TypeError(
                 f"Can not create Query instances directly, use one of the derived classes"
             )
+        self._init_dict()
+
+    def _init_dict(self):
+        self._dict = self._to_dict()
+        self._json_dict = None
+        # nested queries are hashed by their pre-computed hash
+        children = {
+            id(child._dict): child
+            for child in _iter_child_queries(self._params.values())
+        }
+        try:
+            self._hash = hash(_freeze(self._dict, children))
+        except TypeError:
+            self._hash = hash(json.dumps(self._dict, sort_keys=True, default=str))
+
+    @property
+    def parameters(self) -> Mapping:
+        """
+        Read-only mapping of the parameters that are required
+        or are different than the default values.
+        """
+        return MappingProxyType(self._params)
 
     def __repr__(self):
-        params = self.parameters
+        params = self._params
         params = ", ".join(f"{key}={repr(value)}" for key, value in params.items())
         return f"{self.__class__.__name__}({params})"
 
     def __copy__(self):
-        params = deepcopy(self.parameters)
-        return self.__class__(**params)
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        # the hash of strings differs between processes
+        return {"_params": self._params}
+
+    def __setstate__(self, state):
+        self._params = state["_params"]
+        self._init_dict()
+
+    def __hash__(self):
+        return self._hash
 
     def __eq__(self, other):
-        if isinstance(other, Mapping):
-            dic = other
-        elif isinstance(other, Query):
-            dic = other.to_dict()
-        else:
-            return False
-        return self.to_dict() == dic
+        if isinstance(other, Query):
+            return self is other or (self._hash == other._hash and self._dict == other._dict)
+        elif isinstance(other, Mapping):
+            return self._dict == other
+        return False
 
     def copy(self):
-        return self.__copy__()
+        """
+        Queries are immutable, so this returns the query itself.
+        """
+        return self
+
+    def replace(self, **params) -> 'Query':
+        """
+        Return a new query with some parameters replaced.
+
+        .. CODE::
+
+            q = query.Term("field", "a")
+            q.replace(value="b")  # Term(field='field', value='b')
+
+        :param params: any parameters of the query.
+            Parameters set to their default value are removed.
+        :return: new Query instance
+        """
+        return self.__class__(**{**self._params, **params})
 
     @classmethod
     def from_dict(cls, params: Mapping) -> 'Query':
@@ -83,14 +142,35 @@ class Query(QueryInterface):
 
         return cls(**params)
 
-    def to_dict(self):
+    def to_dict(self) -> dict:
+        """
+        Returns the elasticsearch compatible dict.
+
+        The dict is created once and the same instance is returned on every call
+        and shared by all searches that use this query. It must not be modified.
+        Use ``replace()`` to create a changed query or ``copy.deepcopy()``
+        to get a modifiable dict.
+
+        :return: dict
+        """
+        return self._dict
+
+    def _to_json_compatible(self) -> dict:
+        """
+        Returns the json compatible version of ``to_dict()``, created on first use.
+        """
+        if self._json_dict is None:
+            self._json_dict = make_json_compatible(self._dict)
+        return self._json_dict
+
+    def _to_dict(self) -> dict:
         dic = dict()
         write_dic = dic
         if self._top_level_parameter:
-            value = self.parameters[self._top_level_parameter]
+            value = self._params[self._top_level_parameter]
             write_dic = dic[value] = dict()
 
-        for key, value in self.parameters.items():
+        for key, value in self._params.items():
             if key != self._top_level_parameter:
                 write_dic[key] = value_to_dict(value)
         return {self.name: dic}
@@ -103,8 +183,9 @@ class Query(QueryInterface):
         return factory(name, **params)
 
     def _map_parameters(self, params: Mapping) -> dict:
+        # containers are copied, so the caller can not change the query afterwards
         return {
-            key: self._map_parameter(key, value)
+            key: self._map_parameter(key, _copy_value(value))
             for key, value in params.items()
             if self._parameters.get(key, {}).get("required") or value != self._parameters.get(key, {}).get("default")
         }
@@ -113,6 +194,16 @@ class Query(QueryInterface):
         return value
 
 
+def _copy_value(value):
+    if isinstance(value, dict):
+        return {key: _copy_value(v) for key, v in value.items()}
+    elif isinstance(value, list):
+        return [_copy_value(v) for v in value]
+    elif isinstance(value, tuple):
+        return tuple(_copy_value(v) for v in value)
+    return value
+
+
 def value_to_dict(value):
     if hasattr(value, "to_dict"):
         return value.to_dict()
@@ -121,6 +212,31 @@ def value_to_dict(value):
     return value
 
 
+def _iter_child_queries(values):
+    for value in values:
+        if isinstance(value, Query):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            yield from _iter_child_queries(value)
+
+
+def _freeze(value, children: Mapping[int, Query]):
+    """
+    Convert the dict to a hashable representation.
+
+    The dicts of nested queries are replaced by the queries themselves,
+    which hash to the same value without walking the dict again.
+    """
+    if isinstance(value, Mapping):
+        child = children.get(id(value))
+        if child is not None:
+            return child
+        return frozenset((key, _freeze(v, children)) for key, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v, children) for v in value)
+    return value
+
+
 def factory(name, **params) -> Query:
     """
     Creates an instance of the matching Query sub-class
@@ -15,13 +15,13 @@ __all__ = (
 
 class Terms(_Terms):
 
-    def to_dict(self):
+    def _to_dict(self):
         # the 'field' parameter is not mentioned by key but by actual value
         dic = {
-            self.parameters["field"]: self.parameters["value"]
+            self._params["field"]: self._params["value"]
         }
-        if self.parameters.get("boost"):
-            dic["boost"] = self.parameters["boost"]
+        if self._params.get("boost"):
+            dic["boost"] = self._params["boost"]
 
         return {self.name: dic}
 
@@ -1,14 +1,18 @@
+import inspect
 import json
+from concurrent.futures import Executor
 from copy import copy, deepcopy
-from typing import Optional, Union, Mapping, Callable, Sequence, List, Any
+from typing import Optional, Union, Mapping, Callable, Sequence, List, Any, Iterable
 
 from elasticsearch import Elasticsearch, VERSION as ES_VERSION
 
 
 from . import connections
 from .aggregation import Aggregation, AggregationInterface, factory as agg_factory
+from .aggregation.helper import strip_typed_keys
 from .query import QueryInterface, EmptyQuery, Query
-from ._json import make_json_compatible
+from ._json import make_json_compatible, loads as json_loads
+from .cache import ResponseCache
 
 
 class Search(QueryInterface, AggregationInterface):
@@ -24,14 +28,17 @@ class Search(QueryInterface, AggregationInterface):
             index: str = None,
             client: Union[str, Callable, Elasticsearch, Any, None] = None,
             timestamp_field: str = "timestamp",
-            version: Optional[int] = None
+            version: Optional[int] = None,
+            cache: Optional[ResponseCache] = None,
     ):
         """
         Create a new Search instance.
 
         :param index: str, optional index name/pattern, can also be set later via index()
         :param client:
-            Can be an ``elasticsearch.Elasticsearch`` instance.
+            Can be an ``elasticsearch.Elasticsearch`` instance
+            or an ``elasticsearch.AsyncElasticsearch`` instance
+            for :link:`Search.execute_async`.
 
             If None, then ``elastipy.connections.get("default")`` is used.
 
@@ -48,6 +55,11 @@ class Search(QueryInterface, AggregationInterface):
             optionally sets the elasticsearch server major version for which
             the request is constructed. Default is the major version of
             the installed ``elasticsearch-py`` package.
+
+        :param cache: ``elastipy.cache.ResponseCache``
+            Optional cache for the responses. If the same request has been
+            executed before, the cached response is used instead of
+            sending the request. See :link:`Search.cache`.
         """
         from .query import Query
         from .generated_search_param import SearchParameters
@@ -56,10 +68,13 @@ class Search(QueryInterface, AggregationInterface):
         self._version = version
         self._index = index
         self._client = client
+        self._cache = cache
         self._parameters = SearchParameters(self)
         self._query: Query = EmptyQuery()
         self._aggregations = []
         self._body = dict()
+        # the normalized body, until the search is changed
+        self._body_cache: Optional[dict] = None
         self._highlighters = dict()
         self._response: Optional[Response] = None
 
@@ -79,6 +94,8 @@ class Search(QueryInterface, AggregationInterface):
             params["timestamp"] = self.timestamp_field
         if self._version:
             params["version"] = self._version
+        if self._cache is not None:
+            params["cache"] = self._cache
 
         params = ", ".join(
             f"{key}={repr(value)}"
@@ -119,60 +136,66 @@ class Search(QueryInterface, AggregationInterface):
 
         return client
 
+    def get_async_client(self):
+        """
+        Return current client for :link:`Search.execute_async`.
+
+        If the client is None or a string, the connection is taken
+        from ``elastipy.connections.get_async()``.
+        """
+        client = self._client
+        if client is None:
+            client = connections.get_async()
+        elif isinstance(client, str):
+            client = connections.get_async(client)
+
+        return client
+
     def copy(self) -> "Search":
         """
-        Make a copy of this instance and it's queries.
+        Make a copy of this instance, it's queries and aggregations.
 
-        .. WARNING::
-            Copying of Aggregations is currently not supported so
-            aggregations must be added at the last step, after all queries are applied.
+        The immutable query is shared with the copy.
+        The aggregation tree is copied structurally and the
+        parameters of the aggregations are shared with the copy.
+        The response is not copied.
 
         :return: a new Search instance
         """
-        if self._aggregations:
-            raise NotImplementedError(
-                "Sorry, but copying of aggregations is currently not supported. "
-                "Please make all the queries before adding aggregations"
-            )
-
         es = self.__class__(
             index=self._index,
             client=self._client,
             timestamp_field=self.timestamp_field,
             version=self.version,
+            cache=self._cache,
         )
         es._body = deepcopy(self._body)
-        es._query = self._query.copy()
+        es._query = self._query
         es._parameters._params = deepcopy(self._parameters._params)
         es._highlighters = deepcopy(self._highlighters)
+
+        # parents are always added before their children
+        agg_map = dict()
+        for agg in self._aggregations:
+            parent = agg_map[id(agg.parent)] if agg.parent else None
+            agg_map[id(agg)] = agg_copy = agg._copy(es, parent)
+            es._aggregations.append(agg_copy)
+
         return es
 
     def to_body(self) -> dict:
         """
         Returns the complete body of the search request
 
+        The body is cached until the search is changed.
+        The returned dict is a shallow copy, nested values
+        must not be modified.
+
         :return: dict
         """
-        body = copy(self._body)
-
-        body["query"] = self._query.to_dict()
-
-        param_dict = self._parameters.to_body()
-        if param_dict:
-            body.update(param_dict)
-
-        if self._highlighters:
-            hl = dict()
-            for key, value in self._highlighters.items():
-                if key == "*global*":
-                    hl.update(value)
-                else:
-                    if "fields" not in hl:
-                        hl["fields"] = dict()
-                    hl["fields"][key] = value
-            body["highlight"] = hl
-
-        return make_json_compatible(body)
+        if self._body_cache is None:
+            self._body_cache = self._build_body()
+        return copy(self._body_cache)
 
     def to_request(self) -> dict:
         """
@@ -201,12 +224,17 @@ class Search(QueryInterface, AggregationInterface):
 
         :return: Response, a dict wrapper with some convenience methods
         """
+        request = self.to_request()
+        cache_key = self._cache_key(request)
+        if cache_key and self._use_cached_response(cache_key):
+            return self._response
+
         client = self.get_client()
 
         if callable(client):
-            response = client(**self.to_request())
+            response = client(**request)
         elif hasattr(client, "search") and callable(client.search):
-            response = client.search(**self.to_request())
+            response = client.search(**request)
         else:
             raise TypeError(
                 f"The client must have a search() method or must itself be callable, "
@@ -214,8 +242,180 @@ class Search(QueryInterface, AggregationInterface):
             )
 
         self.set_response(response)
+        if cache_key:
+            self._cache.set(cache_key, self._response)
         return self._response
 
+    async def execute_async(self) -> 'Response':
+        """
+        Sends the search against the current asynchronous client and returns the response.
+
+        If no client is specified, ``elastipy.connections.get_async("default")`` will be used,
+        which is an ``elasticsearch.AsyncElasticsearch`` instance.
+
+        The client can also be a callable or coroutine function, which get's the whole
+        ``to_request`` as parameters.
+
+        .. CODE::
+
+            responses = await asyncio.gather(*(
+                s.execute_async() for s in searches
+            ))
+
+        :return: Response, a dict wrapper with some convenience methods
+        """
+        request = self.to_request()
+        cache_key = self._cache_key(request)
+        if cache_key and self._use_cached_response(cache_key):
+            return self._response
+
+        client = self.get_async_client()
+
+        if callable(client):
+            response = client(**request)
+        elif hasattr(client, "search") and callable(client.search):
+            response = client.search(**request)
+        else:
+            raise TypeError(
+                f"The client must have a search() method or must itself be callable, "
+                f"got {type(client).__name__}"
+            )
+
+        if inspect.isawaitable(response):
+            response = await response
+
+        self.set_response(response)
+        if cache_key:
+            self._cache.set(cache_key, self._response)
+        return self._response
+
+    def scan(
+            self,
+            page_size: int = 1000,
+            keep_alive: str = "1m",
+            method: Optional[str] = None,
+            slices: Optional[int] = None,
+            executor: Union[str, Executor] = "thread",
+            max_workers: Optional[int] = None,
+            ordered: bool = False,
+    ) -> Iterable[dict]:
+        """
+        Iterates lazily through all hits of the search, page by page.
+
+        Other than ``execute()``, the number of documents is not limited by
+        the ``size`` or ``from`` parameters and only one page of hits is
+        held in memory at a time. The search may contain aggregations
+        but they are not requested, use ``execute()`` for those.
+
+        .. CODE::
+
+            for hit in Search(index="documents").scan(page_size=5000):
+                print(hit["_id"], hit["_source"])
+
+        :param page_size: ``int``
+            Number of documents per request.
+
+        :param keep_alive: ``str``
+            Time to keep the search context alive between two requests, e.g. ``"1m"``.
+
+        :param method: ``str``
+            - ``"pit"`` to use a `point in time
+              <https://www.elastic.co/guide/en/elasticsearch/reference/current/point-in-time-api.html>`__
+              with ``search_after``
+            - ``"scroll"`` to use the `scroll
+              <https://www.elastic.co/guide/en/elasticsearch/reference/current/paginate-search-results.html#scroll-search-results>`__
+              api
+            - ``None`` to use a point in time if supported by the client
+              and fall back to scrolling otherwise.
+
+            The point in time or scroll context is released when the
+            iteration is finished or the generator is closed.
+
+        :param slices: ``int``
+            If larger than 1, the search is split into this number of
+            `slices <https://www.elastic.co/guide/en/elasticsearch/reference/current/paginate-search-results.html#slice-scroll>`__
+            which are requested in parallel. The hits of all slices are
+            merged into the returned generator.
+
+            Each slice is built via :link:`Search.slice`. Like the
+            unsliced scan, the slices do not request the aggregations
+            of the search.
+
+        :param executor: ``str`` or ``concurrent.futures.Executor``
+            The pool to request the slices, either ``"thread"``, ``"process"``
+            or an executor instance.
+
+            To use a process pool, the client of the search must be
+            a connection alias or ``None``, because the requests are
+            sent from the worker processes.
+
+        :param max_workers: ``int``
+            Number of threads or processes if ``executor`` is a string.
+            Defaults to the number of slices.
+
+        :param ordered: ``bool``
+            If ``True``, the pages of all slices are yielded in a
+            fixed round-robin order, otherwise in the order of arrival.
+
+        :return: generator of hit dicts
+        """
+        from .search_scan import SearchScan
+        yield from SearchScan(
+            self,
+            page_size=page_size,
+            keep_alive=keep_alive,
+            method=method,
+            slices=slices,
+            executor=executor,
+            max_workers=max_workers,
+            ordered=ordered,
+        )
+
+    def iter_composite(self, aggregation: Union[str, Aggregation, None] = None) -> Iterable["Search"]:
+        """
+        Executes the search repeatedly to iterate through all pages of a
+        ``composite`` aggregation.
+
+        Each page is requested with the ``after_key`` of the previous
+        response. Only the current page's response is kept.
+
+        .. CODE::
+
+            s = Search()
+            agg = s.agg_composite(sources=[{"sku": {"terms": {"field": "sku"}}}], size=1000)
+            for page in s.iter_composite():
+                for key, value in agg.items():
+                    ...
+
+        :param aggregation: ``str`` or ``Aggregation``
+            The composite aggregation or it's name. Can be omitted if the
+            search contains only one root composite aggregation.
+
+        :return: generator of self, one per page
+        """
+        if aggregation is None:
+            candidates = [
+                a for a in self._aggregations
+                if not a.parent and a.type == "composite"
+            ]
+            if len(candidates) != 1:
+                raise ValueError(
+                    f"Expected exactly one root composite aggregation, found {len(candidates)}"
+                    f", please specify the 'aggregation' parameter"
+                )
+            aggregation = candidates[0]
+
+        elif isinstance(aggregation, str):
+            for a in self._aggregations:
+                if a.name == aggregation:
+                    aggregation = a
+                    break
+            else:
+                raise ValueError(f"Aggregation '{aggregation}' not found")
+
+        for _ in aggregation.iter_composite_pages():
+            yield self
+
     @property
     def response(self) -> 'Response':
         """
@@ -241,6 +441,27 @@ class Search(QueryInterface, AggregationInterface):
         es._index = index
         return es
 
+    def cache(self, cache: Optional[ResponseCache]) -> "Search":
+        """
+        Replace the response cache.
+
+        The cache key is a hash of the complete :link:`Search.to_request`.
+        Cached responses are passed to :link:`Search.set_response` so all
+        aggregation and printing methods work as usual.
+
+        .. CODE::
+
+            from elastipy.cache import MemoryCache
+
+            s = Search().cache(MemoryCache(max_size=1000, ttl=600))
+
+        :param cache: a ``elastipy.cache.ResponseCache`` instance or None
+        :return: new Search instance
+        """
+        es = self.copy()
+        es._cache = cache
+        return es
+
     def client(self, client):
         """
         Replace the client that will be used for request.
@@ -281,6 +502,26 @@ class Search(QueryInterface, AggregationInterface):
         """
         return self._parameters.size(size)
 
+    def slice(self, id: int, max: int) -> "Search":
+        """
+        Restrict the search to one `slice
+        <https://www.elastic.co/guide/en/elasticsearch/reference/current/paginate-search-results.html#slice-scroll>`__
+        of the documents.
+
+        Sliced searches are used with point in time or scroll requests
+        to consume the documents in parallel. See :link:`Search.scan`.
+
+        :param id: ``int`` the number of the slice, starting at zero
+        :param max: ``int`` the number of slices
+        :return: new Search instance
+        """
+        if not 0 <= id < max:
+            raise ValueError(f"Invalid slice id {id} for {max} slices")
+        es = self.copy()
+        es._body["slice"] = {"id": id, "max": max}
+        es._body_changed()
+        return es
+
     def highlight(
             self,
             *fields: str,
@@ -394,35 +635,114 @@ class Search(QueryInterface, AggregationInterface):
             search=self, name=name, type=aggregation_type, params=params
         )
         self._aggregations.append(agg)
-        self._add_body(f"aggregations.{name}.{aggregation_type}", agg.to_body())
+        agg._attach_body(self._body)
         return agg
 
     agg = aggregation
 
     # -- debugging stuff --
 
-    def set_response(self, response: Mapping):
+    def set_response(
+            self,
+            response: Union[Mapping, bytes, str],
+            loads: Optional[Callable] = None,
+    ):
         """
         Sets the elasticsearch API response.
 
         Use this if you need other means of passing the API response to the Search instance.
 
-        :param response: Mapping, the complete response from /search/ endpoint
+        :param response: Mapping, the complete response from /search/ endpoint.
+            Can also be the raw json ``bytes`` or ``str``,
+            e.g. when the client is a callable that returns the
+            transport's data without decoding.
+
+        :param loads: Optional callable to decode a raw response.
+            Defaults to ``orjson.loads`` if installed or ``json.loads``.
+
+        Responses of requests with ``typed_keys`` enabled are supported.
+        The ``type#name`` keys of the aggregations are renamed to ``name``.
+
         :return: self
         """
-        self._response = Response(**response)
+        if isinstance(response, (bytes, bytearray, memoryview, str)):
+            response = (loads or json_loads)(response)
+
+        if not isinstance(response, Response):
+            response = Response(response)
+
+        aggregations = response.get("aggregations")
+        if aggregations and any("#" in key for key in aggregations):
+            strip_typed_keys(aggregations, [a for a in self._aggregations if not a.parent])
+
+        self._response = response
         for agg in self._aggregations:
             agg._response = self.response
         return self
 
     # -- private impl --
 
+    def _build_body(self) -> dict:
+        body = copy(self._body)
+
+        # the query is converted separately and the result is kept by the query
+        body["query"] = None
+
+        param_dict = self._parameters.to_body()
+        if param_dict:
+            body.update(param_dict)
+
+        if self._highlighters:
+            hl = dict()
+            for key, value in self._highlighters.items():
+                if key == "*global*":
+                    hl.update(value)
+                else:
+                    if "fields" not in hl:
+                        hl["fields"] = dict()
+                    hl["fields"][key] = value
+            body["highlight"] = hl
+
+        body = make_json_compatible(body)
+        if isinstance(self._query, Query):
+            body["query"] = self._query._to_json_compatible()
+        else:
+            body["query"] = make_json_compatible(self._query.to_dict())
+        return body
+
+    def _body_changed(self):
+        self._body_cache = None
+
+    def _cache_key(self, request: dict) -> Optional[str]:
+        if self._cache is not None:
+            return self._cache.request_key(request, connection=self._connection_key())
+
+    def _connection_key(self) -> str:
+        client = self._client
+        if client is None:
+            return "alias:default"
+        if isinstance(client, str):
+            return f"alias:{client}"
+
+        hosts = connections._pool_stats(client).get("hosts")
+        if hosts:
+            return "hosts:" + ",".join(sorted(str(h) for h in hosts))
+        return f"client:{type(client).__name__}:{id(client)}"
+
+    def _use_cached_response(self, key: str) -> bool:
+        response = self._cache.get(key)
+        if response is None:
+            return False
+        self.set_response(response)
+        return True
+
     def _add_body(self, path: Union[str, list], value, override=True):
         if isinstance(path, str):
             ppath = path.split(".")
         else:
             ppath = copy(path)
 
+        self._body_changed()
         body = self._body
         while ppath:
             key = ppath.pop(0)
@@ -0,0 +1,274 @@
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Iterable, Tuple, List, Any, Union
+
+from . import connections
+
+
+class SearchScan:
+    """
+    Iterates lazily through all hits of a :link:`Search`.
+
+    This is not a public API! Use :link:`Search.scan` instead.
+
+    Documents are requested page by page either through a
+    `point in time <https://www.elastic.co/guide/en/elasticsearch/reference/current/point-in-time-api.html>`__
+    with ``search_after`` or through a
+    `scroll <https://www.elastic.co/guide/en/elasticsearch/reference/current/paginate-search-results.html#scroll-search-results>`__
+    context. The context is always released when the iteration
+    is finished or the generator is closed.
+
+    If ``slices`` is larger than one, the pages of each slice are
+    requested in parallel through a ``concurrent.futures`` executor.
+    At most one page per slice is requested at a time.
+    """
+
+    METHODS = ("pit", "scroll")
+
+    def __init__(
+            self,
+            search,
+            page_size: int = 1000,
+            keep_alive: str = "1m",
+            method: Optional[str] = None,
+            slices: Optional[int] = None,
+            executor: Union[str, Executor] = "thread",
+            max_workers: Optional[int] = None,
+            ordered: bool = False,
+    ):
+        from .search import Search
+
+        if method is not None and method not in self.METHODS:
+            raise ValueError(
+                f"Invalid scan method '{method}', expected one of {', '.join(self.METHODS)}"
+            )
+        if isinstance(executor, str) and executor not in ("thread", "process"):
+            raise ValueError(
+                f"Invalid executor '{executor}', expected 'thread', 'process' or an Executor instance"
+            )
+        self.search: Search = search
+        self.page_size = page_size
+        self.keep_alive = keep_alive
+        self.method = method
+        self.slices = slices or 1
+        self.executor = executor
+        self.max_workers = max_workers
+        self.ordered = ordered
+        self.client = search.get_client()
+
+        if self.method is None:
+            self.method = "pit" if callable(getattr(self.client, "open_point_in_time", None)) else "scroll"
+
+        if not hasattr(self.client, "search") or not callable(self.client.search):
+            raise TypeError(
+                f"The client must have a search() method to scan, got {type(self.client).__name__}"
+            )
+
+    def __iter__(self) -> Iterable[dict]:
+        if self.slices > 1:
+            yield from self._iter_sliced()
+            return
+
+        pit_id = self.open()
+        context_ids = set()
+        try:
+            request = self.initial_request(pit_id)
+            while request is not None:
+                hits, request, context_id = fetch_page(
+                    self.client, self.search.version, self.method, request, self.page_size, self.keep_alive,
+                )
+                if context_id:
+                    context_ids.add(context_id)
+                yield from hits
+        finally:
+            self.close(pit_id, context_ids)
+
+    def open(self) -> Optional[str]:
+        """
+        Opens the point in time if required.
+
+        :return: the point in time id or None
+        """
+        if self.method != "pit":
+            return None
+
+        response = self.client.open_point_in_time(
+            index=self.search.get_index(),
+            keep_alive=self.keep_alive,
+        )
+        return response["id"]
+
+    def close(self, pit_id: Optional[str], context_ids: Iterable[str]):
+        """
+        Releases the point in time or all scroll contexts.
+        """
+        if self.method == "pit":
+            # the pit id might change during the search
+            for id in {pit_id, *context_ids} - {None}:
+                if self.search.version > 7:
+                    self.client.close_point_in_time(id=id)
+                else:
+                    self.client.close_point_in_time(body={"id": id})
+        else:
+            for id in context_ids:
+                self.client.clear_scroll(scroll_id=id)
+
+    def initial_request(self, pit_id: Optional[str], search=None) -> dict:
+        """
+        Returns the search request for the first page.
+
+        :param pit_id: the point in time id, if scanning via 'pit' method
+        :param search: optional Search instance to use instead of ``self.search``
+        :return: dict
+        """
+        search = search or self.search
+        request = search.to_request()
+        version = search.version
+
+        req_body = request if version > 7 else request["body"]
+        req_params = request if version > 7 else request["params"]
+
+        # documents only
+        for key in ("aggregations", "aggs", "from"):
+            req_body.pop(key, None)
+
+        req_body["size"] = self.page_size
+
+        if self.method == "pit":
+            request["index"] = None
+            req_body["pit"] = {"id": pit_id, "keep_alive": self.keep_alive}
+            if not req_body.get("sort"):
+                req_body["sort"] = ["_shard_doc"]
+        else:
+            req_params["scroll"] = self.keep_alive
+            if not req_body.get("sort"):
+                req_body["sort"] = ["_doc"]
+
+        return request
+
+    def _iter_sliced(self) -> Iterable[dict]:
+        executor = self.executor
+        if executor == "process":
+            executor = ProcessPoolExecutor
+
+        client = self.client
+        if executor is ProcessPoolExecutor or isinstance(executor, ProcessPoolExecutor):
+            # worker processes use their own connections
+            if not (self.search._client is None or isinstance(self.search._client, str)):
+                raise TypeError(
+                    f"Can not scan in worker processes with client of type "
+                    f"{type(self.search._client).__name__}, please use a connection alias"
+                )
+            client = self.search._client
+
+        own_executor = not isinstance(executor, Executor)
+        if own_executor:
+            if executor == "thread":
+                executor = ThreadPoolExecutor
+            executor = executor(max_workers=self.max_workers or self.slices)
+
+        version = self.search.version
+        futures = dict()
+        context_ids = set()
+
+        def _submit(slice_id, request):
+            futures[slice_id] = executor.submit(
+                fetch_page, client, version, self.method, request, self.page_size, self.keep_alive,
+            )
+
+        def _result(slice_id):
+            hits, request, context_id = futures.pop(slice_id).result()
+            if context_id:
+                context_ids.add(context_id)
+            # request the next page before the hits are consumed
+            if request is not None:
+                _submit(slice_id, request)
+            return hits
+
+        pit_id = self.open()
+        try:
+            for i in range(self.slices):
+                _submit(i, self.initial_request(pit_id, self.search.slice(i, self.slices)))
+
+            while futures:
+                if self.ordered:
+                    slice_ids = sorted(futures)
+                else:
+                    done, _ = wait(futures.values(), return_when=FIRST_COMPLETED)
+                    slice_ids = [i for i, f in futures.items() if f in done]
+
+                for slice_id in slice_ids:
+                    yield from _result(slice_id)
+
+        finally:
+            # wait for pending requests to release their contexts as well
+            for future in futures.values():
+                if not future.cancel():
+                    try:
+                        context_id = future.result()[2]
+                        if context_id:
+                            context_ids.add(context_id)
+                    except Exception:
+                        pass
+
+            self.close(pit_id, context_ids)
+
+            if own_executor:
+                executor.shutdown()
+
+
+def fetch_page(
+        client: Any,
+        version: int,
+        method: str,
+        request: dict,
+        page_size: int,
+        keep_alive: str,
+) -> Tuple[List[dict], Optional[dict], Optional[str]]:
+    """
+    Requests a single page of hits.
+
+    :param client: an ``elasticsearch.Elasticsearch`` compatible object,
+        a connection alias or None for the default connection
+    :param version: elasticsearch major version of the request
+    :param method: "pit" or "scroll"
+    :param request: the request as returned by ``SearchScan.initial_request``
+        or by the previous call to this function
+    :param page_size: the number of requested hits
+    :param keep_alive: time to keep the search context alive
+    :return: tuple of
+        - list of hits
+        - request for the next page or None if finished
+        - point in time or scroll id
+    """
+    if client is None or isinstance(client, str):
+        client = connections.get(client or "default")
+
+    if method == "pit":
+        response = client.search(**request)
+        hits = response["hits"]["hits"]
+        context_id = response.get("pit_id")
+
+        next_request = None
+        if len(hits) >= page_size:
+            next_request = dict(request)
+            if version > 7:
+                body = next_request
+            else:
+                body = next_request["body"] = dict(request["body"])
+            body["search_after"] = hits[-1]["sort"]
+            if context_id:
+                body["pit"] = {**body["pit"], "id": context_id}
+
+    else:
+        if "scroll_id" in request:
+            response = client.scroll(**request)
+        else:
+            response = client.search(**request)
+        hits = response["hits"]["hits"]
+        context_id = response.get("_scroll_id")
+
+        next_request = None
+        if hits and context_id:
+            next_request = {"scroll_id": context_id, "scroll": keep_alive}
+
+    return hits, next_request, context_id
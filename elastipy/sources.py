@@ -0,0 +1,223 @@
+"""
+Streaming file sources that can be passed as ``object_list``
+to :link:`Exporter.export_list`.
+
+.. CODE::
+
+    from elastipy import sources
+
+    MyExporter().export_list(sources.ndjson("documents.ndjson"), verbose=True)
+
+Uncompressed files are read through a memory map, so only the
+currently parsed line is copied into python memory.
+Gzip compressed files are decompressed while reading.
+
+Each source has the attributes ``total_bytes`` and ``bytes_read``
+which are used for the progress output of the exporter.
+"""
+import csv as _csv
+import gzip
+import mmap
+import os
+from typing import Optional, Mapping, Callable, Iterable, Any, Union
+
+from ._json import loads as json_loads
+
+
+__all__ = ("FileSource", "NdjsonSource", "CsvSource", "ndjson", "ndjson_gz", "csv", "csv_gz")
+
+
+class FileSource:
+    """
+    Base class of the file sources.
+
+    Iterating the source yields the parsed objects, the file
+    is opened again for each iteration.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], compression: Optional[str] = "infer"):
+        """
+        :param path: ``str`` the filename
+
+        :param compression: ``str``
+            ``"gzip"``, ``None`` or ``"infer"`` to use gzip
+            if the filename ends with ``.gz``
+        """
+        if compression == "infer":
+            compression = "gzip" if str(path).endswith(".gz") else None
+        if compression not in (None, "gzip"):
+            raise ValueError(f"Unsupported compression '{compression}'")
+
+        self.path = path
+        self.compression = compression
+        # size of the file, compressed size for gzip files
+        self.total_bytes: int = os.path.getsize(path)
+        # current position in the file
+        self.bytes_read: int = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({str(self.path)!r})"
+
+    def __iter__(self) -> Iterable[Any]:
+        self.bytes_read = 0
+        return self._iter_objects(self._iter_lines())
+
+    def _iter_objects(self, lines: Iterable[bytes]) -> Iterable[Any]:
+        raise NotImplementedError
+
+    def _iter_lines(self) -> Iterable[bytes]:
+        """
+        Yields each line including the line break and updates ``bytes_read``.
+        """
+        if self.compression == "gzip":
+            with open(self.path, "rb") as raw_fp:
+                with gzip.GzipFile(fileobj=raw_fp) as fp:
+                    for line in fp:
+                        self.bytes_read = raw_fp.tell()
+                        yield line
+            return
+
+        with open(self.path, "rb") as fp:
+            if not self.total_bytes:
+                return
+
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                pos = 0
+                while pos < size:
+                    end = mm.find(b"\n", pos)
+                    end = size if end < 0 else end + 1
+                    self.bytes_read = end
+                    yield mm[pos:end]
+                    pos = end
+
+
+class NdjsonSource(FileSource):
+    """
+    Yields one object per line of a
+    `newline delimited json <http://ndjson.org/>`__ file.
+
+    Empty lines are skipped.
+    """
+
+    def _iter_objects(self, lines: Iterable[bytes]) -> Iterable[Any]:
+        for line in lines:
+            if line.strip():
+                yield json_loads(line)
+
+
+class CsvSource(FileSource):
+    """
+    Yields one ``dict`` per row of a CSV file.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, os.PathLike],
+            dtypes: Optional[Mapping[str, Callable]] = None,
+            encoding: str = "utf-8",
+            fieldnames: Optional[Iterable[str]] = None,
+            compression: Optional[str] = "infer",
+            **fmtparams,
+    ):
+        """
+        :param path: ``str`` the filename
+
+        :param dtypes: ``dict``
+            Optional mapping of column names to a conversion function,
+            like ``int``, ``float`` or ``datetime.date.fromisoformat``.
+            Empty values of these columns are converted to ``None``.
+
+        :param encoding: ``str`` encoding of the file
+
+        :param fieldnames: ``list of str``
+            The names of the columns. If omitted, the first row is used.
+
+        :param compression: ``str``
+            ``"gzip"``, ``None`` or ``"infer"`` to use gzip
+            if the filename ends with ``.gz``
+
+        :param fmtparams: passed to
+            `csv.reader <https://docs.python.org/3/library/csv.html#csv.reader>`__,
+            e.g. ``delimiter=";"``
+        """
+        super().__init__(path, compression=compression)
+        self.dtypes = dtypes or dict()
+        self.encoding = encoding
+        self.fieldnames = list(fieldnames) if fieldnames is not None else None
+        self.fmtparams = fmtparams
+
+    def _iter_objects(self, lines: Iterable[bytes]) -> Iterable[dict]:
+        encoding = self.encoding
+        reader = _csv.reader(
+            (str(line, encoding) for line in lines),
+            **self.fmtparams,
+        )
+
+        fieldnames = self.fieldnames
+        if fieldnames is None:
+            fieldnames = next(reader, None)
+            if fieldnames is None:
+                return
+
+        converters = [
+            (i, self.dtypes[name])
+            for i, name in enumerate(fieldnames)
+            if name in self.dtypes
+        ]
+
+        for row in reader:
+            if not row:
+                continue
+            for i, convert in converters:
+                if i < len(row):
+                    value = row[i]
+                    row[i] = convert(value) if value != "" else None
+            yield dict(zip(fieldnames, row))
+
+
+def ndjson(path: Union[str, os.PathLike], compression: Optional[str] = "infer") -> NdjsonSource:
+    """
+    Stream the objects of a newline delimited json file.
+
+    See :link:`NdjsonSource`.
+    """
+    return NdjsonSource(path, compression=compression)
+
+
+def ndjson_gz(path: Union[str, os.PathLike]) -> NdjsonSource:
+    """
+    Stream the objects of a gzip compressed newline delimited json file.
+
+    See :link:`NdjsonSource`.
+    """
+    return NdjsonSource(path, compression="gzip")
+
+
+def csv(
+        path: Union[str, os.PathLike],
+        dtypes: Optional[Mapping[str, Callable]] = None,
+        encoding: str = "utf-8",
+        compression: Optional[str] = "infer",
+        **kwargs,
+) -> CsvSource:
+    """
+    Stream the rows of a CSV file as dicts.
+
+    See :link:`CsvSource` for all parameters.
+    """
+    return CsvSource(path, dtypes=dtypes, encoding=encoding, compression=compression, **kwargs)
+
+
+def csv_gz(
+        path: Union[str, os.PathLike],
+        dtypes: Optional[Mapping[str, Callable]] = None,
+        encoding: str = "utf-8",
+        **kwargs,
+) -> CsvSource:
+    """
+    Stream the rows of a gzip compressed CSV file as dicts.
+
+    See :link:`CsvSource` for all parameters.
+    """
+    return CsvSource(path, dtypes=dtypes, encoding=encoding, compression="gzip", **kwargs)
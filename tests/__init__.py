@@ -1,15 +1,21 @@
 from .test_agg_housing import *
+from .test_agg_values import *
 from .test_bool import *
+from .test_cache import *
+from .test_connections import *
 from .test_doc_ext import *
 from .test_doc_helper import *
 from .test_exporter import *
 from .test_generator import *
 from .test_heatmap import *
 from .test_json import *
+from .test_msearch import *
 from .test_query_body import *
 from .test_query_housing import *
 from .test_response import *
 from .test_search import *
 from .test_search_request import *
+from .test_search_scan import *
+from .test_sources import *
 from .test_table import *
 from .test_wildcard import *
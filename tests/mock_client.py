@@ -1,9 +1,75 @@
 import json
+import fnmatch
 
 from elasticsearch.serializer import JSONSerializer
+from elasticsearch.exceptions import NotFoundError
 from elasticsearch import VERSION
 
 
+def bulk_response_items(lines: list, fail_ids: set, reject: bool = False) -> list:
+    items = []
+    iter_lines = iter(lines)
+    for action in iter_lines:
+        op_type, params = next(iter(action.items()))
+        if op_type != "delete":
+            next(iter_lines)
+
+        item = {"_index": params.get("_index"), "_id": params.get("_id"), "status": 201}
+        if reject:
+            item.update({"status": 429, "error": {"type": "es_rejected_execution_exception"}})
+        elif item["_id"] in fail_ids:
+            item.update({"status": 400, "error": {"type": "mapper_parsing_exception"}})
+        items.append({op_type: item})
+    return items
+
+
+class FakeIndicesBase:
+    """
+    Stores the mappings of the created indices
+    and records all calls in ``calls``.
+    """
+    def __init__(self, parent):
+        self.parent = parent
+        # index name -> mappings
+        self.indices = dict()
+        self.calls = []
+
+    def _not_found(self, index):
+        raise NotImplementedError
+
+    def _match(self, index: str, ignore_unavailable: bool = False) -> list:
+        names = []
+        for pattern in index.split(","):
+            if "*" in pattern:
+                names += fnmatch.filter(self.indices, pattern)
+            elif pattern in self.indices:
+                names.append(pattern)
+            elif not ignore_unavailable:
+                raise self._not_found(pattern)
+        return names
+
+    def get_mapping(self, index, ignore_unavailable=False, **kwargs):
+        self.calls.append(("get_mapping", index))
+        return {
+            name: {"mappings": self.indices[name]}
+            for name in self._match(index, ignore_unavailable)
+        }
+
+    def put_mapping(self, index, body, **kwargs):
+        self.calls.append(("put_mapping", index))
+        for name in self._match(index):
+            self.indices[name] = body
+
+    def create(self, index, body, **kwargs):
+        self.calls.append(("create", index))
+        self.indices[index] = body.get("mappings", {})
+
+    def delete(self, index, **kwargs):
+        self.calls.append(("delete", index))
+        for name in self._match(index):
+            self.indices.pop(name)
+
+
 if VERSION[0] == 7:
 
     class MockElasticsearch:
@@ -13,6 +79,10 @@ if VERSION[0] == 7:
             self.indices = FakeIndices(self)
             self.bulk_calls = []
             self.search_calls = []
+            # documents with these ids will fail in bulk requests
+            self.fail_ids = set()
+            # number of following bulk requests that are rejected with status 429
+            self.reject_bulk_calls = 0
 
         def exists(self, index, id):
             return False
@@ -28,9 +98,15 @@ if VERSION[0] == 7:
             ))
 
             return {
-                "items": []
+                "items": bulk_response_items(self.bulk_calls[-1], self.fail_ids, self._reject())
             }
 
+        def _reject(self) -> bool:
+            if self.reject_bulk_calls > 0:
+                self.reject_bulk_calls -= 1
+                return True
+            return False
+
         def dump_bulk(self):
             for i, bc in enumerate(self.bulk_calls):
                 print(f"--- bulk call #{i+1} ---")
@@ -62,16 +138,10 @@ if VERSION[0] == 7:
             self.serializer = JSONSerializer()
 
 
-    class FakeIndices:
-        def __init__(self, parent):
-            self.parent = parent
-            self._mapping = dict()
-
-        def get_mapping(self, *args, **kwargs):
-            return self._mapping
+    class FakeIndices(FakeIndicesBase):
 
-        def put_mapping(self, *args, **kwargs):
-            self._mapping = kwargs["body"]
+        def _not_found(self, index):
+            return NotFoundError(404, "index_not_found_exception", {"index": index})
 
 
 elif VERSION[0] == 8:
@@ -83,6 +153,10 @@ elif VERSION[0] == 8:
             self._client = FakeClient(self)
             self.bulk_calls = []
             self.search_calls = []
+            # documents with these ids will fail in bulk requests
+            self.fail_ids = set()
+            # number of following bulk requests that are rejected with status 429
+            self.reject_bulk_calls = 0
 
         def exists(self, index, id):
             return False
@@ -90,6 +164,12 @@ elif VERSION[0] == 8:
         def bulk(self, *args, **kwargs):
             return self._client.bulk(*args, **kwargs)
 
+        def _reject(self) -> bool:
+            if self.reject_bulk_calls > 0:
+                self.reject_bulk_calls -= 1
+                return True
+            return False
+
         def dump_bulk(self):
             for i, bc in enumerate(self.bulk_calls):
                 print(f"--- bulk call #{i+1} ---")
@@ -130,10 +210,12 @@ elif VERSION[0] == 8:
                 for o in kwargs["operations"]
             ])
 
+            items = bulk_response_items(self.parent.bulk_calls[-1], self.parent.fail_ids, self.parent._reject())
+
             class Response:
                 def __init__(self):
                     self.body = {
-                        "items": [],
+                        "items": items,
                     }
 
             return Response()
@@ -153,13 +235,7 @@ elif VERSION[0] == 8:
             return JSONSerializer()
 
 
-    class FakeIndices:
-        def __init__(self, parent):
-            self.parent = parent
-            self._mapping = dict()
-
-        def get_mapping(self, *args, **kwargs):
-            return self._mapping
+    class FakeIndices(FakeIndicesBase):
 
-        def put_mapping(self, *args, **kwargs):
-            self._mapping = kwargs["body"]
+        def _not_found(self, index):
+            return NotFoundError("index_not_found_exception", meta=None, body={"index": index})
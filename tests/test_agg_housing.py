@@ -29,6 +29,45 @@ class TestAggregationHousing(unittest.TestCase):
             Search().metric_sum(field="a", return_self=True).is_metric()
         )
 
+    def test_tree_metadata(self):
+        s = Search()
+        agg = s.agg_terms("sku", field="sku")
+        days = agg.agg_date_histogram("days", calendar_interval="1d")
+        qty = days.metric_sum("qty", field="quantity", return_self=True)
+
+        self.assertEqual("aggregations.sku.aggregations.days.aggregations.qty", qty.body_path())
+        self.assertEqual((agg, days, qty), qty.root_branch())
+        self.assertEqual([agg, days], Visitor(days).root_branch())
+        self.assertEqual("key", agg.key_name())
+        self.assertEqual("key_as_string", days.key_name())
+        self.assertEqual("key_as_string", qty.key_name())
+        self.assertEqual(["bucket", "bucket", "metric"], [a.group for a in qty.root_branch()])
+
+    def test_copy(self):
+        s = Search()
+        agg = s.agg_terms("sku", field="sku")
+        days = agg.agg_date_histogram("days", calendar_interval="1d")
+        days.metric_sum("qty", field="quantity")
+        s2 = s.copy()
+
+        self.assertEqual(s.to_body(), s2.to_body())
+        self.assertEqual(["sku", "days", "qty"], [a.name for a in s2._aggregations])
+        sku2, days2, qty2 = s2._aggregations
+        self.assertIs(s2, qty2.search)
+        self.assertIs(days2, qty2.parent)
+        self.assertIs(sku2, qty2.root)
+        self.assertEqual([days2], sku2.children)
+        self.assertEqual((sku2, days2, qty2), qty2.root_branch())
+        self.assertIs(days.params, days2.params)
+
+        # changes to the copy do not change the original
+        days2.metric_avg("avg", field="quantity")
+        s2 = s2.term("field", "value")
+        self.assertNotIn("avg", s.to_body()["aggregations"]["sku"]["aggregations"]["days"]["aggregations"])
+        self.assertIn("avg", s2.to_body()["aggregations"]["sku"]["aggregations"]["days"]["aggregations"])
+        self.assertEqual(["sku", "days", "qty"], [a.name for a in s._aggregations])
+        self.assertEqual(1, len(days.children))
+
     def test_default_timestamp(self):
         self.assertEqual(
             "blabla",
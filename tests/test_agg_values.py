@@ -0,0 +1,258 @@
+import unittest
+
+from elastipy import Search
+
+
+def create_search():
+    """
+    Returns a Search with a nested terms -> date_histogram -> stats aggregation
+    and a pre-defined response.
+    """
+    s = Search(version=7)
+    sku = s.agg_terms("sku", field="sku")
+    day = sku.agg_date_histogram("day", calendar_interval="1d")
+    day.metric_stats("qty", field="quantity")
+    day.metric_sum("price", field="price")
+
+    s.set_response({
+        "aggregations": {
+            "sku": {
+                "buckets": [
+                    {
+                        "key": "a", "doc_count": 3,
+                        "day": {"buckets": [
+                            {
+                                "key_as_string": "2000-01-01T00:00:00.000Z", "key": 946684800000, "doc_count": 1,
+                                "qty": {"count": 1, "min": 1.0, "max": 1.0, "avg": 1.0, "sum": 1.0},
+                                "price": {"value": 10.5},
+                            },
+                            {
+                                "key_as_string": "2000-01-02T00:00:00.000Z", "key": 946771200000, "doc_count": 2,
+                                "qty": {"count": 2, "min": 1.0, "max": 3.0, "avg": 2.0, "sum": 4.0},
+                                "price": {"value": 20},
+                            },
+                        ]},
+                    },
+                    {
+                        "key": "b", "doc_count": 1,
+                        "day": {"buckets": [
+                            {
+                                "key_as_string": "2000-01-02T00:00:00.000Z", "key": 946771200000, "doc_count": 1,
+                                "qty": {"count": 1, "min": 2.0, "max": 2.0, "avg": 2.0, "sum": 2.0},
+                                "price": {"value": None},
+                            },
+                        ]},
+                    },
+                ]
+            }
+        }
+    })
+    return s
+
+
+class TestAggregationValues(unittest.TestCase):
+
+    def test_to_columns(self):
+        s = create_search()
+        day = s._aggregations[1]
+
+        columns = day.to_columns()
+        self.assertEqual(
+            ["sku", "sku.doc_count", "day", "day.doc_count",
+             "qty.count", "qty.min", "qty.max", "qty.sum", "qty.avg", "price"],
+            list(columns),
+        )
+        self.assertEqual(["a", "a", "b"], columns["sku"].tolist())
+        self.assertEqual("object", columns["sku"].dtype.name)
+        self.assertEqual([3, 3, 1], columns["sku.doc_count"].tolist())
+        self.assertEqual("int64", columns["sku.doc_count"].dtype.name)
+        self.assertEqual([1., 3., 2.], columns["qty.max"].tolist())
+        self.assertEqual("float64", columns["qty.max"].dtype.name)
+        # mixed int, float and None
+        self.assertEqual("float64", columns["price"].dtype.name)
+        self.assertEqual([10.5, 20.], columns["price"].tolist()[:2])
+        self.assertNotEqual(columns["price"][2], columns["price"][2])
+
+        # same values as dict_rows
+        rows = list(day.dict_rows())
+        for key, values in columns.items():
+            self.assertEqual(
+                [row[key] for row in rows],
+                [None if v != v else v for v in values.tolist()],
+            )
+
+        self.assertEqual(
+            ["day", "day.doc_count"],
+            list(day.to_columns(include="day*")),
+        )
+
+    def test_to_columns_flat(self):
+        s = create_search()
+        sku = s._aggregations[0]
+
+        columns = sku.to_columns(flat="day", include=["sku", "*.qty.count"], default=0)
+        self.assertEqual(
+            {
+                "sku": ["a", "b"],
+                "2000-01-01T00:00:00.000Z.qty.count": [1, 0],
+                "2000-01-02T00:00:00.000Z.qty.count": [2, 1],
+            },
+            {key: value.tolist() for key, value in columns.items()}
+        )
+
+    def test_rows(self):
+        s = create_search()
+        day = s._aggregations[1]
+
+        rows = list(day.rows(exclude="qty.*"))
+        self.assertEqual(["sku", "sku.doc_count", "day", "day.doc_count", "price"], rows[0])
+        self.assertEqual(["b", 1, "2000-01-02T00:00:00.000Z", 1, None], rows[-1])
+        self.assertEqual(4, len(rows))
+
+        self.assertEqual(
+            [["sku", "2000-01-01T00:00:00.000Z", "2000-01-02T00:00:00.000Z"], ["a", 1, 2], ["b", 0, 1]],
+            list(s._aggregations[0].rows(flat=True, include=["sku", "2000*Z"], default=0)),
+        )
+        self.assertEqual([[], [], [], []], list(day.rows(include="sku", exclude="sku")))
+
+    def test_row_tuples(self):
+        from elastipy.aggregation.visitor import Visitor
+
+        s = create_search()
+        day = s._aggregations[1]
+
+        columns, rows = Visitor(day).row_tuples(include=["sku", "price"], default=-1)
+        self.assertEqual(["sku", "price"], columns)
+        self.assertEqual([("a", 10.5), ("a", 20), ("b", None)], list(rows))
+
+    def test_to_pandas(self):
+        s = create_search()
+        day = s._aggregations[1]
+
+        df = day.to_pandas(to_index="day", exclude="qty.*")
+        self.assertEqual(["sku", "sku.doc_count", "day.doc_count", "price"], list(df.columns))
+        self.assertEqual([3, 3, 1], df["sku.doc_count"].tolist())
+        self.assertEqual("int64", str(df["sku.doc_count"].dtype))
+        self.assertEqual(3, len(day.to_pandas(include="nothing")))
+
+    def test_to_matrix(self):
+        s = create_search()
+        day = s._aggregations[1]
+
+        names, keys, matrix = day.to_matrix(default=0)
+        self.assertEqual(["sku", "day"], names)
+        self.assertEqual(
+            [["a", "b"], ["2000-01-01T00:00:00.000Z", "2000-01-02T00:00:00.000Z"]],
+            keys,
+        )
+        self.assertEqual([[1, 2], [0, 1]], matrix)
+
+        names, keys, matrix = day.to_matrix(as_numpy=True)
+        self.assertEqual((2, 2), matrix.shape)
+        self.assertEqual("float64", matrix.dtype.name)
+        self.assertEqual([1., 2., 1.], [matrix[0, 0], matrix[0, 1], matrix[1, 1]])
+        self.assertNotEqual(matrix[1, 0], matrix[1, 0])
+
+        names, keys, matrix = day.to_matrix(sort="-sku", exclude="*01T*", as_numpy=True, default=0)
+        self.assertEqual([["b", "a"], ["2000-01-02T00:00:00.000Z"]], keys)
+        self.assertEqual("int64", matrix.dtype.name)
+        self.assertEqual([[1], [2]], matrix.tolist())
+
+        names, keys, matrix = day.to_matrix(include="c")
+        self.assertEqual([[], []], keys)
+        self.assertEqual([], matrix)
+
+    def test_to_matrix_sparse(self):
+        s = create_search()
+        day = s._aggregations[1]
+
+        names, keys, (coords, values) = day.to_matrix(sparse=True)
+        self.assertEqual([(0, 0), (0, 1), (1, 1)], coords)
+        self.assertEqual([1, 2, 1], values)
+
+        names, keys, (coords, values) = day.to_matrix(sparse=True, as_numpy=True, sort="-sku")
+        self.assertEqual([[1, 1, 0], [0, 1, 1]], coords.tolist())
+        self.assertEqual([1, 2, 1], values.tolist())
+
+        names, keys, (coords, values) = day.to_matrix(sparse=True, exclude="a")
+        self.assertEqual([["b"], ["2000-01-01T00:00:00.000Z", "2000-01-02T00:00:00.000Z"]], keys)
+        self.assertEqual([(0, 1)], coords)
+
+    def test_df_matrix_sparse(self):
+        s = create_search()
+        day = s._aggregations[1]
+
+        df = day.df_matrix(sparse=True)
+        self.assertEqual("Sparse[float64, nan]", str(df.dtypes.iloc[0]))
+        self.assertEqual(
+            day.df_matrix().fillna(-1).values.tolist(),
+            df.sparse.to_dense().fillna(-1).values.tolist(),
+        )
+
+        df = day.df_matrix(sparse=True, default=0)
+        self.assertEqual("Sparse[int64, 0]", str(df.dtypes.iloc[0]))
+        self.assertEqual([[1, 2], [0, 1]], df.sparse.to_dense().values.tolist())
+        self.assertEqual(3, df.sparse.density * df.size)
+
+    def test_sparse_matrix_columns_large(self):
+        from elastipy.aggregation.converter import sparse_matrix_columns
+
+        # a dense column of this shape would need gigabytes
+        shape = (10_000_000, 1_000)
+        columns = sparse_matrix_columns(shape, [(5, 1), (9_999_999, 999), (7, 1)], [1, 2, 3], default=0)
+        self.assertEqual(1_000, len(columns))
+        self.assertEqual("Sparse[int64, 0]", str(columns[0].dtype))
+        self.assertEqual(10_000_000, len(columns[1]))
+        self.assertEqual([0, 1, 0, 3], columns[1][4:8].tolist())
+        self.assertEqual(2, columns[999][-1])
+        self.assertEqual(3, sum(c.sp_values.size for c in columns))
+
+    def test_typed_keys(self):
+        s = Search(version=7)
+        sku = s.agg_terms("sku", field="sku")
+        flt = sku.agg_filter("flt", filter={"term": {"a": "b"}})
+        flt.metric_percentiles("pct", field="price", percents=[50])
+
+        s.set_response({
+            "aggregations": {
+                "sterms#sku": {"buckets": [
+                    {"key": "a", "doc_count": 2, "filter#flt": {
+                        "doc_count": 1, "percentiles#pct": {"values": {"50.0": 3.}},
+                    }},
+                ]},
+            }
+        })
+        self.assertEqual(
+            [{"sku": "a", "sku.doc_count": 2, "flt": "flt", "flt.doc_count": 1, "pct.50.0": 3.}],
+            list(s._aggregations[2].dict_rows()),
+        )
+
+    def test_bucket_layouts(self):
+        s = Search(version=7)
+        flt = s.agg_filters("flt", filters=[{"term": {"a": 1}}, {"term": {"a": 2}}])
+        flt.metric_percentiles("pct", field="price", percents=[50], keyed=False)
+        hist = s.agg_histogram("hist", field="price", interval=10, keyed=True)
+
+        s.set_response({
+            "aggregations": {
+                "flt": {"buckets": [
+                    {"doc_count": 2, "pct": {"values": [{"key": 50, "value": 3.}]}},
+                    {"doc_count": 1, "pct": {"values": [{"key": 50, "value": None}]}},
+                ]},
+                "hist": {"buckets": {
+                    "0.0": {"key": 0., "doc_count": 4},
+                    "10.0": {"key": 10., "doc_count": 5},
+                }},
+            }
+        })
+        self.assertEqual([(0, 2), (1, 1)], list(flt.items()))
+        self.assertEqual(
+            [{"flt": 0, "flt.doc_count": 2, "pct.50.0": 3.}, {"flt": 1, "flt.doc_count": 1, "pct.50.0": None}],
+            list(s._aggregations[1].dict_rows()),
+        )
+        self.assertEqual([(0, {"50.0": 3.}), (1, {"50.0": None})], list(s._aggregations[1].items()))
+        self.assertEqual([("0.0", 4), ("10.0", 5)], list(hist.items()))
+
+
+if __name__ == "__main__":
+    unittest.main()
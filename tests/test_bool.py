@@ -64,28 +64,54 @@ class TestBool(unittest.TestCase):
             s.get_query().parameters["must_not"]
         )
 
-    def test_assignment(self):
+    def test_replace(self):
         q = query.Bool(must=[self.q1()])
-        q.filter = [self.q2()]
+        q = q.replace(filter=[self.q2()])
         self.assertEqualQuery(
             query.Bool(must=[self.q1()], filter=[self.q2()]),
             q
         )
         self.assertEqualQuery(2, len(q.parameters))
 
-        q.must = [self.q3()]
+        q = q.replace(must=[self.q3()])
         self.assertEqualQuery(
             query.Bool(must=[self.q3()], filter=[self.q2()]),
             q
         )
 
-        q.must = None  # default value
+        q = q.replace(must=None)  # default value
         self.assertEqualQuery(
             query.Bool(filter=[self.q2()]),
             q
         )
         self.assertEqualQuery(1, len(q.parameters))
 
+    def test_deprecated_setter(self):
+        q = query.Bool(must=[self.q1()])
+        with self.assertWarns(DeprecationWarning):
+            q.filter = [self.q2(), self.q2()]
+        self.assertEqualQuery(query.Bool(must=[self.q1()], filter=[self.q2()]), q)
+        self.assertEqual(hash(query.Bool(must=[self.q1()], filter=[self.q2()])), hash(q))
+
+        with self.assertWarns(DeprecationWarning):
+            q.must = None
+        self.assertEqualQuery(query.Bool(filter=[self.q2()]), q)
+
+    def test_deduplicate(self):
+        q = query.Bool(filter=[self.q1(), self.q2(), self.q1(), self.q1().to_dict()], must_not=[self.q2(), self.q2()])
+        self.assertEqualQuery([self.q1(), self.q2()], q.filter)
+        self.assertEqualQuery([self.q2()], q.must_not)
+        self.assertEqualQuery(
+            {"bool": {"filter": [self.q1().to_dict(), self.q2().to_dict()], "must_not": [self.q2().to_dict()]}},
+            q.to_dict()
+        )
+
+        # duplicate scoring clauses are kept
+        q = query.Bool(must=[self.q1(), self.q1()], should=[self.q2(), self.q2()])
+        self.assertEqualQuery([self.q1(), self.q1()], q.must)
+        self.assertEqualQuery([self.q2(), self.q2()], q.should)
+        self.assertNotEqual(query.Bool(should=[self.q2()]), query.Bool(should=[self.q2(), self.q2()]))
+
     def test_or_1(self):
         self.assertEqualQuery(
             query.Bool(
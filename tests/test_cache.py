@@ -0,0 +1,94 @@
+import os
+import time
+import tempfile
+import unittest
+
+from elastipy import Search
+from elastipy.cache import MemoryCache, DirectoryCache
+
+from .mock_client import MockElasticsearch
+
+
+class TestCache(unittest.TestCase):
+
+    def assertCache(self, cache):
+        client = MockElasticsearch()
+        s = Search(index="cached", client=client, cache=cache)
+        s.agg_terms("a", field="a")
+
+        s.execute()
+        s.execute()
+        self.assertEqual(1, len(client.search_calls))
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1}, cache.stats())
+        self.assertEqual(0, s.response.total_hits)
+
+        # different request
+        s2 = Search(index="cached", client=client).cache(cache).size(3)
+        s2.execute()
+        self.assertEqual(2, len(client.search_calls))
+        self.assertEqual(2, len(cache))
+
+        # same request to a different connection
+        client2 = MockElasticsearch()
+        s3 = s.client(client2)
+        s3.execute()
+        self.assertEqual(1, len(client2.search_calls))
+        self.assertEqual(3, len(cache))
+
+        cache.clear()
+        self.assertEqual({"hits": 0, "misses": 0, "size": 0}, cache.stats())
+
+    def test_memory_cache(self):
+        self.assertCache(MemoryCache())
+
+    def test_connection_key(self):
+        cache = MemoryCache()
+        request = Search(index="cached").to_request()
+        self.assertNotEqual(
+            cache.request_key(request, connection="alias:a"),
+            cache.request_key(request, connection="alias:b"),
+        )
+        self.assertEqual(
+            Search(client="a")._connection_key(),
+            Search(client="a").size(3)._connection_key(),
+        )
+        self.assertEqual("alias:default", Search()._connection_key())
+
+    def test_directory_cache(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.assertCache(DirectoryCache(os.path.join(path, "cache")))
+
+    def assertMaxSize(self, cache):
+        for i in range(3):
+            cache.set(str(i), {"i": i})
+            # file modification times must differ
+            time.sleep(.01)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("0"))
+        self.assertEqual({"i": 2}, cache.get("2"))
+
+    def test_max_size(self):
+        self.assertMaxSize(MemoryCache(max_size=2))
+        with tempfile.TemporaryDirectory() as path:
+            self.assertMaxSize(DirectoryCache(path, max_size=2))
+
+    def test_ttl(self):
+        cache = MemoryCache(ttl=0.01)
+        cache.set("a", {})
+        self.assertEqual({}, cache.get("a"))
+        time.sleep(.02)
+        self.assertIsNone(cache.get("a"))
+
+    def test_request_key(self):
+        self.assertEqual(
+            MemoryCache.request_key({"index": "a", "body": {"x": 1, "y": 2}}),
+            MemoryCache.request_key({"body": {"y": 2, "x": 1}, "index": "a"}),
+        )
+        self.assertNotEqual(
+            MemoryCache.request_key({"index": "a", "body": {"x": 1}}),
+            MemoryCache.request_key({"index": "b", "body": {"x": 1}}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+import unittest
+import warnings
+
+from elasticsearch import VERSION
+
+from elastipy.connections import Connections
+
+
+class CountingConnections(Connections):
+
+    def __init__(self):
+        super().__init__()
+        self.num_created = 0
+
+    def _create_client(self, params):
+        self.num_created += 1
+        time.sleep(.01)
+        return MockClient(params)
+
+
+class MockClient:
+
+    def __init__(self, params):
+        self.params = params
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnections(unittest.TestCase):
+
+    def test_create_once(self):
+        connections = CountingConnections()
+        clients = []
+
+        def get():
+            clients.append(connections.get_connection())
+
+        threads = [threading.Thread(target=get) for i in range(32)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(1, connections.num_created)
+        self.assertEqual(32, len(clients))
+        self.assertTrue(all(c is clients[0] for c in clients))
+
+    def test_unknown_alias(self):
+        with self.assertRaises(KeyError):
+            Connections().get_connection("unknown")
+
+    def test_configure(self):
+        connections = CountingConnections()
+        connections.configure("pool", hosts=["a:9200", "b:9200"], maxsize=16, sniff=True, http_compress=True)
+        params = connections.get_connection("pool").params
+
+        self.assertEqual(["a:9200", "b:9200"], params["hosts"])
+        self.assertTrue(params["http_compress"])
+        self.assertTrue(params["sniff_on_start"])
+        if VERSION[0] < 8:
+            self.assertEqual(16, params["maxsize"])
+            self.assertEqual(30, params["timeout"])
+        else:
+            self.assertEqual(16, params["connections_per_node"])
+
+        # changed parameters create a new client
+        connections.configure("pool", maxsize=4)
+        self.assertIsNot(params, connections.get_connection("pool").params)
+        self.assertEqual(2, connections.num_created)
+
+    def test_close_all(self):
+        connections = CountingConnections()
+        connections.set_connection("other", MockClient({}))
+        client = connections.get_connection()
+        other = connections.get_connection("other")
+
+        connections.close_all()
+        self.assertTrue(client.closed)
+        self.assertTrue(other.closed)
+
+        # created again from parameters
+        self.assertIsNot(client, connections.get_connection())
+        with self.assertRaises(KeyError):
+            connections.get_connection("other")
+
+    def test_stats(self):
+        connections = Connections()
+        connections.configure("pool", hosts=["a:9200", "b:9200"])
+        connections.set_connection("mock", MockClient({}))
+
+        stats = connections.stats()
+        self.assertEqual(
+            {"parameters": True, "client": False, "created_at": None},
+            stats["pool"],
+        )
+        self.assertEqual(
+            {"parameters": False, "client": True, "created_at": None},
+            stats["mock"],
+        )
+
+        connections.get_connection("pool")
+        stats = connections.stats()["pool"]
+        self.assertTrue(stats["client"])
+        self.assertIsNotNone(stats["created_at"])
+        self.assertEqual(2, len(stats["hosts"]))
+        self.assertEqual(2, stats["alive"])
+        self.assertEqual(0, stats["dead"])
+
+    @unittest.skipIf(VERSION[0] >= 8, "fake connection class requires elasticsearch < 8")
+    def test_json_loads(self):
+        from elasticsearch import Connection
+        from elastipy import Search, connections
+
+        class FakeConnection(Connection):
+            def perform_request(self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None):
+                if url == "/":
+                    data = '{"version": {"number": "7.17.0", "build_flavor": "default"}, "tagline": "You Know, for Search"}'
+                else:
+                    data = '{"hits": {"total": {"value": 23}, "hits": []}}'
+                return 200, {"content-type": "application/json", "x-elastic-product": "Elasticsearch"}, data
+
+        decoded = []
+
+        def json_loads(data):
+            decoded.append(data)
+            return json.loads(data)
+
+        connections.configure("json-loads", json_loads=json_loads, connection_class=FakeConnection)
+        try:
+            with warnings.catch_warnings():
+                # the 'body' parameter is deprecated in elasticsearch 7.15+
+                warnings.simplefilter("ignore", DeprecationWarning)
+                response = Search(client="json-loads").execute()
+            self.assertEqual(23, response.total_hits)
+            self.assertIn('{"hits": {"total": {"value": 23}, "hits": []}}', decoded)
+        finally:
+            connections.singleton._parameters.pop("json-loads", None)
+            connections.singleton._connections.pop("json-loads", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@ import datetime
 from copy import copy
 
 from elastipy import Exporter
+from elastipy.exporter import Checkpoint
 
 from .mock_client import MockElasticsearch
 
@@ -79,6 +80,366 @@ class TestExporterMock(unittest.TestCase):
             ]
         )
 
+    def test_export_iter(self):
+        exporter = IdExporter(client=MockElasticsearch())
+        exporter.client.fail_ids = {"1"}
+
+        results = list(exporter.export_iter([{"id": 0}, {"id": 1}, {"id": 2}], chunk_size=2))
+        self.assertEqual([True, False, True], [ok for ok, item in results])
+        self.assertEqual("1", results[1][1]["index"]["_id"])
+        self.assertEqual(2, len(exporter.client.bulk_calls))
+
+        self.assertEqual(3, exporter.stats.num_docs)
+        self.assertEqual(1, exporter.stats.num_failures)
+        self.assertEqual(len(b'{"id":0}') * 3, exporter.stats.num_bytes)
+
+    def test_export_parallel(self):
+        exporter = IdExporter(client=MockElasticsearch())
+
+        count, errors = exporter.export_list([{"id": i} for i in range(10)], chunk_size=3, parallel=3)
+        self.assertEqual(10, count)
+        self.assertEqual([], errors)
+        self.assertEqual(4, len(exporter.client.bulk_calls))
+        self.assertEqual(
+            list(range(10)),
+            sorted(line["id"] for call in exporter.client.bulk_calls for line in call if "id" in line)
+        )
+        self.assertEqual(["mock-even", "mock-odd"], sorted(exporter.updated_indices))
+
+        exporter.client.fail_ids = {"3"}
+        results = list(exporter.export_iter([{"id": i} for i in range(10)], chunk_size=3, parallel=2))
+        self.assertEqual(["3"], [item["index"]["_id"] for ok, item in results if not ok])
+        self.assertEqual(10, exporter.stats.num_docs)
+        self.assertEqual(1, exporter.stats.num_failures)
+
+    def test_export_processes(self):
+        exporter = IdExporter(client=MockElasticsearch())
+        objects = [{"id": i} for i in range(10)]
+
+        count, errors = exporter.export_list(objects, chunk_size=3, processes=2)
+        self.assertEqual(10, count)
+        self.assertEqual(
+            list(range(10)),
+            [line["id"] for call in exporter.client.bulk_calls for line in call if "id" in line]
+        )
+        self.assertEqual(
+            ["mock-even", "mock-odd"],
+            [line["index"]["_index"] for line in exporter.client.bulk_calls[0][:3:2]],
+        )
+
+        results = list(exporter.export_iter(objects, chunk_size=3, processes=2, ordered=False, parallel=2))
+        self.assertEqual(
+            [str(i) for i in range(10)],
+            sorted((item["index"]["_id"] for ok, item in results), key=int),
+        )
+
+    def test_pickle(self):
+        import pickle
+        exporter = IdExporter(client=MockElasticsearch())
+        exporter._index_updated["mock-odd"] = exporter.mappings_hash()
+
+        exporter2 = pickle.loads(pickle.dumps(exporter))
+        self.assertIsNone(exporter2._client)
+        self.assertEqual({"mock-odd": exporter.mappings_hash()}, exporter2._index_updated)
+        self.assertEqual((0, "mock-odd", "1", {"id": 1}), next(exporter2._iter_documents([{"id": 1}])))
+
+    def test_export_adaptive(self):
+        from io import StringIO
+        from elastipy.exporter import AdaptiveChunking
+
+        exporter = IdExporter(client=MockElasticsearch())
+        sizer = AdaptiveChunking(chunk_size=2, target_latency=10.)
+        count, errors = exporter.export_list([{"id": i} for i in range(20)], adaptive=sizer)
+        self.assertEqual(20, count)
+        # 2, 3, 4, 6, 5 (rest)
+        self.assertEqual([4, 6, 8, 12, 10], [len(call) for call in exporter.client.bulk_calls])
+        self.assertEqual("keep", sizer.last_decision)
+        self.assertEqual(9, sizer.chunk_size)
+
+        # byte budget
+        exporter = IdExporter(client=MockElasticsearch())
+        exporter.export_list([{"id": i} for i in range(10)], adaptive=True, max_chunk_bytes=len('{"id":0}') * 3)
+        self.assertEqual([6, 6, 6, 2], [len(call) for call in exporter.client.bulk_calls])
+
+        # rejections
+        exporter = IdExporter(client=MockElasticsearch())
+        exporter.client.reject_bulk_calls = 2
+        sizer = AdaptiveChunking(chunk_size=8)
+        file = StringIO()
+        results = list(exporter.export_iter(
+            [{"id": i} for i in range(10)], adaptive=sizer, initial_backoff=0,
+            verbose="simple", file=file,
+        ))
+        self.assertEqual([True] * 10, [ok for ok, item in results])
+        self.assertEqual([16, 16, 16, 4], [len(call) for call in exporter.client.bulk_calls])
+        self.assertEqual(2, sizer.num_rejections)
+        # shrunk to 2, grown to 3 by the successful retry
+        self.assertEqual(3, sizer.chunk_size)
+        self.assertIn("chunk_size=8 latency=- start rejected=0", file.getvalue())
+
+        exporter.client.reject_bulk_calls = 2
+        results = list(exporter.export_iter([{"id": i} for i in range(3)], adaptive=True, initial_backoff=0, max_retries=1))
+        self.assertEqual([429, 429, 429], [item["index"]["status"] for ok, item in results])
+        with self.assertRaises(ValueError):
+            list(exporter.export_iter([{"id": 1}], adaptive=True, parallel=2))
+        with self.assertRaises(ValueError):
+            list(exporter.export_iter([{"id": 1}], adaptive=AdaptiveChunking(), max_chunk_bytes=100))
+
+    def test_index_state(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "state.json")
+            client = MockElasticsearch()
+
+            exporter = IdExporter(client=client, index_state_file=filename)
+            exporter.export_list([{"id": i} for i in range(4)])
+            self.assertEqual(
+                [("get_mapping", "mock-even"), ("create", "mock-even"),
+                 ("get_mapping", "mock-odd"), ("create", "mock-odd")],
+                client.indices.calls,
+            )
+            self.assertEqual(["mock-even", "mock-odd"], exporter.updated_indices)
+
+            # the next run only checks the existence of the indices
+            client.indices.calls.clear()
+            exporter = IdExporter(client=client, index_state_file=filename)
+            exporter.export_list([{"id": i} for i in range(4)])
+            self.assertEqual([("get_mapping", "mock-even"), ("get_mapping", "mock-odd")], client.indices.calls)
+
+            # changed mappings are only updated for the written indices
+            client.indices.calls.clear()
+            client.indices.create(index="mock-other", body={})
+            exporter = IdExporter(client=client, index_state_file=filename)
+            exporter.MAPPINGS = {"properties": {"id": {"type": "keyword"}}}
+            exporter.export_list([{"id": 0}])
+            self.assertEqual(
+                [("create", "mock-other"), ("get_mapping", "mock-even"), ("put_mapping", "mock-even")],
+                client.indices.calls,
+            )
+            self.assertEqual({}, client.indices.indices["mock-other"])
+
+            # or in batches by prepare_indices
+            client.indices.calls.clear()
+            exporter.prepare_indices()
+            self.assertEqual(
+                [("get_mapping", "mock-*"), ("put_mapping", "mock-odd,mock-other")],
+                client.indices.calls,
+            )
+            self.assertEqual(
+                {"mock-even", "mock-odd", "mock-other"},
+                set(exporter._index_updated),
+            )
+
+            # indices that do not exist anymore are created again
+            client.indices.calls.clear()
+            client.indices.delete(index="mock-odd")
+            exporter = IdExporter(client=client, index_state_file=filename)
+            exporter.export_list([{"id": i} for i in range(4)])
+            self.assertIn(("create", "mock-odd"), client.indices.calls)
+
+            # no index requests at all
+            client.indices.calls.clear()
+            exporter = IdExporter(client=client, index_state_file=filename, update_index=False)
+            exporter.prepare_indices()
+            exporter.export_list([{"id": i} for i in range(4)])
+            self.assertEqual([], client.indices.calls)
+
+    def test_export_encoded(self):
+        objects = [{"id": 0, "string": "hello"}, {"id": 1, "tag": "python"}, {"id": 2, "number": 1.5}]
+
+        exporter = TestExporter(client=MockElasticsearch())
+        exporter.export_list(objects, chunk_size=2)
+        expected_calls = exporter.client.bulk_calls
+
+        exporter = TestExporter(client=MockElasticsearch())
+        count, errors = exporter.export_list(objects, chunk_size=2, encoded=True)
+        self.assertEqual(3, count)
+        self.assertEqual(expected_calls, exporter.client.bulk_calls)
+        self.assertBulkCalls(
+            exporter.client,
+            [
+                {'index': {'_index': 'mock'}},
+                {'id': 0, 'string': 'hello', 'timestamp': '2000-01-01T00:00:00'},
+                {'index': {'_index': 'mock'}},
+                {'id': 1, 'tag': 'python', 'timestamp': '2000-01-01T00:00:01'},
+            ],
+            [
+                {'index': {'_index': 'mock'}},
+                {'id': 2, 'number': 1.5, 'timestamp': '2000-01-01T00:00:02'},
+            ],
+        )
+
+        exporter = IdExporter(client=MockElasticsearch())
+        exporter.client.fail_ids = {"5"}
+        results = list(exporter.export_iter(
+            [{"id": i} for i in range(10)], chunk_size=100, max_chunk_bytes=130, encoded=True, parallel=2,
+        ))
+        self.assertEqual([str(i) for i in range(10)], [item["index"]["_id"] for ok, item in results])
+        self.assertEqual(["5"], [item["index"]["_id"] for ok, item in results if not ok])
+        self.assertEqual(5, len(exporter.client.bulk_calls))
+        self.assertEqual(len(b'{"id":0}') * 10, exporter.stats.num_bytes)
+
+    def test_export_encoded_types(self):
+        import decimal
+        import uuid
+        import numpy as np
+
+        objects = [{
+            "id": 0,
+            "number": decimal.Decimal("1.5"),
+            "string": uuid.UUID(int=1),
+            "tag": np.int64(3),
+            "date": datetime.date(2000, 1, 2),
+        }]
+        exporter = TestExporter(client=MockElasticsearch())
+        exporter.export_list(objects)
+        expected_calls = exporter.client.bulk_calls
+
+        exporter = TestExporter(client=MockElasticsearch())
+        count, errors = exporter.export_list(objects, encoded=True)
+        self.assertEqual(1, count)
+        self.assertEqual(expected_calls, exporter.client.bulk_calls)
+        self.assertEqual(1.5, exporter.client.bulk_calls[0][1]["number"])
+        self.assertEqual(str(uuid.UUID(int=1)), exporter.client.bulk_calls[0][1]["string"])
+
+    def test_checkpoint(self):
+        import os
+        import tempfile
+        class FailingExporter(IdExporter):
+            def transform_document(self, data):
+                if data["id"] == 6:
+                    raise RuntimeError("crash")
+                return data
+
+        class MultiExporter(IdExporter):
+            def transform_document(self, data):
+                if data["id"] == 2:
+                    raise RuntimeError("crash")
+                return [{"id": data["id"] * 10 + i} for i in range(3)]
+
+        objects = [{"id": i} for i in range(10)]
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "checkpoint.json")
+
+            exporter = FailingExporter(client=MockElasticsearch())
+            with self.assertRaises(RuntimeError):
+                exporter.export_list(objects, chunk_size=2, checkpoint=filename)
+            # the chunk with 4 and 5 is only sent when the next document is available
+            checkpoint = Checkpoint(filename, "mock-*")
+            self.assertEqual((4, 4, "3"), (checkpoint.offset, checkpoint.num_docs, checkpoint.last_id))
+
+            # resume
+            exporter = IdExporter(client=MockElasticsearch())
+            count, errors = exporter.export_list(objects, chunk_size=2, checkpoint=filename)
+            self.assertEqual(6, count)
+            self.assertEqual(
+                [4, 5, 6, 7, 8, 9],
+                [line["id"] for call in exporter.client.bulk_calls for line in call if "id" in line]
+            )
+            self.assertEqual((10, 10), (checkpoint.load().offset, checkpoint.num_docs))
+
+            # nothing left to export
+            exporter = IdExporter(client=MockElasticsearch())
+            self.assertEqual((0, []), exporter.export_list(objects, checkpoint=checkpoint))
+            self.assertEqual([], exporter.client.bulk_calls)
+
+            checkpoint.reset()
+            self.assertEqual(0, Checkpoint(filename, "mock-*").offset)
+
+            # several documents per object, only complete objects count
+            exporter = MultiExporter(client=MockElasticsearch())
+            with self.assertRaises(RuntimeError):
+                exporter.export_list(objects, chunk_size=2, checkpoint=filename)
+            checkpoint.load()
+            self.assertEqual((1, 3, "2"), (checkpoint.offset, checkpoint.num_docs, checkpoint.last_id))
+
+            # failed documents stop the offset
+            checkpoint.reset()
+            exporter = IdExporter(client=MockElasticsearch())
+            exporter.client.fail_ids = {"3"}
+            results = list(exporter.export_iter(objects, chunk_size=4, checkpoint=checkpoint, encoded=True))
+            self.assertEqual(10, len(results))
+            self.assertEqual((3, 3, 1), (checkpoint.offset, checkpoint.num_docs, checkpoint.num_failures))
+
+            # and are exported again
+            exporter = IdExporter(client=MockElasticsearch())
+            count, errors = exporter.export_list(objects, checkpoint=checkpoint)
+            self.assertEqual((7, []), (count, errors))
+            self.assertEqual((10, 10, 0), (checkpoint.offset, checkpoint.num_docs, checkpoint.num_failures))
+
+            with self.assertRaises(ValueError):
+                list(exporter.export_iter(objects, checkpoint=checkpoint, processes=2, ordered=False))
+            with self.assertRaises(ValueError):
+                list(exporter.export_iter(objects, checkpoint=checkpoint, max_retries=2))
+
+    def test_checkpoint_rejected(self):
+        import os
+        import tempfile
+
+        objects = [{"id": i} for i in range(6)]
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "checkpoint.json")
+
+            exporter = IdExporter(client=MockElasticsearch())
+            exporter.client.reject_bulk_calls = 1
+            count, errors = exporter.export_list(objects, chunk_size=3, checkpoint=filename, raise_on_error=False)
+            self.assertEqual(3, count)
+            self.assertEqual([429] * 3, [e["index"]["status"] for e in errors])
+
+            checkpoint = Checkpoint(filename, "mock-*")
+            self.assertEqual((0, 0, 3), (checkpoint.offset, checkpoint.num_docs, checkpoint.num_failures))
+
+            # resume after the rejected chunk
+            exporter = IdExporter(client=MockElasticsearch())
+            count, errors = exporter.export_list(objects, chunk_size=3, checkpoint=filename)
+            self.assertEqual((6, []), (count, errors))
+            self.assertEqual((6, 6, 0), (checkpoint.load().offset, checkpoint.num_docs, checkpoint.num_failures))
+
+            # retried documents are yielded in order by the adaptive export
+            checkpoint.reset()
+            exporter = IdExporter(client=MockElasticsearch())
+            exporter.client.reject_bulk_calls = 1
+            count, errors = exporter.export_list(
+                objects, chunk_size=3, checkpoint=filename, adaptive=True, max_retries=2, initial_backoff=0,
+            )
+            self.assertEqual((6, []), (count, errors))
+            checkpoint.load()
+            self.assertEqual((6, 6, "5"), (checkpoint.offset, checkpoint.num_docs, checkpoint.last_id))
+
+            # the generator ends after the last result has been acknowledged
+            objects = [{"id": i} for i in range(10)]
+            checkpoint.reset()
+            exporter = IdExporter(client=MockElasticsearch())
+            count, errors = exporter.export_list(objects, chunk_size=10, checkpoint=filename, adaptive=True)
+            self.assertEqual((10, []), (count, errors))
+            checkpoint.load()
+            self.assertEqual((10, 10, "9"), (checkpoint.offset, checkpoint.num_docs, checkpoint.last_id))
+
+
+class IdExporter(Exporter):
+    INDEX_NAME = "mock-*"
+    MAPPINGS = {
+        "properties": {
+            "id": {"type": "long"},
+        }
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updated_indices = []
+
+    def get_document_id(self, es_data):
+        return str(es_data["id"])
+
+    def get_document_index(self, es_data):
+        return self.index_name().replace("*", "odd" if es_data["id"] % 2 else "even")
+
+    def _update_index(self, name):
+        self.updated_indices.append(name)
+        super()._update_index(name)
+
 
 if __name__ == "__main__":
     unittest.main()
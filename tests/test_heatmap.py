@@ -9,8 +9,10 @@ from definition.renderer import change_text_indent
 
 class TestHeatmap(unittest.TestCase):
 
-    def assertHeatmapStr(self, keys, values, expected_str, colors=False, ascii=True, annotate=False, **kwargs):
-        heatmap = Heatmap(keys, values, colors=colors, ascii=ascii)
+    def assertHeatmapStr(
+            self, keys, values, expected_str, colors=False, ascii=True, annotate=False, coords=None, **kwargs
+    ):
+        heatmap = Heatmap(keys, values, colors=colors, ascii=ascii, coords=coords)
         expected_str = "\n".join(
             line.rstrip()
             for line in change_text_indent(expected_str).splitlines()
@@ -98,6 +100,25 @@ class TestHeatmap(unittest.TestCase):
             """,
         )
 
+    def test_heatmap_sparse(self):
+        self.assertHeatmapStr(
+            keys=[
+                ["a", "b"],
+                ["0", "1", "2"]
+            ],
+            values=[2, 3, 4, 6],
+            coords=[(0, 1), (0, 2), (1, 0), (1, 2)],
+            cell_width=2,
+            expected_str=r"""
+              /-+-+--\
+            2 + ::## +
+            1 + ..   +
+            0 +   ** +
+              \-+-+--/
+                a b
+            """,
+        )
+
     def test_heatmap_unicode(self):
         self.assertHeatmapStr(
             keys=[
@@ -1,8 +1,12 @@
+import json
+import enum
 import datetime
 import unittest
 from decimal import Decimal
 
-from elastipy import make_json_compatible
+from elasticsearch import VERSION
+
+from elastipy import make_json_compatible, BodyJsonEncoder, _json
 
 
 class TestJson(unittest.TestCase):
@@ -12,6 +16,10 @@ class TestJson(unittest.TestCase):
             expected,
             make_json_compatible(data)
         )
+        self.assertEqual(
+            expected,
+            _json._make_json_compatible(data)
+        )
         self.assertEqual(
             {"sub": expected},
             make_json_compatible({"sub": data})
@@ -61,6 +69,39 @@ class TestJson(unittest.TestCase):
 
         with self.assertRaises(TypeError):
             make_json_compatible({"u": Unknown()})
+        with self.assertRaises(TypeError):
+            _json._make_json_compatible({"u": Unknown()})
+        with self.assertRaises(TypeError):
+            _json._make_json_compatible({Unknown(): 1})
+
+    def test_same_as_json(self):
+
+        class IntEnum(enum.IntEnum):
+            A = 1
+
+        class SubStr(str):
+            pass
+
+        data = {
+            "list": [1, 2.5, None, True, False, "x", (1, datetime.date(2000, 1, 2))],
+            "enum": IntEnum.A,
+            "str": SubStr("y"),
+            1: {2.5: "float", None: "null", False: "false", SubStr("key"): 1},
+            "tz": datetime.datetime(2000, 1, 1, 12, 30, 1, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+            "big": 2 ** 70,
+        }
+        expected = json.loads(json.dumps(data, cls=BodyJsonEncoder))
+        self.assertEqual(expected, make_json_compatible(data))
+        self.assertEqual(expected, _json._make_json_compatible(data))
+
+    @unittest.skipIf(VERSION[0] < 8, "tests the elasticsearch 8 client serializer")
+    def test_client_serializer_numpy(self):
+        import numpy as np
+        serializer = _json.client_serializer()
+        self.assertEqual(
+            {"a": 1, "b": [1.5], "c": 1.25},
+            json.loads(serializer.dumps({"a": np.int64(1), "b": np.array([1.5]), "c": Decimal("1.25")})),
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+import json
+import unittest
+
+from elastipy import Search, msearch, MultiSearchError
+
+
+class MSearchClient:
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.msearch_calls = []
+
+    def msearch(self, body, params=None):
+        # check if it's serializable to ndjson
+        "\n".join(json.dumps(line) for line in body)
+        self.msearch_calls.append({"body": body, "params": params})
+        return {"responses": self.responses}
+
+
+class TestMSearch(unittest.TestCase):
+
+    def test_msearch(self):
+        client = MSearchClient([
+            {"status": 200, "hits": {"total": 1, "hits": []}, "aggregations": {"skus": {"buckets": [
+                {"key": "a", "doc_count": 1}
+            ]}}},
+            {"status": 200, "hits": {"total": 2, "hits": []}},
+        ])
+        s1 = Search(index="orders", client=client, version=7).param.routing("r1")
+        agg = s1.agg_terms("skus", field="sku")
+        s2 = Search(index="customers", client=client, version=7).param.track_total_hits(True)
+
+        responses = msearch([s1, s2])
+        self.assertEqual([1, 2], [r.total_hits for r in responses])
+        self.assertEqual({"a": 1}, agg.to_dict())
+        self.assertEqual(2, s2.response.total_hits)
+
+        self.assertEqual(1, len(client.msearch_calls))
+        body = client.msearch_calls[0]["body"]
+        self.assertEqual({"index": "orders", "routing": "r1"}, body[0])
+        self.assertEqual(s1.to_body(), body[1])
+        self.assertEqual({"index": "customers"}, body[2])
+        self.assertEqual(True, body[3]["track_total_hits"])
+
+    def test_msearch_errors(self):
+        error = {"status": 404, "error": {"type": "index_not_found_exception"}}
+        client = MSearchClient([
+            {"status": 200, "hits": {"total": 1, "hits": []}},
+            error,
+        ])
+        s1 = Search(client=client, version=7)
+        s2 = Search(client=client, version=7)
+
+        with self.assertRaises(MultiSearchError) as cm:
+            msearch([s1, s2])
+        self.assertEqual({1: error}, cm.exception.errors)
+        self.assertEqual(1, s1.response.total_hits)
+        with self.assertRaises(ValueError):
+            _ = s2.response
+
+        responses = msearch([s1, s2], raise_errors=False)
+        self.assertEqual(404, responses[1]["status"])
+
+    def test_msearch_invalid(self):
+        client = MSearchClient([])
+        with self.assertRaises(ValueError):
+            msearch([Search(client=client), Search(client=MSearchClient([]))])
+
+        with self.assertRaises(ValueError):
+            msearch([Search(client=client).param.scroll("1m")])
+
+        with self.assertRaises(TypeError):
+            msearch([Search(client=lambda **kwargs: {})])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import os
 import json
+import pickle
 import time
 import unittest
+from copy import deepcopy
 
 from elastipy import Search, query
 from elastipy.query import factory, factory_from_dict
@@ -76,23 +78,51 @@ class TestQueryHousing(unittest.TestCase):
 
     def test_copy_compare(self):
         q1 = query.Term("a", "b")
-        q2 = q1.copy()
-        self.assertEqual(q1, q2)
-        self.assertNotEqual(id(q1), id(q2))
+        # queries are immutable and not copied
+        self.assertIs(q1, q1.copy())
+        with self.assertRaises(TypeError):
+            q1.parameters["value"] = "c"
 
-        q1.parameters["value"] = "c"
+        q2 = q1.replace(value="c")
         self.assertNotEqual(q1, q2)
+        self.assertEqual({"term": {"a": {"value": "c"}}}, q2.to_dict())
+        self.assertEqual({"term": {"a": {"value": "b"}}}, q1.to_dict())
+
+    def test_parameters_copied(self):
+        values = ["d", "e"]
+        clauses = [query.Term("a", "b")]
+        q1 = query.Terms("c", values)
+        q2 = query.Bool(must=clauses)
+        values.append("f")
+        clauses.append(query.Term("g", "h"))
+        self.assertEqual({"terms": {"c": ["d", "e"]}}, q1.to_dict())
+        self.assertEqual({"bool": {"must": [{"term": {"a": {"value": "b"}}}]}}, q2.to_dict())
+        self.assertEqual(q1, query.Terms("c", ["d", "e"]))
+        self.assertEqual(hash(q1), hash(query.Terms("c", ["d", "e"])))
 
     def test_copy_deep(self):
         q1 = query.Bool(must=[query.Bool(must=[query.Term("a", "b")])])
-        q2 = q1.copy()
-        self.assertEqual(q1, q2)
-        self.assertNotEqual(id(q1), id(q2))
-        self.assertNotEqual(id(q1.must[0]), id(q2.must[0]))
-        self.assertNotEqual(id(q1.must[0].must[0]), id(q2.must[0].must[0]))
+        q2 = deepcopy(q1)
+        self.assertIs(q1, q2)
 
-        q1.must[0].must[0].parameters["field"] = "x"
+        q2 = q1.replace(filter=query.Term("c", "d"))
         self.assertNotEqual(q1, q2)
+        self.assertIs(q1.must[0], q2.must[0])
+
+    def test_hash(self):
+        q1 = query.Bool(must=[query.Term("a", "b"), query.Terms("c", ["d", "e"])])
+        q2 = query.Bool(must=[{"term": {"a": {"value": "b"}}}, {"terms": {"c": ["d", "e"]}}])
+        self.assertEqual(q1, q2)
+        self.assertEqual(hash(q1), hash(q2))
+        self.assertEqual(1, len({q1: 1, q2: 2}))
+
+        q3 = query.Bool(must=[query.Terms("c", ["d", "e"]), query.Term("a", "b")])
+        self.assertNotEqual(q1, q3)
+        self.assertEqual(hash(q1), hash(pickle.loads(pickle.dumps(q1))))
+
+    def test_search_copy_shares_query(self):
+        s = Search().term("a", "b")
+        self.assertIs(s.get_query(), s.copy().get_query())
 
     def test_copy(self):
         s = Search().copy().bool(must=query.MatchAll())
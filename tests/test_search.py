@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import time
 import unittest
 from io import StringIO
@@ -8,6 +9,17 @@ from elastipy import Search, query, connections
 from .mock_client import MockElasticsearch
 
 
+def run_async(coroutine):
+    """
+    ``asyncio.run`` for python < 3.7
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
 class TestSearch(unittest.TestCase):
 
     def test_index(self):
@@ -59,6 +71,35 @@ class TestSearch(unittest.TestCase):
         Search(client=search).execute()
         self.assertTrue(called)
 
+    def test_execute_async(self):
+        class AsyncClient:
+            def __init__(self):
+                self.search_calls = []
+
+            async def search(self, **kwargs):
+                self.search_calls.append(kwargs)
+                return {"hits": {"total": 23}}
+
+        client = AsyncClient()
+        s = Search(client=client)
+        response = run_async(s.execute_async())
+        self.assertEqual(23, response.total_hits)
+        self.assertEqual([s.to_request()], client.search_calls)
+
+        async def search(**kwargs):
+            return {"hits": {"total": 42}}
+
+        connections.set_async("async-mock", search)
+        s = Search(client="async-mock")
+        self.assertEqual(search, s.get_async_client())
+        run_async(s.execute_async())
+        self.assertEqual(42, s.response.total_hits)
+
+        # synchronous callables are supported as well
+        s = Search(client=lambda **kwargs: {"hits": {"total": 5}})
+        run_async(s.execute_async())
+        self.assertEqual(5, s.response.total_hits)
+
     def test_execute_wrong_type(self):
 
         class NoClient:
@@ -80,6 +121,18 @@ class TestSearch(unittest.TestCase):
             s.response.total_hits
         )
 
+    def test_response_raw(self):
+        raw = json.dumps({"hits": {"total": 23, "hits": []}})
+        for data in (raw, raw.encode(), memoryview(raw.encode())):
+            s = Search().set_response(data)
+            self.assertEqual(23, s.response.total_hits)
+
+        s = Search().set_response(b"...", loads=lambda data: {"hits": {"total": 5}})
+        self.assertEqual(5, s.response.total_hits)
+
+        s = Search(client=lambda **kwargs: raw.encode())
+        self.assertEqual(23, s.execute().total_hits)
+
     def test_add_body(self):
         s = Search()
         s._add_body("here.there", 23)
@@ -106,6 +159,74 @@ class TestSearch(unittest.TestCase):
         with self.assertRaises(ValueError):
             s._add_body("here.there.sub", 1)
 
+    def test_body_cache(self):
+        s = Search()
+        agg = s.agg_terms("sku", field="sku")
+        body = s.to_body()
+        self.assertIs(body["aggregations"], s.to_body()["aggregations"])
+
+        # top-level changes to the returned body are not cached
+        body.pop("aggregations")
+        self.assertIn("aggregations", s.to_body())
+
+        agg.agg_terms("color", field="color")
+        self.assertEqual(
+            {"sku": {"terms": {"field": "sku"}, "aggregations": {"color": {"terms": {"field": "color"}}}}},
+            s.to_body()["aggregations"],
+        )
+
+        agg._set_params({"field": "sku2"})
+        self.assertEqual({"field": "sku2"}, s.to_body()["aggregations"]["sku"]["terms"])
+
+        s._add_body("here.there", 23)
+        self.assertEqual({"there": 23}, s.to_body()["here"])
+
+        s2 = s.copy()
+        s2._aggregations[0]._set_params({"field": "sku3"})
+        self.assertEqual({"field": "sku2"}, s.to_body()["aggregations"]["sku"]["terms"])
+        self.assertEqual({"field": "sku3"}, s2.to_body()["aggregations"]["sku"]["terms"])
+
+    def test_iter_composite(self):
+        pages = [
+            [{"key": {"sku": "a"}, "doc_count": 1}, {"key": {"sku": "b"}, "doc_count": 2}],
+            [{"key": {"sku": "c"}, "doc_count": 3}],
+            [],
+        ]
+        requests = []
+
+        def search(**kwargs):
+            requests.append(kwargs)
+            buckets = pages[len(requests) - 1]
+            response = {"buckets": buckets}
+            if buckets:
+                response["after_key"] = buckets[-1]["key"]
+            return {"aggregations": {"skus": response}}
+
+        s = Search(client=search, version=7)
+        agg = s.agg_composite("skus", sources=[{"sku": {"terms": {"field": "sku"}}}], size=2)
+
+        self.assertEqual(
+            [({"sku": "a"}, 1), ({"sku": "b"}, 2), ({"sku": "c"}, 3)],
+            list(agg.iter_composite()),
+        )
+        self.assertEqual(3, len(requests))
+        self.assertNotIn("after", requests[0]["body"]["aggregations"]["skus"]["composite"])
+        self.assertEqual(
+            {"sku": "b"},
+            requests[1]["body"]["aggregations"]["skus"]["composite"]["after"],
+        )
+        # the after parameter is restored
+        self.assertNotIn("after", s.to_body()["aggregations"]["skus"]["composite"])
+
+        requests.clear()
+        self.assertEqual(
+            [2, 1],
+            [len(page.response.aggregations["skus"]["buckets"]) for page in s.iter_composite()]
+        )
+
+        with self.assertRaises(ValueError):
+            list(Search().agg_terms(field="a").iter_composite_pages())
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+import unittest
+
+from elastipy import Search
+
+
+class ScanClient:
+    """
+    Fake elasticsearch client that pages through a list of documents
+    """
+    def __init__(self, num_docs: int):
+        self.documents = [{"_id": str(i), "_source": {"i": i}} for i in range(num_docs)]
+        self.search_calls = []
+        self.scroll_calls = []
+        self.open_pits = set()
+        self.open_scrolls = set()
+        self.num_pits = 0
+        self._scroll_state = dict()
+
+    def open_point_in_time(self, index, keep_alive):
+        self.num_pits += 1
+        pit_id = f"pit-{self.num_pits}"
+        self.open_pits.add(pit_id)
+        return {"id": pit_id}
+
+    def close_point_in_time(self, body):
+        self.open_pits.remove(body["id"])
+
+    def search(self, index=None, body=None, params=None):
+        self.search_calls.append({"index": index, "body": body, "params": params})
+        docs = self._slice(body)
+        size = body["size"]
+
+        if "pit" in body:
+            assert body["pit"]["id"] in self.open_pits
+            offset = 0
+            if "search_after" in body:
+                offset = body["search_after"][0] + 1
+            hits = [
+                {**doc, "sort": [offset + i]}
+                for i, doc in enumerate(docs[offset:offset + size])
+            ]
+            return {"pit_id": body["pit"]["id"], "hits": {"hits": hits}}
+
+        scroll_id = f"scroll-{len(self.search_calls)}"
+        self.open_scrolls.add(scroll_id)
+        self._scroll_state[scroll_id] = (docs, size, size)
+        return {"_scroll_id": scroll_id, "hits": {"hits": docs[:size]}}
+
+    def scroll(self, scroll_id, scroll):
+        self.scroll_calls.append(scroll_id)
+        docs, size, offset = self._scroll_state[scroll_id]
+        self._scroll_state[scroll_id] = (docs, size, offset + size)
+        return {"_scroll_id": scroll_id, "hits": {"hits": docs[offset:offset + size]}}
+
+    def clear_scroll(self, scroll_id):
+        self.open_scrolls.remove(scroll_id)
+
+    def _slice(self, body):
+        docs = self.documents
+        if "slice" in body:
+            docs = [
+                d for d in docs
+                if int(d["_id"]) % body["slice"]["max"] == body["slice"]["id"]
+            ]
+        return docs
+
+
+class ScrollClient(ScanClient):
+    open_point_in_time = None
+
+
+class TestSearchScan(unittest.TestCase):
+
+    def test_scan_pit(self):
+        client = ScanClient(25)
+        s = Search(index="docs", client=client, version=7).param.size(3)
+
+        hits = list(s.scan(page_size=10))
+        self.assertEqual(list(range(25)), [h["_source"]["i"] for h in hits])
+        self.assertEqual(3, len(client.search_calls))
+        self.assertEqual(set(), client.open_pits)
+
+        request = client.search_calls[0]
+        self.assertIsNone(request["index"])
+        self.assertEqual(10, request["body"]["size"])
+        self.assertEqual(["_shard_doc"], request["body"]["sort"])
+        self.assertEqual({"match_all": {}}, request["body"]["query"])
+        self.assertEqual([9], client.search_calls[1]["body"]["search_after"])
+
+    def test_scan_scroll(self):
+        client = ScrollClient(25)
+        s = Search(index="docs", client=client, version=7)
+
+        hits = list(s.scan(page_size=10))
+        self.assertEqual(list(range(25)), [h["_source"]["i"] for h in hits])
+        self.assertEqual(1, len(client.search_calls))
+        self.assertEqual(3, len(client.scroll_calls))
+        self.assertEqual("1m", client.search_calls[0]["params"]["scroll"])
+        self.assertEqual(set(), client.open_scrolls)
+
+    def test_scan_close_early(self):
+        client = ScanClient(25)
+        scan = Search(index="docs", client=client, version=7).scan(page_size=10)
+        next(scan)
+        self.assertEqual(1, len(client.open_pits))
+        scan.close()
+        self.assertEqual(set(), client.open_pits)
+
+    def test_scan_sliced(self):
+        for client in (ScanClient(50), ScrollClient(50)):
+            for ordered in (False, True):
+                hits = list(
+                    Search(index="docs", client=client, version=7)
+                    .scan(page_size=4, slices=3, ordered=ordered)
+                )
+                self.assertEqual(
+                    list(range(50)),
+                    sorted(h["_source"]["i"] for h in hits)
+                )
+                self.assertEqual(set(), client.open_pits)
+                self.assertEqual(set(), client.open_scrolls)
+
+                slices = [c["body"]["slice"] for c in client.search_calls]
+                self.assertEqual({0, 1, 2}, {s["id"] for s in slices})
+                self.assertEqual({3}, {s["max"] for s in slices})
+
+                if ordered:
+                    # first page of each slice in order of the slice id
+                    self.assertEqual(
+                        [0, 3, 6, 9, 1, 4, 7, 10, 2, 5, 8, 11],
+                        [h["_source"]["i"] for h in hits[:12]]
+                    )
+                client.search_calls.clear()
+
+    def test_scan_aggregations(self):
+        client = ScanClient(10)
+        s = Search(index="docs", client=client, version=7)
+        s.agg_terms("i", field="i")
+
+        hits = list(s.scan(page_size=4, slices=2))
+        self.assertEqual(10, len(hits))
+        for call in client.search_calls:
+            self.assertNotIn("aggregations", call["body"])
+        # the search itself is not changed
+        self.assertIn("aggregations", s.to_body())
+
+    def test_scan_invalid(self):
+        with self.assertRaises(ValueError):
+            list(Search(client=ScanClient(1)).scan(method="fetch"))
+
+        with self.assertRaises(TypeError):
+            list(Search(client=lambda **kwargs: {}).scan())
+
+        with self.assertRaises(TypeError):
+            list(Search(client=ScanClient(1)).scan(slices=2, executor="process"))
+
+
+if __name__ == "__main__":
+    unittest.main()
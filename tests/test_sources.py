@@ -0,0 +1,82 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from elastipy import sources
+
+from .mock_client import MockElasticsearch
+from .test_exporter import IdExporter
+
+
+class TestSources(unittest.TestCase):
+
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+
+    def write_file(self, name: str, data: bytes) -> str:
+        filename = os.path.join(self._tempdir.name, name)
+        if name.endswith(".gz"):
+            data = gzip.compress(data)
+        with open(filename, "wb") as fp:
+            fp.write(data)
+        return filename
+
+    def test_ndjson(self):
+        data = b'{"id": 0, "a": "x"}\n\n{"id": 1, "a": "\\u00e4"}\r\n{"id": 2}'
+        for name in ("docs.ndjson", "docs.ndjson.gz"):
+            source = sources.ndjson(self.write_file(name, data))
+            self.assertEqual(
+                [{"id": 0, "a": "x"}, {"id": 1, "a": "ä"}, {"id": 2}],
+                list(source),
+            )
+            self.assertEqual(source.total_bytes, source.bytes_read)
+            # can be iterated again
+            self.assertEqual(3, len(list(source)))
+
+        self.assertEqual("gzip", sources.ndjson_gz(self.write_file("docs", gzip.compress(data))).compression)
+        self.assertEqual([], list(sources.ndjson(self.write_file("empty.ndjson", b""))))
+
+    def test_csv(self):
+        data = 'id,name,value\n0,"multi\nline",1.5\n1,ä,\n\n'.encode("utf-8")
+        for name in ("docs.csv", "docs.csv.gz"):
+            source = sources.csv(self.write_file(name, data), dtypes={"id": int, "value": float})
+            self.assertEqual(
+                [
+                    {"id": 0, "name": "multi\nline", "value": 1.5},
+                    {"id": 1, "name": "ä", "value": None},
+                ],
+                list(source),
+            )
+            self.assertEqual(source.total_bytes, source.bytes_read)
+
+        source = sources.csv(
+            self.write_file("docs.csv", b"0;a\n1;b\n"),
+            fieldnames=["id", "name"], delimiter=";",
+        )
+        self.assertEqual([{"id": "0", "name": "a"}, {"id": "1", "name": "b"}], list(source))
+        self.assertEqual([], list(sources.csv(self.write_file("empty.csv", b""))))
+
+        with self.assertRaises(ValueError):
+            sources.csv(self.write_file("docs.csv", data), compression="bz2")
+
+    def test_export(self):
+        filename = self.write_file("docs.ndjson", b"".join(b'{"id": %d}\n' % i for i in range(10)))
+
+        file = io.StringIO()
+        exporter = IdExporter(client=MockElasticsearch())
+        count, errors = exporter.export_list(sources.ndjson(filename), chunk_size=3, verbose="simple", file=file)
+        self.assertEqual(10, count)
+        self.assertEqual(
+            list(range(10)),
+            [line["id"] for call in exporter.client.bulk_calls for line in call if "id" in line]
+        )
+        self.assertIn(f"IdExporter 10/{os.path.getsize(filename)} bytes", file.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
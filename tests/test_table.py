@@ -54,6 +54,24 @@ class TestTable(unittest.TestCase):
             header=False,
         )
 
+    def test_table_generator(self):
+        self.assertTableStr(
+            (
+                row for row in [
+                    ["string", "number"],
+                    ["a", 1],
+                    ["baccus", 2],
+                ]
+            ),
+            """
+            string | number
+            -------+-------
+            a      | 1
+            baccus | 2
+            """,
+            bars=False,
+        )
+
     def test_digits(self):
         table = [
             ["a", "b"],